@@ -0,0 +1,81 @@
+from __future__ import annotations
+import argparse
+import json
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from pathlib import Path
+
+# license_codes 전체 점검 (서명/제품/만료/바인딩)
+# - 테이블을 yield_per 로 스트리밍, chunk 마다 --workers 프로세스에서 서명 검증 (in-flight chunk 수 제한 -> 메모리 일정)
+# - 발견 항목은 NDJSON 으로 바로 출력 ({"kind", "detail", "id", "code", "product_id"}), 요약은 stderr
+# - secret 교체: --secret(현재) + --old-secret(이전, 여러 개) -> 이전 secret 으로만 검증되는 코드는 old_secret
+# - 발견 항목이 있으면 exit 1 (종류는 app/core/license_audit.py 참고)
+#
+# 실행 예 (저장소 루트에서):
+#   python admin_tools/audit_licenses.py --db-url sqlite:///./server/licensing.db --out audit.ndjson
+#   python admin_tools/audit_licenses.py --secret NEW --old-secret OLD --workers 8 --out audit.ndjson
+SERVER_DIR = Path(__file__).resolve().parent.parent / "server"
+sys.path.insert(0, str(SERVER_DIR))
+
+def main():
+    p = argparse.ArgumentParser(description="license_codes 점검 (위변조/제품·만료 불일치/만료 후 활성/고아 바인딩)")
+    p.add_argument("--db-url", default=None, help="예: sqlite:///./licensing.db (기본: LIC_SERVER_DB_URL)")
+    p.add_argument("--secret", default=None, help="현재 비밀키 (기본: LIC_SERVER_SECRET)")
+    p.add_argument("--old-secret", action="append", default=[], help="이전 비밀키 (여러 번 지정 가능)")
+    p.add_argument("--out", default="-", help="발견 항목 NDJSON (기본: stdout)")
+    p.add_argument("--chunk-size", type=int, default=5000, help="yield_per / 검증 작업 단위 행 수")
+    p.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="서명 검증 프로세스 수")
+    args = p.parse_args()
+
+    if args.db_url:
+        os.environ["LIC_SERVER_DB_URL"] = args.db_url
+
+    from app.db.database import SessionLocal
+    from app.core.config import settings
+    from app.core.license_audit import AuditReport, audit_chunk, iter_chunks, load_product_codes
+    from app.core.security import utcnow
+
+    secrets = [args.secret or settings.SERVER_SECRET, *args.old_secret]
+    report = AuditReport()
+    t0 = time.perf_counter()
+    now = utcnow()
+    out = sys.stdout if args.out == "-" else open(args.out, "w", encoding="utf-8")
+
+    def emit(result) -> None:
+        scanned, ok, findings = result
+        report.add(scanned, ok, findings)
+        for f in findings:
+            out.write(json.dumps(f, ensure_ascii=False, separators=(",", ":")) + "\n")
+
+    try:
+        with SessionLocal() as db:
+            product_codes = load_product_codes(db)
+            chunks = iter_chunks(db, args.chunk_size)
+            if args.workers <= 1:
+                for rows in chunks:
+                    emit(audit_chunk(rows, secrets, product_codes, now))
+            else:
+                with ProcessPoolExecutor(max_workers=args.workers) as ex:
+                    pending: deque[Future] = deque()
+                    for rows in chunks:
+                        pending.append(ex.submit(audit_chunk, rows, secrets, product_codes, now))
+                        if len(pending) >= args.workers * 2:
+                            emit(pending.popleft().result())
+                    for fut in pending:
+                        emit(fut.result())
+    finally:
+        if out is not sys.stdout:
+            out.close()
+
+    report.elapsed_sec = time.perf_counter() - t0
+    print(json.dumps(report.as_dict()), file=sys.stderr)
+    rate = report.scanned / report.elapsed_sec if report.elapsed_sec > 0 else 0
+    print(f"scanned {report.scanned} rows in {report.elapsed_sec:.2f}s ({rate:,.0f} rows/s), ok={report.ok}", file=sys.stderr)
+    if report.ok != report.scanned:
+        raise SystemExit(1)
+
+if __name__ == "__main__":
+    main()
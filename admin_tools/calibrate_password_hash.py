@@ -0,0 +1,124 @@
+from __future__ import annotations
+import argparse
+import statistics
+import time
+from pathlib import Path
+from typing import Callable, Dict
+
+from passlib.hash import bcrypt
+
+# 배포 호스트에서 비밀번호 해시 시간을 측정해 목표 지연(ms) 안에서 가장 강한 파라미터를 고른다.
+# 결과는 LIC_* 환경변수(.env) 형식으로 출력/기록 -> 서버 Settings 가 읽음
+# 서버는 로그인 성공 시 파라미터가 다른 기존 해시를 자동으로 재해시한다 (더 약한 cost 로는 내리지 않음).
+# 보안 하한(bcrypt rounds >= 10, argon2 m >= 19 MiB, t >= 2) 아래로는 고르지 않는다:
+# 하한도 목표 지연을 넘는 느린 호스트라면 하한 값을 출력하고 경고 (목표 대신 해시 풀 크기로 대응)
+
+SAMPLE_PASSWORD = "calibration-password-1234"
+
+def _measure_ms(fn: Callable[[], object], samples: int) -> float:
+    times = []
+    for _ in range(samples):
+        t0 = time.perf_counter()
+        fn()
+        times.append((time.perf_counter() - t0) * 1000)
+    return statistics.median(times)
+
+def _below_floor(what: str) -> None:
+    print(f"  WARNING: {what} 가 목표 지연을 넘지만 보안 하한이므로 그대로 사용")
+
+def calibrate_bcrypt(target_ms: float, samples: int, min_rounds: int) -> Dict[str, str]:
+    bcrypt.using(rounds=4).hash(SAMPLE_PASSWORD)  # backend 로딩 (warm-up)
+    best = min_rounds
+    for rounds in range(min_rounds, 32):
+        h = bcrypt.using(rounds=rounds)
+        ms = _measure_ms(lambda: h.hash(SAMPLE_PASSWORD), samples)
+        print(f"  bcrypt rounds={rounds:2d}: {ms:8.1f} ms")
+        if ms > target_ms:
+            if rounds == min_rounds:
+                _below_floor(f"rounds={rounds}")
+            break
+        best = rounds
+    return {"LIC_PASSWORD_HASH_SCHEME": "bcrypt", "LIC_PASSWORD_BCRYPT_ROUNDS": str(best)}
+
+def calibrate_argon2(
+    target_ms: float, samples: int, memory_kib: int, parallelism: int, min_memory_kib: int, min_time_cost: int
+) -> Dict[str, str]:
+    try:
+        from passlib.hash import argon2
+        argon2.get_backend()
+    except Exception:
+        raise SystemExit("ERROR: argon2 측정에는 argon2-cffi 패키지가 필요합니다 (pip install argon2-cffi)")
+
+    # 최소 time_cost 가 목표를 넘으면 메모리를 절반씩 줄임 (메모리 하한까지)
+    memory_kib = max(memory_kib, min_memory_kib)
+    while True:
+        h = argon2.using(time_cost=min_time_cost, memory_cost=memory_kib, parallelism=parallelism)
+        ms = _measure_ms(lambda: h.hash(SAMPLE_PASSWORD), samples)
+        print(f"  argon2 m={memory_kib} KiB t={min_time_cost}: {ms:8.1f} ms")
+        if ms <= target_ms:
+            break
+        if memory_kib <= min_memory_kib:
+            _below_floor(f"m={memory_kib} KiB t={min_time_cost}")
+            break
+        memory_kib = max(memory_kib // 2, min_memory_kib)
+
+    best = min_time_cost
+    for time_cost in range(min_time_cost + 1, 33):
+        h = argon2.using(time_cost=time_cost, memory_cost=memory_kib, parallelism=parallelism)
+        ms = _measure_ms(lambda: h.hash(SAMPLE_PASSWORD), samples)
+        print(f"  argon2 m={memory_kib} KiB t={time_cost}: {ms:8.1f} ms")
+        if ms > target_ms:
+            break
+        best = time_cost
+    return {
+        "LIC_PASSWORD_HASH_SCHEME": "argon2",
+        "LIC_PASSWORD_ARGON2_TIME_COST": str(best),
+        "LIC_PASSWORD_ARGON2_MEMORY_COST_KIB": str(memory_kib),
+        "LIC_PASSWORD_ARGON2_PARALLELISM": str(parallelism),
+    }
+
+def write_env(path: Path, values: Dict[str, str]) -> None:
+    # 기존 .env 의 다른 항목은 유지하고 해당 키만 교체/추가
+    lines = path.read_text(encoding="utf-8").splitlines() if path.exists() else []
+    out, seen = [], set()
+    for line in lines:
+        key = line.split("=", 1)[0].strip()
+        if key in values:
+            out.append(f"{key}={values[key]}")
+            seen.add(key)
+        else:
+            out.append(line)
+    out.extend(f"{k}={v}" for k, v in values.items() if k not in seen)
+    path.write_text("\n".join(out) + "\n", encoding="utf-8")
+
+def main():
+    p = argparse.ArgumentParser(description="비밀번호 해시 cost 보정 (목표 지연 기준)")
+    p.add_argument("--scheme", choices=["bcrypt", "argon2"], default="bcrypt")
+    p.add_argument("--target-ms", type=float, default=250.0, help="해시 1회 목표 지연 (ms)")
+    p.add_argument("--samples", type=int, default=3, help="파라미터당 측정 횟수 (중앙값 사용)")
+    p.add_argument("--argon2-memory-kib", type=int, default=65536)
+    p.add_argument("--argon2-parallelism", type=int, default=4)
+    p.add_argument("--min-bcrypt-rounds", type=int, default=10, help="보안 하한 (이보다 약하게 고르지 않음)")
+    p.add_argument("--min-argon2-memory-kib", type=int, default=19456, help="보안 하한 (19 MiB)")
+    p.add_argument("--min-argon2-time-cost", type=int, default=2, help="보안 하한")
+    p.add_argument("--env-file", default=None, help="결과를 기록할 .env 경로 (예: server/.env)")
+    args = p.parse_args()
+
+    print(f"calibrating {args.scheme} for target {args.target_ms} ms ...")
+    if args.scheme == "bcrypt":
+        values = calibrate_bcrypt(args.target_ms, args.samples, args.min_bcrypt_rounds)
+    else:
+        values = calibrate_argon2(
+            args.target_ms, args.samples, args.argon2_memory_kib, args.argon2_parallelism,
+            args.min_argon2_memory_kib, args.min_argon2_time_cost,
+        )
+
+    print()
+    for k, v in values.items():
+        print(f"{k}={v}")
+    if args.env_file:
+        write_env(Path(args.env_file), values)
+        print(f"\nwritten to {args.env_file}")
+
+if __name__ == "__main__":
+    main()
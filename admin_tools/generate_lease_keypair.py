@@ -0,0 +1,36 @@
+from __future__ import annotations
+import argparse
+import base64
+
+# 오프라인 lease 용 Ed25519 키쌍 생성 (cryptography 필요)
+# - private seed -> 서버 .env 의 LIC_LEASE_SIGNING_KEY
+# - public key   -> client/config.py 의 LEASE_PUBLIC_KEYS ({kid: 공개키} dict 에 항목 추가)
+# 키 교체 시 --key-id 를 바꿔 새 kid 를 LEASE_PUBLIC_KEYS 에 추가한 클라이언트를 배포한 뒤 서버 키를 교체
+
+def _b64e(b: bytes) -> str:
+    return base64.urlsafe_b64encode(b).decode("ascii").rstrip("=")
+
+def main():
+    p = argparse.ArgumentParser(description="오프라인 lease 서명용 Ed25519 키쌍 생성")
+    p.add_argument("--key-id", default="k1")
+    args = p.parse_args()
+
+    try:
+        from cryptography.hazmat.primitives import serialization
+        from cryptography.hazmat.primitives.asymmetric.ed25519 import Ed25519PrivateKey
+    except ImportError:
+        raise SystemExit("ERROR: cryptography 패키지가 필요합니다 (pip install cryptography)")
+
+    key = Ed25519PrivateKey.generate()
+    seed = key.private_bytes(serialization.Encoding.Raw, serialization.PrivateFormat.Raw, serialization.NoEncryption())
+    pub = key.public_key().public_bytes(serialization.Encoding.Raw, serialization.PublicFormat.Raw)
+
+    print("# server .env (비밀로 보관)")
+    print(f"LIC_LEASE_SIGNING_KEY={_b64e(seed)}")
+    print(f"LIC_LEASE_KEY_ID={args.key_id}")
+    print()
+    print("# client/config.py")
+    print(f'LEASE_PUBLIC_KEYS = {{"{args.key_id}": "{_b64e(pub)}"}}')
+
+if __name__ == "__main__":
+    main()
@@ -1,49 +1,270 @@
 from __future__ import annotations
 import argparse
+import csv
+import hashlib
+import hmac
+import io
+import json
 import os
 import secrets
+import sys
+import time
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from dataclasses import asdict, dataclass
 from datetime import datetime, timedelta, timezone
-from typing import Optional
-import json
+from pathlib import Path
+from typing import Iterator, Optional
+
+# 라이선스 코드 대량 발급
+# - 서버 codec(server/app/core/license_codec.py)을 그대로 import -> 포맷이 서버와 어긋나지 않음
+# - chunk 단위로 프로세스 풀에 나눠 생성하고, 순서대로 받아 즉시 출력 (메모리는 in-flight chunk 만큼)
+# - 출력: lines(코드만, 기본) / ndjson / csv (batch_id, seq, nonce 포함)
+# - --out 파일에 쓰면 chunk 마다 checkpoint(<out>.ckpt)를 기록, --resume 으로 이어서 생성
+#   checkpoint 에는 발급 조건과 secret fingerprint 를 저장 -> 다른 secret 이나 다른 발급 조건으로는 이어 쓰지 않음
+#
+# 실행 예 (저장소 루트에서):
+#   python admin_tools/generate_license.py --product demo_paid --count 10
+#   python admin_tools/generate_license.py --format lic2 --product-id 2 --count 1000000 \
+#       --output-format ndjson --out batch.ndjson --workers 8
+#   python admin_tools/generate_license.py --out batch.ndjson --resume   (중단된 발급 이어서)
+
+SERVER_DIR = Path(__file__).resolve().parent.parent / "server"
+sys.path.insert(0, str(SERVER_DIR))
+
+from app.core.license_codec import encode_license, encode_license_v2  # noqa: E402
+
+CSV_FIELDS = ("batch_id", "seq", "code", "nonce", "product", "exp")
+
+@dataclass(frozen=True)
+class Spec:
+    # checkpoint 에 그대로 저장되는 발급 조건 (resume 시 동일해야 함)
+    format: str
+    product: Optional[str]
+    product_id: Optional[int]
+    exp_ts: Optional[int]
+    count: int
+    chunk_size: int
+    batch_id: str
+    output_format: str
+
+    @property
+    def exp_iso(self) -> Optional[str]:
+        if not self.exp_ts:
+            return None
+        return datetime.fromtimestamp(self.exp_ts, timezone.utc).isoformat().replace("+00:00", "Z")
+
+    @property
+    def product_label(self) -> str:
+        return self.product if self.format == "lic1" else str(self.product_id)
+
+# ---- 워커 (프로세스 풀에서 실행되므로 모듈 레벨) ----
+
+def build_chunk(spec: Spec, secret: str, index: int, n: int) -> bytes:
+    # 생성 + 직렬화까지 워커에서 -> 메인 프로세스는 받은 bytes 를 쓰기만 함
+    return render_chunk(spec, index * spec.chunk_size, make_chunk(spec, secret, n))
 
-# 서버와 동일한 로직을 사용하도록 import (server/app 을 PYTHONPATH에 추가해서 실행하는 방식)
-# 간단히 이 파일은 독립 실행을 위해 같은 구현을 포함합니다.
-import base64, hashlib, hmac
+def make_chunk(spec: Spec, secret: str, n: int) -> list[tuple[str, str]]:
+    """(code, nonce_hex) n개."""
+    out = []
+    exp_iso = spec.exp_iso
+    for _ in range(n):
+        nonce = secrets.token_bytes(16)
+        if spec.format == "lic2":
+            code = encode_license_v2(spec.product_id, spec.exp_ts, nonce=nonce, secret=secret)
+        else:
+            payload = {"v": 1, "product": spec.product, "nonce": nonce.hex()}
+            if exp_iso:
+                payload["exp"] = exp_iso
+            code = encode_license(payload, secret)
+        out.append((code, nonce.hex()))
+    return out
 
-PREFIX = "LIC1"
+# ---- 출력 ----
 
-def _b32e(b: bytes) -> str:
-    return base64.b32encode(b).decode("ascii").rstrip("=")
+def render_chunk(spec: Spec, first_seq: int, rows: list[tuple[str, str]]) -> bytes:
+    if spec.output_format == "lines":
+        return "".join(f"{code}\n" for code, _ in rows).encode("utf-8")
+    exp = spec.exp_iso
+    if spec.output_format == "ndjson":
+        return "".join(
+            json.dumps(
+                {"batch_id": spec.batch_id, "seq": first_seq + i, "code": code, "nonce": nonce,
+                 "product": spec.product_label, "exp": exp},
+                separators=(",", ":"),
+            ) + "\n"
+            for i, (code, nonce) in enumerate(rows)
+        ).encode("utf-8")
+    buf = io.StringIO()
+    w = csv.writer(buf, lineterminator="\n")
+    for i, (code, nonce) in enumerate(rows):
+        w.writerow((spec.batch_id, first_seq + i, code, nonce, spec.product_label, exp or ""))
+    return buf.getvalue().encode("utf-8")
 
-def hmac_sha256(secret: str, msg: bytes) -> bytes:
-    return hmac.new(secret.encode("utf-8"), msg, hashlib.sha256).digest()
+def csv_header() -> bytes:
+    return (",".join(CSV_FIELDS) + "\n").encode("utf-8")
 
-def encode_license(payload: dict, secret: str) -> str:
-    payload_bytes = json.dumps(payload, separators=(",", ":"), sort_keys=True).encode("utf-8")
-    sig = hmac_sha256(secret, payload_bytes)
-    return f"{PREFIX}.{_b32e(payload_bytes)}.{_b32e(sig)}"
+# ---- checkpoint ----
+
+# resume 시 명령줄에서 다시 지정하면 checkpoint 와 같아야 하는 옵션 (argparse dest -> Spec 필드)
+RESUME_CHECKED_ARGS = {
+    "format": "format", "product": "product", "product_id": "product_id", "count": "count",
+    "chunk_size": "chunk_size", "batch_id": "batch_id", "output_format": "output_format",
+}
+
+def secret_fingerprint(secret: str) -> str:
+    # secret 자체는 저장하지 않음 (HMAC 앞 16 hex 만 비교용으로)
+    return hmac.new(secret.encode("utf-8"), b"generate_license checkpoint", hashlib.sha256).hexdigest()[:16]
+
+def resume_conflicts(ckpt: dict, secret: str, explicit: dict) -> list[str]:
+    """checkpoint 와 이번 실행이 어긋나는 항목 (비어 있으면 resume 가능)."""
+    problems = []
+    if not hmac.compare_digest(ckpt.get("secret_fp", ""), secret_fingerprint(secret)):
+        problems.append("secret 이 checkpoint 를 만든 secret 과 다름")
+    spec = ckpt["spec"]
+    for arg, field in RESUME_CHECKED_ARGS.items():
+        if arg in explicit and explicit[arg] != spec[field]:
+            problems.append(f"--{arg.replace('_', '-')}={explicit[arg]} (checkpoint: {spec[field]})")
+    if "days" in explicit:
+        problems.append("--days 는 resume 시 지정할 수 없음 (checkpoint 의 만료 시각 사용)")
+    return problems
+
+def load_checkpoint(path: str) -> Optional[dict]:
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+
+def save_checkpoint(path: str, spec: Spec, secret_fp: str, chunks_done: int, out_bytes: int) -> None:
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(
+            {"spec": asdict(spec), "secret_fp": secret_fp, "chunks_done": chunks_done, "out_bytes": out_bytes}, f
+        )
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+# ---- 실행 ----
+
+def chunk_sizes(spec: Spec, start_chunk: int) -> Iterator[tuple[int, int]]:
+    """(chunk index, 개수)."""
+    n_chunks = (spec.count + spec.chunk_size - 1) // spec.chunk_size
+    for i in range(start_chunk, n_chunks):
+        yield i, min(spec.chunk_size, spec.count - i * spec.chunk_size)
+
+def generate(spec: Spec, secret: str, workers: int, start_chunk: int) -> Iterator[tuple[int, int, bytes]]:
+    """(chunk index, 개수, 출력 bytes) 를 chunk 순서대로."""
+    jobs = chunk_sizes(spec, start_chunk)
+    if workers <= 1:
+        for i, n in jobs:
+            yield i, n, build_chunk(spec, secret, i, n)
+        return
+    # in-flight chunk 수를 workers * 2 로 제한 -> 메모리 일정
+    with ProcessPoolExecutor(max_workers=workers) as ex:
+        pending: deque[tuple[int, int, Future]] = deque()
+        for i, n in jobs:
+            pending.append((i, n, ex.submit(build_chunk, spec, secret, i, n)))
+            if len(pending) >= workers * 2:
+                j, m, fut = pending.popleft()
+                yield j, m, fut.result()
+        for j, m, fut in pending:
+            yield j, m, fut.result()
+
+def _build_spec(args) -> Spec:
+    if args.format == "lic1" and not args.product:
+        raise SystemExit("ERROR: lic1 에는 --product 필요")
+    if args.format == "lic2" and args.product_id is None:
+        raise SystemExit("ERROR: lic2 에는 --product-id 필요")
+    exp_ts = None
+    if args.days and args.days > 0:
+        exp = datetime.now(timezone.utc) + timedelta(days=args.days)
+        exp_ts = int(exp.replace(microsecond=0).timestamp())
+    return Spec(
+        format=args.format,
+        product=args.product if args.format == "lic1" else None,
+        product_id=args.product_id if args.format == "lic2" else None,
+        exp_ts=exp_ts,
+        count=args.count,
+        chunk_size=args.chunk_size,
+        batch_id=args.batch_id or datetime.now(timezone.utc).strftime("%Y%m%d") + "-" + secrets.token_hex(4),
+        output_format=args.output_format,
+    )
 
 def main():
-    p = argparse.ArgumentParser()
-    p.add_argument("--product", required=True, help="예: demo_paid")
+    p = argparse.ArgumentParser(description="라이선스 코드 대량 발급 (스트리밍, 멀티 프로세스)")
+    p.add_argument("--format", choices=("lic1", "lic2"), default="lic1", help="lic2: 짧은 바이너리 포맷 (--product-id 필요)")
+    p.add_argument("--product", help="예: demo_paid (lic1)")
+    p.add_argument("--product-id", type=int, help="products.id (lic2)")
     p.add_argument("--days", type=int, default=3650, help="만료까지 일수 (0이면 만료 없음)")
     p.add_argument("--secret", default=os.environ.get("LIC_SERVER_SECRET", ""), help="서버와 동일한 비밀키")
     p.add_argument("--count", type=int, default=1)
+    p.add_argument("--output-format", choices=("lines", "ndjson", "csv"), default="lines")
+    p.add_argument("--out", default="-", help="출력 파일 (기본: stdout). 파일이면 checkpoint 기록")
+    p.add_argument("--batch-id", default=None, help="기본: YYYYMMDD-<random>")
+    p.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    p.add_argument("--chunk-size", type=int, default=10000)
+    p.add_argument("--resume", action="store_true", help="<out>.ckpt 의 발급 조건으로 이어서 생성")
     args = p.parse_args()
+    # 명령줄에서 직접 지정한 값만 (기본값 제외) -> resume 시 checkpoint 와 비교
+    p.set_defaults(**dict.fromkeys([*RESUME_CHECKED_ARGS, "days"], None))
+    explicit = {k: v for k, v in vars(p.parse_args()).items() if v is not None}
 
     if not args.secret:
         raise SystemExit("ERROR: --secret 또는 환경변수 LIC_SERVER_SECRET 필요")
 
-    codes = []
-    for _ in range(args.count):
-        payload = {"v": 1, "product": args.product, "nonce": secrets.token_hex(16)}
-        if args.days and args.days > 0:
-            exp = datetime.now(timezone.utc) + timedelta(days=args.days)
-            payload["exp"] = exp.replace(microsecond=0).isoformat().replace("+00:00", "Z")
-        codes.append(encode_license(payload, args.secret))
+    to_stdout = args.out == "-"
+    ckpt_path = None if to_stdout else args.out + ".ckpt"
+    start_chunk, out_bytes = 0, 0
+    if args.resume:
+        if ckpt_path is None:
+            raise SystemExit("ERROR: --resume 은 --out 파일과 함께 사용")
+        ckpt = load_checkpoint(ckpt_path)
+        if ckpt is None:
+            raise SystemExit(f"ERROR: checkpoint 없음: {ckpt_path}")
+        problems = resume_conflicts(ckpt, args.secret, explicit)
+        if problems:
+            raise SystemExit("ERROR: checkpoint 와 맞지 않아 이어서 생성할 수 없음:\n  " + "\n  ".join(problems))
+        spec = Spec(**ckpt["spec"])
+        start_chunk, out_bytes = ckpt["chunks_done"], ckpt["out_bytes"]
+    else:
+        spec = _build_spec(args)
+
+    workers = 1 if spec.count <= spec.chunk_size else max(1, args.workers)
+    seq_done = min(spec.count, start_chunk * spec.chunk_size)
+    secret_fp = secret_fingerprint(args.secret)
+    t0 = time.perf_counter()
+    generated = 0
+
+    if to_stdout:
+        f = sys.stdout.buffer
+    else:
+        # 마지막 checkpoint 이후에 쓰인(불완전할 수 있는) 부분은 잘라내고 이어 씀
+        f = open(args.out, "r+b" if args.resume else "wb")
+        f.truncate(out_bytes)
+        f.seek(out_bytes)
+    try:
+        if spec.output_format == "csv" and out_bytes == 0:
+            f.write(csv_header())
+        for i, n, data in generate(spec, args.secret, workers, start_chunk):
+            f.write(data)
+            generated += n
+            if ckpt_path:
+                f.flush()
+                os.fsync(f.fileno())
+                save_checkpoint(ckpt_path, spec, secret_fp, i + 1, f.tell())
+    finally:
+        if not to_stdout:
+            f.close()
 
-    for c in codes:
-        print(c)
+    elapsed = time.perf_counter() - t0
+    print(
+        f"batch {spec.batch_id}: {generated} codes in {elapsed:.2f}s "
+        f"({generated / elapsed if elapsed > 0 else 0:,.0f} codes/s, workers={workers}"
+        f"{f', resumed after {seq_done}' if args.resume else ''})",
+        file=sys.stderr,
+    )
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,76 @@
+from __future__ import annotations
+import argparse
+import json
+import os
+import sys
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from itertools import islice
+from pathlib import Path
+from typing import BinaryIO, Iterator
+
+# 라이선스 코드 사전 등록 (bulk import) -> license_codes
+# - 입력: admin_tools/generate_license.py 출력 (lines / ndjson / csv), 파일 여러 개 또는 '-'(stdin)
+# - 서명 검증은 --workers 개 프로세스에서 chunk 단위로 (검증이 병목, INSERT 는 메인 프로세스에서 순서대로)
+# - batch-size 행씩 INSERT ... ON CONFLICT DO NOTHING (PostgreSQL 은 COPY), 이미 있는 코드는 건너뜀
+# - 배치마다 commit: 중단되면 같은 입력으로 다시 실행 (들어간 코드는 duplicates 로 건너뜀)
+# 서버가 실행 중이면 POST /admin/licenses/import 로 같은 처리를 할 수 있음 (ADMIN_API_TOKEN 필요)
+#
+# 실행 예 (저장소 루트에서):
+#   python admin_tools/import_licenses.py batch.ndjson --db-url sqlite:///./server/licensing.db --workers 8
+#   python admin_tools/generate_license.py --format lic2 --product-id 2 --count 1000 | python admin_tools/import_licenses.py -
+SERVER_DIR = Path(__file__).resolve().parent.parent / "server"
+sys.path.insert(0, str(SERVER_DIR))
+
+def read_chunks(files: list[str], size: int) -> Iterator[list[bytes]]:
+    for name in files:
+        f: BinaryIO = sys.stdin.buffer if name == "-" else open(name, "rb")
+        try:
+            while chunk := list(islice(f, size)):
+                yield chunk
+        finally:
+            if f is not sys.stdin.buffer:
+                f.close()
+
+def main():
+    p = argparse.ArgumentParser(description="라이선스 코드 사전 등록 (bulk import)")
+    p.add_argument("files", nargs="*", default=["-"], help="입력 파일 (기본: stdin)")
+    p.add_argument("--db-url", default=None, help="예: sqlite:///./licensing.db (기본: LIC_SERVER_DB_URL)")
+    p.add_argument("--secret", default=None, help="서명 검증 비밀키 (기본: LIC_SERVER_SECRET)")
+    p.add_argument("--batch-size", type=int, default=None, help="INSERT/commit 당 코드 수 (기본: LIC_LICENSE_IMPORT_BATCH_SIZE)")
+    p.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="서명 검증 프로세스 수")
+    args = p.parse_args()
+
+    if args.db_url:
+        os.environ["LIC_SERVER_DB_URL"] = args.db_url
+
+    from app.db.database import Base, SessionLocal, engine
+    from app.core.license_import import LicenseImporter, verify_lines
+
+    Base.metadata.create_all(bind=engine)
+    with SessionLocal() as db:
+        importer = LicenseImporter(db, args.batch_size, args.secret)
+        chunks = read_chunks(args.files, importer.batch_size)
+        if args.workers <= 1:
+            for chunk in chunks:
+                importer.add_lines(chunk)
+        else:
+            # in-flight chunk 수를 workers * 2 로 제한 -> 메모리 일정, 결과는 입력 순서대로 INSERT
+            with ProcessPoolExecutor(max_workers=args.workers) as ex:
+                pending: deque[Future] = deque()
+                for chunk in chunks:
+                    pending.append(ex.submit(verify_lines, chunk, importer.product_ids, args.secret))
+                    if len(pending) >= args.workers * 2:
+                        importer.add_verified(*pending.popleft().result())
+                for fut in pending:
+                    importer.add_verified(*fut.result())
+        report = importer.finish()
+
+    print(json.dumps(report.as_dict(), ensure_ascii=False))
+    rate = report.read / report.elapsed_sec if report.elapsed_sec > 0 else 0
+    print(f"{report.read} read, {report.inserted} inserted in {report.elapsed_sec:.2f}s ({rate:,.0f} codes/s)", file=sys.stderr)
+    if report.invalid:
+        raise SystemExit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,37 @@
+from __future__ import annotations
+import argparse
+import os
+import sys
+from pathlib import Path
+
+# 서버 코드(server/app)를 그대로 사용: server 디렉터리를 PYTHONPATH에 추가
+SERVER_DIR = Path(__file__).resolve().parent.parent / "server"
+sys.path.insert(0, str(SERVER_DIR))
+
+def main():
+    p = argparse.ArgumentParser(description="license_codes 로부터 entitlements 테이블 재계산 (backfill / drift 점검)")
+    p.add_argument("--db-url", default=None, help="예: sqlite:///./licensing.db (기본: LIC_SERVER_DB_URL)")
+    p.add_argument("--check", action="store_true", help="변경하지 않고 drift만 보고 (drift가 있으면 exit 1)")
+    args = p.parse_args()
+
+    if args.db_url:
+        os.environ["LIC_SERVER_DB_URL"] = args.db_url
+
+    from app.db.database import Base, SessionLocal, engine
+    from app.db import models  # noqa: F401
+    from app.core.entitlements import rebuild_entitlements
+
+    Base.metadata.create_all(bind=engine)
+    with SessionLocal() as db:
+        report = rebuild_entitlements(db, apply=not args.check)
+
+    print(f"checked={report.checked} missing={len(report.missing)} stale={len(report.stale)} orphaned={len(report.orphaned)}")
+    for name in ("missing", "stale", "orphaned"):
+        for user_id, product_id in getattr(report, name):
+            print(f"  {name}: user_id={user_id} product_id={product_id}")
+
+    if args.check and report.drift:
+        raise SystemExit(1)
+
+if __name__ == "__main__":
+    main()
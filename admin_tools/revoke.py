@@ -0,0 +1,56 @@
+from __future__ import annotations
+import argparse
+import os
+import sys
+from pathlib import Path
+
+# 관리자 revoke: 라이선스 코드 정지 또는 사용자의 활성 세션 전체 종료
+# 서버와 같은 DB 에 기록하므로 연결 중인 클라이언트에는 GET /session/events 로 전달됨
+# 라이선스 코드는 redeem 과 같은 정규형(normalize_code)으로 찾음 (LIC2 소문자/묶음 없이 입력해도 됨)
+SERVER_DIR = Path(__file__).resolve().parent.parent / "server"
+sys.path.insert(0, str(SERVER_DIR))
+
+def main():
+    p = argparse.ArgumentParser(description="라이선스 코드 / 사용자 세션 revoke")
+    p.add_argument("--db-url", default=None, help="예: sqlite:///./licensing.db (기본: LIC_SERVER_DB_URL)")
+    sub = p.add_subparsers(dest="target", required=True)
+    lic = sub.add_parser("license", help="라이선스 코드 정지")
+    lic.add_argument("code")
+    lic.add_argument("--reason", default="ADMIN")
+    usr = sub.add_parser("user", help="사용자의 활성 세션 전체 종료")
+    usr.add_argument("email")
+    usr.add_argument("--reason", default="ADMIN")
+    args = p.parse_args()
+
+    if args.db_url:
+        os.environ["LIC_SERVER_DB_URL"] = args.db_url
+
+    from app.db.database import SessionLocal
+    from app.db import models
+    from app.core.entitlements import revoke_license
+    from app.core.deps import revoke_sessions
+    from app.core.license_codec import normalize_code
+
+    with SessionLocal() as db:
+        if args.target == "license":
+            code = normalize_code(args.code.strip())
+            lc = db.query(models.LicenseCode).filter(models.LicenseCode.code == code).first()
+            if lc is None:
+                raise SystemExit(f"license not found: {code}")
+            revoke_license(db, lc, args.reason)
+            db.commit()
+            print(f"revoked license id={lc.id} user_id={lc.redeemed_by_user_id}")
+        else:
+            user = db.query(models.User).filter(models.User.email == args.email).first()
+            if user is None:
+                raise SystemExit(f"user not found: {args.email}")
+            ids = [
+                sid for (sid,) in db.query(models.Session.id)
+                .filter(models.Session.user_id == user.id, models.Session.is_active == True)  # noqa: E712
+            ]
+            revoke_sessions(db, ids, args.reason)
+            db.commit()
+            print(f"revoked {len(ids)} session(s) of user_id={user.id}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+from __future__ import annotations
+import os
+import socket
+import subprocess
+import sys
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterator
+
+import requests
+
+# 벤치마크 공용: 별도 프로세스로 uvicorn 서버를 띄우고 base URL 을 돌려준다
+
+SERVER_DIR = Path(__file__).resolve().parent.parent / "server"
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+def pct(values: list[float], q: float) -> float:
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(q * len(values)))]
+
+def server_env(**overrides: str) -> dict:
+    env = dict(os.environ)
+    env.update({f"LIC_{k}": str(v) for k, v in overrides.items()})
+    return env
+
+@contextmanager
+def run_server(env: dict, workers: int = 1) -> Iterator[str]:
+    # 스키마/시드는 워커 기동 전에 한 번만 생성 (워커끼리 초기화 경쟁 방지)
+    subprocess.run([sys.executable, "-c", "import app.main"], cwd=SERVER_DIR, env=env, check=True)
+    port = free_port()
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port),
+         "--workers", str(workers), "--log-level", "warning"],
+        cwd=SERVER_DIR, env=env,
+    )
+    base = f"http://127.0.0.1:{port}"
+    try:
+        for _ in range(100):
+            try:
+                if requests.get(base + "/health", timeout=1).ok:
+                    break
+            except requests.RequestException:
+                time.sleep(0.1)
+        yield base
+    finally:
+        proc.terminate()
+        proc.wait()
@@ -0,0 +1,65 @@
+from __future__ import annotations
+import argparse
+import os
+import secrets
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Callable
+
+from _server import SERVER_DIR
+
+# 라이선스 코드 포맷 마이크로벤치마크 (LIC1 vs LIC2)
+# - encode / decode_and_verify 처리량(codes/s)과 코드 길이 비교 (서버 없이 codec 함수만 호출)
+#
+# 실행 예 (저장소 루트에서):
+#   python benchmarks/bench_license_codec.py --n 200000
+
+os.environ.setdefault("LIC_SERVER_SECRET", "bench-secret")
+sys.path.insert(0, str(SERVER_DIR))
+from app.core.license_codec import decode_and_verify, encode_license, encode_license_v2  # noqa: E402
+
+def _rate(fn: Callable[[int], object], n: int, repeat: int) -> float:
+    # repeat 회 중 가장 빠른 실행의 codes/s
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        for i in range(n):
+            fn(i)
+        best = min(best, time.perf_counter() - t0)
+    return n / best
+
+def main():
+    p = argparse.ArgumentParser(description="LIC1 / LIC2 encode·verify 처리량과 코드 길이 비교")
+    p.add_argument("--n", type=int, default=100000)
+    p.add_argument("--repeat", type=int, default=3)
+    args = p.parse_args()
+
+    exp = datetime.now(timezone.utc) + timedelta(days=3650)
+    exp_iso = exp.replace(microsecond=0).isoformat().replace("+00:00", "Z")
+    exp_ts = int(exp.timestamp())
+
+    def lic1(_i: int) -> str:
+        return encode_license({"v": 1, "product": "demo_paid", "exp": exp_iso, "nonce": secrets.token_hex(16)})
+
+    def lic2(_i: int) -> str:
+        return encode_license_v2(2, exp_ts)
+
+    rows = []
+    for name, enc in (("LIC1", lic1), ("LIC2", lic2)):
+        codes = [enc(i) for i in range(args.n)]
+        for c in codes[:1000]:
+            _, err = decode_and_verify(c)
+            assert err is None, err
+        enc_rate = _rate(enc, args.n, args.repeat)
+        ver_rate = _rate(lambda i: decode_and_verify(codes[i]), args.n, args.repeat)
+        rows.append((name, len(codes[0]), enc_rate, ver_rate))
+
+    print(f"{'format':<6} {'length':>6} {'encode/s':>12} {'verify/s':>12}")
+    for name, length, enc_rate, ver_rate in rows:
+        print(f"{name:<6} {length:>6} {enc_rate:>12,.0f} {ver_rate:>12,.0f}")
+    (_, l1, e1, v1), (_, l2, e2, v2) = rows
+    print(f"LIC2/LIC1: length x{l2 / l1:.2f}, encode x{e2 / e1:.2f}, verify x{v2 / v1:.2f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+from __future__ import annotations
+import argparse
+import os
+import secrets
+import shutil
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+from _server import SERVER_DIR, pct, run_server, server_env
+
+# SQLite 프로필 비교 벤치마크 (default vs production)
+# - 프로필마다 빈 DB로 uvicorn(멀티 워커)을 띄우고
+#   login -> validate xN -> redeem -> validate -> logout 을 여러 스레드에서 동시에 반복
+# - 엔드포인트별 p50/p99, 처리량, 5xx("database is locked" 등) 건수를 출력
+#
+# 실행 예 (저장소 루트에서):
+#   python benchmarks/bench_sqlite_profile.py --users 64 --threads 32 --workers 4
+
+SECRET = "bench-secret"
+os.environ["LIC_SERVER_SECRET"] = SECRET
+sys.path.insert(0, str(SERVER_DIR))
+
+def run_profile(profile: str, args) -> dict:
+    tmp = tempfile.mkdtemp(prefix=f"bench-{profile}-")
+    env = server_env(
+        SERVER_DB_URL=f"sqlite:///{os.path.join(tmp, 'bench.db')}",
+        SERVER_SECRET=SECRET,
+        SQLITE_PROFILE=profile,
+        PASSWORD_BCRYPT_ROUNDS=4,  # 해시 비용이 DB 비교를 가리지 않도록 최소화
+    )
+    try:
+        with run_server(env, workers=args.workers) as base:
+            res = _run_workload(base, args)
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+    return {"profile": profile, **res}
+
+def _run_workload(base: str, args) -> dict:
+    from app.core.license_codec import encode_license
+
+    latencies: dict[str, list[float]] = defaultdict(list)
+    errors: dict[str, int] = defaultdict(int)
+    lock = threading.Lock()
+
+    def call(http: requests.Session, name: str, method: str, path: str, **kw):
+        t0 = time.perf_counter()
+        r = http.request(method, base + path, timeout=30, **kw)
+        dt = time.perf_counter() - t0
+        with lock:
+            latencies[name].append(dt)
+            if r.status_code >= 500:
+                errors[name] += 1
+        return r
+
+    def user_loop(i: int) -> None:
+        http = requests.Session()
+        email = f"user{i}@example.com"
+        hwid = secrets.token_hex(32)
+        call(http, "register", "POST", "/auth/register", json={"email": email, "password": "password123"})
+        for _ in range(args.rounds):
+            r = call(http, "login", "POST", "/auth/login",
+                     json={"email": email, "password": "password123", "hwid_hash": hwid})
+            if r.status_code != 200:
+                continue
+            auth = {"Authorization": f"Bearer {r.json()['access_token']}"}
+            body = {"product_code": "demo_paid", "hwid_hash": hwid}
+            for _ in range(args.validates):
+                call(http, "validate", "POST", "/license/validate", headers=auth, json=body)
+            code = encode_license({"v": 1, "product": "demo_paid", "nonce": secrets.token_hex(16)}, SECRET)
+            call(http, "redeem", "POST", "/license/redeem", headers=auth, json={**body, "license_code": code})
+            call(http, "validate", "POST", "/license/validate", headers=auth, json=body)
+            call(http, "logout", "POST", "/auth/logout", headers=auth)
+
+    t0 = time.perf_counter()
+    with ThreadPoolExecutor(args.threads) as ex:
+        list(ex.map(user_loop, range(args.users)))
+    elapsed = time.perf_counter() - t0
+
+    total = sum(len(v) for v in latencies.values())
+    return {
+        "elapsed_sec": elapsed,
+        "requests": total,
+        "rps": total / elapsed if elapsed else 0.0,
+        "errors": dict(errors),
+        "endpoints": {
+            name: (statistics.median(v) * 1000, pct(v, 0.99) * 1000, len(v))
+            for name, v in sorted(latencies.items())
+        },
+    }
+
+def main():
+    p = argparse.ArgumentParser(description="SQLite default vs production 프로필 비교")
+    p.add_argument("--profiles", nargs="+", default=["default", "production"])
+    p.add_argument("--users", type=int, default=64)
+    p.add_argument("--threads", type=int, default=32)
+    p.add_argument("--workers", type=int, default=4, help="uvicorn 워커 수")
+    p.add_argument("--rounds", type=int, default=3, help="사용자당 login~logout 반복 횟수")
+    p.add_argument("--validates", type=int, default=10, help="로그인당 validate 호출 수")
+    args = p.parse_args()
+
+    for profile in args.profiles:
+        res = run_profile(profile, args)
+        print(f"\n== {res['profile']}: {res['requests']} req in {res['elapsed_sec']:.2f}s "
+              f"({res['rps']:.0f} req/s), 5xx={sum(res['errors'].values())} {res['errors'] or ''}")
+        for name, (p50, p99, n) in res["endpoints"].items():
+            print(f"  {name:10s} n={n:6d}  p50={p50:8.2f} ms  p99={p99:8.2f} ms")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,223 @@
+from __future__ import annotations
+import argparse
+import asyncio
+import hashlib
+import os
+import secrets
+import shutil
+import sys
+import tempfile
+import time
+from datetime import datetime
+from urllib.parse import urlsplit
+
+import requests
+from sqlalchemy import create_engine, text
+
+from _server import SERVER_DIR, pct, run_server, server_env
+
+# 세션 토큰(st2.<id>...) 발급에 서버 코드 사용 (SERVER_SECRET 은 서버와 같은 LIC_ 환경변수/기본값)
+sys.path.insert(0, str(SERVER_DIR))
+from app.core.session_token import issue_session_token  # noqa: E402
+
+# GET /session/events 유휴 연결 부하 테스트 (워커 1개)
+# - 사용자/세션 N개를 DB 에 직접 넣고 (로그인/bcrypt 비용 제외), N개의 SSE 연결을 열어 둔 채 유지
+# - /metrics 의 구독자 수와 워커 max RSS 로 연결당 메모리 산정
+# - 일부 세션을 DB 에서 revoke(이벤트 INSERT + UPDATE)하고 해당 연결에 도착하기까지의 지연 측정
+#   (지연 ~= EVENTS_POLL_INTERVAL_SEC 이내여야 함)
+# 클라이언트/서버 모두 연결 수만큼 fd 가 필요: ulimit -n 을 N 보다 크게
+#
+# 실행 예 (저장소 루트에서):
+#   python benchmarks/load_sse_idle.py --connections 5000 --hold 30 --revoke 200
+
+# /metrics 는 관리자 토큰 필요
+ADMIN = {"X-Admin-Token": "bench-admin"}
+
+def _th(token: str) -> str:
+    return hashlib.sha256(token.encode()).hexdigest()
+
+def _seed_sessions(db_url: str, n: int) -> list[tuple[int, str]]:
+    """(session_id, token) 목록. 사용자마다 세션 1개."""
+    run_id = secrets.token_hex(4)
+    now = datetime.utcnow()
+    engine = create_engine(db_url)
+    with engine.begin() as conn:
+        conn.execute(
+            text("INSERT INTO users (email, password_hash, created_at) VALUES (:email, 'x', :now)"),
+            [{"email": f"sse{i}-{run_id}@example.com", "now": now} for i in range(n)],
+        )
+        user_ids = conn.execute(
+            text("SELECT id FROM users WHERE email LIKE :p ORDER BY id"), {"p": f"sse%-{run_id}@example.com"}
+        ).scalars().all()
+        conn.execute(
+            text(
+                "INSERT INTO sessions (user_id, token_hash, hwid_hash, created_at, last_seen_at, is_active) "
+                "VALUES (:uid, :th, :hwid, :now, :now, :active)"
+            ),
+            [
+                {"uid": uid, "th": secrets.token_hex(32), "hwid": "0" * 64, "now": now, "active": True}
+                for uid in user_ids
+            ],
+        )
+        # 토큰에 세션 id 가 들어가므로 INSERT 후 token_hash 교체 (auth 의 로그인과 같은 순서)
+        session_ids = conn.execute(
+            text("SELECT id FROM sessions WHERE user_id IN (SELECT id FROM users WHERE email LIKE :p) ORDER BY id"),
+            {"p": f"sse%-{run_id}@example.com"},
+        ).scalars().all()
+        tokens = [(sid, issue_session_token(sid)) for sid in session_ids]
+        conn.execute(
+            text("UPDATE sessions SET token_hash = :th WHERE id = :sid"),
+            [{"sid": sid, "th": _th(t)} for sid, t in tokens],
+        )
+    engine.dispose()
+    return tokens
+
+def _revoke(db_url: str, session_ids: list[int]) -> float:
+    """revoke_sessions 와 같은 방식(이벤트 INSERT + UPDATE, 한 트랜잭션). commit 시각 반환."""
+    engine = create_engine(db_url)
+    now = datetime.utcnow()
+    with engine.begin() as conn:
+        for sid in session_ids:
+            conn.execute(
+                text(
+                    "INSERT INTO session_events (user_id, session_id, kind, data, created_at) "
+                    "SELECT user_id, id, 'session_revoked', '{\"reason\":\"BENCH\"}', :now FROM sessions WHERE id = :sid"
+                ),
+                {"sid": sid, "now": now},
+            )
+        conn.execute(
+            text(f"UPDATE sessions SET is_active = 0, revoked_at = :now, revoke_reason = 'BENCH' "
+                 f"WHERE id IN ({','.join(str(s) for s in session_ids)})"),
+            {"now": now},
+        )
+    t = time.perf_counter()
+    engine.dispose()
+    return t
+
+class Conn:
+    __slots__ = ("session_id", "token", "writer", "opened", "revoked_at", "keepalives", "error")
+
+    def __init__(self, session_id: int, token: str):
+        self.session_id = session_id
+        self.token = token
+        self.writer = None
+        self.opened = False
+        self.revoked_at: float | None = None
+        self.keepalives = 0
+        self.error: str | None = None
+
+async def _open(c: Conn, host: str, port: int, sem: asyncio.Semaphore, connect_times: list[float]) -> None:
+    async with sem:
+        t0 = time.perf_counter()
+        try:
+            reader, writer = await asyncio.open_connection(host, port)
+            writer.write(
+                f"GET /session/events HTTP/1.1\r\nHost: {host}\r\nAuthorization: Bearer {c.token}\r\n"
+                "Accept: text/event-stream\r\n\r\n".encode()
+            )
+            await writer.drain()
+            head = await reader.readuntil(b"\r\n\r\n")
+            if not head.startswith(b"HTTP/1.1 200"):
+                c.error = head.split(b"\r\n", 1)[0].decode()
+                writer.close()
+                return
+        except (OSError, asyncio.IncompleteReadError) as e:
+            c.error = type(e).__name__
+            return
+        c.writer = writer
+        c.opened = True
+        connect_times.append((time.perf_counter() - t0) * 1000)
+    # 이후는 유휴 대기: 이벤트/keepalive 수신만 기록
+    try:
+        while True:
+            chunk = await reader.read(4096)
+            if not chunk:
+                break
+            if b"event: session_revoked" in chunk:
+                c.revoked_at = time.perf_counter()
+            if b": keepalive" in chunk:
+                c.keepalives += 1
+    except OSError:
+        pass
+
+async def _run(base: str, db_url: str, conns: list[Conn], args) -> None:
+    u = urlsplit(base)
+    sem = asyncio.Semaphore(args.open_concurrency)
+    connect_times: list[float] = []
+    rss_before = (await asyncio.to_thread(requests.get, base + "/metrics", headers=ADMIN, timeout=30)).json()["process"]["max_rss_kib"]
+
+    t0 = time.perf_counter()
+    tasks = [asyncio.create_task(_open(c, u.hostname, u.port, sem, connect_times)) for c in conns]
+    while len(connect_times) + sum(1 for c in conns if c.error) < len(conns):
+        await asyncio.sleep(0.2)
+    open_sec = time.perf_counter() - t0
+    opened = [c for c in conns if c.opened]
+    errors = [c.error for c in conns if c.error]
+    print(f"opened {len(opened)}/{len(conns)} in {open_sec:.1f}s"
+          f"  connect p50={pct(connect_times, 0.5):.1f}ms p99={pct(connect_times, 0.99):.1f}ms")
+    if errors:
+        print(f"  errors: {len(errors)} (first: {errors[0]})")
+
+    print(f"holding {args.hold}s ...")
+    await asyncio.sleep(args.hold)
+    m = (await asyncio.to_thread(requests.get, base + "/metrics", headers=ADMIN, timeout=30)).json()
+    alive = sum(1 for c in opened if not c.writer.is_closing())
+    rss = m["process"]["max_rss_kib"]
+    print(f"alive={alive} subscribers={m['events']['subscribers']} keepalives={sum(c.keepalives for c in opened)}")
+    if rss is not None and rss_before is not None:
+        per_conn = (rss - rss_before) / max(1, len(opened))
+        print(f"worker max RSS: {rss_before / 1024:.1f} MiB -> {rss / 1024:.1f} MiB  (~{per_conn:.1f} KiB/connection)")
+
+    victims = opened[: args.revoke]
+    if victims:
+        committed = await asyncio.to_thread(_revoke, db_url, [c.session_id for c in victims])
+        deadline = time.perf_counter() + args.poll_interval * 5 + 5
+        while time.perf_counter() < deadline and any(c.revoked_at is None for c in victims):
+            await asyncio.sleep(0.05)
+        lat = [(c.revoked_at - committed) * 1000 for c in victims if c.revoked_at is not None]
+        print(f"revoked {len(victims)}: delivered {len(lat)}"
+              f"  latency p50={pct(lat, 0.5):.0f}ms p99={pct(lat, 0.99):.0f}ms max={max(lat, default=0):.0f}ms")
+        m = (await asyncio.to_thread(requests.get, base + "/metrics", headers=ADMIN, timeout=30)).json()
+        print(f"subscribers after revoke={m['events']['subscribers']} (expected {len(opened) - len(lat)})")
+
+    for c in opened:
+        c.writer.close()
+    for t in tasks:
+        t.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+
+def main():
+    p = argparse.ArgumentParser(description="SSE 유휴 연결 부하 테스트 (워커 1개)")
+    p.add_argument("--db-url", default=None, help="기본: 임시 SQLite 파일")
+    p.add_argument("--connections", type=int, default=5000)
+    p.add_argument("--open-concurrency", type=int, default=200, help="동시에 여는 연결 수 (listen backlog 보다 작게)")
+    p.add_argument("--hold", type=float, default=20.0, help="유휴 유지 시간(초)")
+    p.add_argument("--keepalive", type=float, default=15.0)
+    p.add_argument("--poll-interval", type=float, default=1.0)
+    p.add_argument("--revoke", type=int, default=100, help="revoke 후 전달 지연을 잴 연결 수")
+    args = p.parse_args()
+
+    tmp = None
+    db_url = args.db_url
+    if db_url is None:
+        tmp = tempfile.mkdtemp(prefix="load-sse-")
+        db_url = f"sqlite:///{os.path.join(tmp, 'sse.db')}"
+
+    env = server_env(
+        SERVER_DB_URL=db_url,
+        EVENTS_KEEPALIVE_SEC=args.keepalive,
+        EVENTS_POLL_INTERVAL_SEC=args.poll_interval,
+        SESSION_CACHE_MAX_ENTRIES=max(10000, args.connections),
+        SESSION_REAPER_INTERVAL_SEC=0,
+        ADMIN_API_TOKEN=ADMIN["X-Admin-Token"],
+    )
+    try:
+        with run_server(env, workers=1) as base:
+            conns = [Conn(sid, tok) for sid, tok in _seed_sessions(db_url, args.connections)]
+            asyncio.run(_run(base, db_url, conns, args))
+    finally:
+        if tmp:
+            shutil.rmtree(tmp, ignore_errors=True)
+
+if __name__ == "__main__":
+    main()
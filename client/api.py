@@ -1,70 +1,243 @@
 from __future__ import annotations
+import json
+import random
+import time
+import uuid
 import requests
-from typing import Optional, Dict, Any
+from requests.adapters import HTTPAdapter
+from typing import Optional, Dict, Any, Iterator, List, Tuple
 
 class ApiError(RuntimeError):
     pass
 
+# 재시도할 응답 코드 (게이트웨이 오류/일시적 과부하). 409 는 Idempotency-Key 처리 중(Retry-After 동반)일 때만
+RETRY_STATUS = (502, 503, 504)
+
 class LicensingApi:
-    def __init__(self, base_url: str, timeout: float = 8.0):
+    """라이선스 서버 클라이언트.
+
+    - requests.Session 하나로 keep-alive 연결을 재사용 (같은 서버로의 호출은 TCP/TLS 연결 1개로 처리)
+    - 멱등 호출(GET, validate, Idempotency-Key 를 붙인 login/redeem/bootstrap)만
+      연결 오류/타임아웃/502·503·504 에서 jitter 를 준 지수 백오프로 재시도
+    - timeout 은 (connect, read) 따로 지정
+    """
+
+    def __init__(
+        self,
+        base_url: str,
+        timeout: float = 8.0,
+        connect_timeout: float = 3.0,
+        pool_size: int = 4,
+        max_retries: int = 3,
+        backoff_base: float = 0.25,
+        backoff_max: float = 4.0,
+    ):
         self.base_url = base_url.rstrip("/")
-        self.timeout = timeout
+        self.timeout = timeout  # read timeout
+        self.connect_timeout = connect_timeout
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.retries = 0
+        self._http = requests.Session()
+        # 재시도는 아래 _request 에서 직접 처리 (어댑터 자체 재시도는 끔)
+        self._adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, max_retries=0)
+        self._http.mount("http://", self._adapter)
+        self._http.mount("https://", self._adapter)
+        # product_code -> (ETag, 응답 body). 304 응답이면 캐시된 body 재사용
+        self._product_cache: Dict[str, Tuple[str, Dict[str, Any]]] = {}
+        self._features: Optional[List[str]] = None
+
+    def close(self) -> None:
+        self._http.close()
+
+    def __enter__(self) -> "LicensingApi":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
 
     def _url(self, path: str) -> str:
         return f"{self.base_url}{path}"
 
+    def _backoff(self, attempt: int) -> float:
+        # full jitter: [0, min(max, base * 2^attempt)]
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+
+    def _request(self, method: str, path: str, idempotent: bool = False, **kw: Any) -> requests.Response:
+        attempts = self.max_retries + 1 if idempotent else 1
+        for attempt in range(attempts):
+            last = attempt == attempts - 1
+            try:
+                r = self._http.request(method, self._url(path), timeout=(self.connect_timeout, self.timeout), **kw)
+            except (requests.ConnectionError, requests.Timeout):
+                if last:
+                    raise
+                self.retries += 1
+                time.sleep(self._backoff(attempt))
+                continue
+            retry_after = r.headers.get("Retry-After")
+            in_progress = r.status_code == 409 and retry_after is not None
+            if last or not (r.status_code in RETRY_STATUS or in_progress):
+                return r
+            self.retries += 1
+            delay = self._backoff(attempt)
+            if retry_after and retry_after.isdigit():
+                delay = max(delay, float(retry_after))
+            time.sleep(delay)
+        raise AssertionError("unreachable")
+
+    def _post_idempotent(self, path: str, json: Dict[str, Any], headers: Optional[Dict[str, str]] = None) -> requests.Response:
+        # 한 번의 논리적 호출 = 키 하나. 재시도는 같은 키로 보내 서버가 첫 응답을 재생하게 함
+        headers = {**(headers or {}), "Idempotency-Key": str(uuid.uuid4())}
+        return self._request("POST", path, idempotent=True, json=json, headers=headers)
+
+    def connection_stats(self) -> Dict[str, int]:
+        # urllib3 연결 풀 카운터 합계: 요청 수 - 새로 연 연결 수 = 재사용 횟수
+        pools = self._adapter.poolmanager.pools
+        requests_n = opened = 0
+        for key in pools.keys():
+            pool = pools[key]
+            requests_n += pool.num_requests
+            opened += pool.num_connections
+        return {
+            "requests": requests_n,
+            "connections_opened": opened,
+            "connections_reused": max(0, requests_n - opened),
+            "retries": self.retries,
+        }
+
+    def server_features(self) -> List[str]:
+        # GET /health 의 features (구버전 서버는 빈 목록). 인스턴스당 1회만 조회
+        if self._features is None:
+            try:
+                r = self._request("GET", "/health", idempotent=True)
+                self._features = list(r.json().get("features", [])) if r.status_code == 200 else []
+            except (requests.RequestException, ValueError):
+                self._features = []
+        return self._features
+
+    def supports(self, feature: str) -> bool:
+        return feature in self.server_features()
+
     def register(self, email: str, password: str) -> None:
-        r = requests.post(
-            self._url("/auth/register"),
-            json={"email": email, "password": password},
-            timeout=self.timeout,
-        )
+        r = self._request("POST", "/auth/register", json={"email": email, "password": password})
         if r.status_code not in (200, 201):
             raise ApiError(f"register failed: {r.status_code} {r.text}")
 
     def login(self, email: str, password: str, hwid_hash: str) -> Dict[str, Any]:
-        r = requests.post(
-            self._url("/auth/login"),
-            json={"email": email, "password": password, "hwid_hash": hwid_hash},
-            timeout=self.timeout,
+        r = self._post_idempotent(
+            "/auth/login",
+            {"email": email, "password": password, "hwid_hash": hwid_hash},
         )
         if r.status_code != 200:
             raise ApiError(f"login failed: {r.status_code} {r.text}")
         return r.json()
 
+    def bootstrap(
+        self, email: str, password: str, hwid_hash: str, product_code: str, license_code: Optional[str] = None
+    ) -> Dict[str, Any]:
+        # 제품 조회 + 로그인 + (선택) redeem + validate 를 한 번의 요청으로
+        # 반환: {"token": {...}, "product": {...}, "redeem": {...}|None, "redeem_error": str|None, "validation": {...}}
+        body: Dict[str, Any] = {
+            "email": email, "password": password, "hwid_hash": hwid_hash, "product_code": product_code,
+        }
+        if license_code:
+            body["license_code"] = license_code
+        r = self._post_idempotent("/client/bootstrap", body)
+        if r.status_code != 200:
+            raise ApiError(f"bootstrap failed: {r.status_code} {r.text}")
+        return r.json()
+
     def logout(self, token: str) -> None:
-        r = requests.post(
-            self._url("/auth/logout"),
-            headers={"Authorization": f"Bearer {token}"},
-            timeout=self.timeout,
-        )
+        r = self._request("POST", "/auth/logout", headers={"Authorization": f"Bearer {token}"})
         if r.status_code != 200:
             raise ApiError(f"logout failed: {r.status_code} {r.text}")
 
+    def heartbeat(self, token: str) -> str:
+        # 세션 유지 + 상태 확인: "active" | "expired" | "revoked" | "invalid"
+        r = self._request("POST", "/session/heartbeat", idempotent=True, headers={"Authorization": f"Bearer {token}"})
+        status = r.headers.get("X-Session-Status")
+        if r.status_code not in (204, 401) or not status:
+            raise ApiError(f"heartbeat failed: {r.status_code} {r.text}")
+        return status
+
+    def session_events(
+        self, token: str, last_event_id: Optional[int] = None, read_timeout: Optional[float] = None
+    ) -> Iterator[Dict[str, Any]]:
+        """GET /session/events (SSE) 의 이벤트를 {"id", "event", "data"} 로 반환 (keepalive 는 건너뜀).
+
+        서버가 이 세션의 session_revoked 를 보낸 뒤 스트림을 닫으면 종료. 연결이 끊기면 마지막 id 로 재호출.
+        read_timeout 은 서버 keepalive 주기보다 길게 (기본: 읽기 timeout 없음).
+        """
+        headers = {"Authorization": f"Bearer {token}", "Accept": "text/event-stream"}
+        if last_event_id is not None:
+            headers["Last-Event-ID"] = str(last_event_id)
+        with self._http.get(
+            self._url("/session/events"), headers=headers, stream=True, timeout=(self.connect_timeout, read_timeout)
+        ) as r:
+            if r.status_code != 200:
+                raise ApiError(f"session events failed: {r.status_code} {r.text}")
+            ev: Dict[str, Any] = {}
+            for line in r.iter_lines(decode_unicode=True):
+                if line:
+                    field, _, value = line.partition(":")
+                    value = value[1:] if value.startswith(" ") else value
+                    if field == "id":
+                        ev["id"] = int(value)
+                    elif field in ("event", "data"):
+                        ev[field] = value
+                    continue
+                if "event" in ev:
+                    yield {"id": ev.get("id"), "event": ev["event"], "data": json.loads(ev.get("data") or "{}")}
+                ev = {}
+
     def get_product(self, product_code: str) -> Dict[str, Any]:
-        r = requests.get(self._url(f"/products/{product_code}"), timeout=self.timeout)
+        cached = self._product_cache.get(product_code)
+        headers = {"If-None-Match": cached[0]} if cached else {}
+        r = self._request("GET", f"/products/{product_code}", idempotent=True, headers=headers)
+        if r.status_code == 304 and cached:
+            return dict(cached[1])
         if r.status_code != 200:
             raise ApiError(f"get_product failed: {r.status_code} {r.text}")
-        return r.json()
+        body = r.json()
+        etag = r.headers.get("ETag")
+        if etag:
+            self._product_cache[product_code] = (etag, body)
+        return body
 
     def redeem_license(self, token: str, product_code: str, license_code: str, hwid_hash: str) -> Dict[str, Any]:
-        r = requests.post(
-            self._url("/license/redeem"),
+        r = self._post_idempotent(
+            "/license/redeem",
+            {"product_code": product_code, "license_code": license_code, "hwid_hash": hwid_hash},
             headers={"Authorization": f"Bearer {token}"},
-            json={"product_code": product_code, "license_code": license_code, "hwid_hash": hwid_hash},
-            timeout=self.timeout,
         )
         if r.status_code != 200:
             raise ApiError(f"redeem failed: {r.status_code} {r.text}")
         return r.json()
 
     def validate_license(self, token: str, product_code: str, hwid_hash: str) -> Dict[str, Any]:
-        r = requests.post(
-            self._url("/license/validate"),
+        # validate 는 조회만 하므로 재시도 가능
+        r = self._request(
+            "POST",
+            "/license/validate",
+            idempotent=True,
             headers={"Authorization": f"Bearer {token}"},
             json={"product_code": product_code, "hwid_hash": hwid_hash},
-            timeout=self.timeout,
         )
         if r.status_code != 200:
             raise ApiError(f"validate failed: {r.status_code} {r.text}")
         return r.json()
+
+    def validate_licenses(self, token: str, product_codes: List[str], hwid_hash: str) -> Dict[str, Dict[str, Any]]:
+        # 여러 제품을 한 번의 요청으로 검증. product_code -> 검증 결과
+        r = self._request(
+            "POST",
+            "/license/validate-batch",
+            idempotent=True,
+            headers={"Authorization": f"Bearer {token}"},
+            json={"product_codes": list(product_codes), "hwid_hash": hwid_hash},
+        )
+        if r.status_code != 200:
+            raise ApiError(f"validate-batch failed: {r.status_code} {r.text}")
+        return {res["product_code"]: res for res in r.json()["results"]}
@@ -0,0 +1,183 @@
+from __future__ import annotations
+import asyncio
+import random
+import uuid
+from typing import Optional, Dict, Any, List, Tuple
+import httpx
+from api import ApiError, RETRY_STATUS
+
+class AsyncLicensingApi:
+    """asyncio 앱용 라이선스 서버 클라이언트 (LicensingApi 와 같은 메서드/예외).
+
+    - httpx.AsyncClient 하나의 연결 풀을 공유하므로 asyncio.gather 로 여러 validate 를 동시에 실행 가능
+    - timeout 은 httpx 의 (connect/read/pool) timeout 으로 처리, 호출 task 가 취소되면 연결은 풀로 반환됨
+      (CancelledError 는 재시도하지 않고 그대로 전파)
+    - transport 를 주입할 수 있음 (예: httpx.ASGITransport(app=...) 로 서버 앱을 프로세스 내에서 호출)
+    """
+
+    def __init__(
+        self,
+        base_url: str,
+        timeout: float = 8.0,
+        connect_timeout: float = 3.0,
+        pool_size: int = 10,
+        max_retries: int = 3,
+        backoff_base: float = 0.25,
+        backoff_max: float = 4.0,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+    ):
+        self.base_url = base_url.rstrip("/")
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.retries = 0
+        self._http = httpx.AsyncClient(
+            base_url=self.base_url,
+            timeout=httpx.Timeout(timeout, connect=connect_timeout),
+            limits=httpx.Limits(max_connections=pool_size, max_keepalive_connections=pool_size),
+            transport=transport,
+        )
+        # product_code -> (ETag, 응답 body). 304 응답이면 캐시된 body 재사용
+        self._product_cache: Dict[str, Tuple[str, Dict[str, Any]]] = {}
+        self._features: Optional[List[str]] = None
+
+    async def aclose(self) -> None:
+        await self._http.aclose()
+
+    async def __aenter__(self) -> "AsyncLicensingApi":
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        await self.aclose()
+
+    def _backoff(self, attempt: int) -> float:
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+
+    async def _request(self, method: str, path: str, idempotent: bool = False, **kw: Any) -> httpx.Response:
+        attempts = self.max_retries + 1 if idempotent else 1
+        for attempt in range(attempts):
+            last = attempt == attempts - 1
+            try:
+                r = await self._http.request(method, path, **kw)
+            except httpx.TransportError:
+                # 연결 오류/타임아웃 (httpx.TimeoutException 포함)
+                if last:
+                    raise
+                self.retries += 1
+                await asyncio.sleep(self._backoff(attempt))
+                continue
+            retry_after = r.headers.get("Retry-After")
+            in_progress = r.status_code == 409 and retry_after is not None
+            if last or not (r.status_code in RETRY_STATUS or in_progress):
+                return r
+            self.retries += 1
+            delay = self._backoff(attempt)
+            if retry_after and retry_after.isdigit():
+                delay = max(delay, float(retry_after))
+            await asyncio.sleep(delay)
+        raise AssertionError("unreachable")
+
+    async def _post_idempotent(
+        self, path: str, json: Dict[str, Any], headers: Optional[Dict[str, str]] = None
+    ) -> httpx.Response:
+        headers = {**(headers or {}), "Idempotency-Key": str(uuid.uuid4())}
+        return await self._request("POST", path, idempotent=True, json=json, headers=headers)
+
+    async def server_features(self) -> List[str]:
+        if self._features is None:
+            try:
+                r = await self._request("GET", "/health", idempotent=True)
+                self._features = list(r.json().get("features", [])) if r.status_code == 200 else []
+            except (httpx.HTTPError, ValueError):
+                self._features = []
+        return self._features
+
+    async def supports(self, feature: str) -> bool:
+        return feature in await self.server_features()
+
+    async def register(self, email: str, password: str) -> None:
+        r = await self._request("POST", "/auth/register", json={"email": email, "password": password})
+        if r.status_code not in (200, 201):
+            raise ApiError(f"register failed: {r.status_code} {r.text}")
+
+    async def login(self, email: str, password: str, hwid_hash: str) -> Dict[str, Any]:
+        r = await self._post_idempotent(
+            "/auth/login",
+            {"email": email, "password": password, "hwid_hash": hwid_hash},
+        )
+        if r.status_code != 200:
+            raise ApiError(f"login failed: {r.status_code} {r.text}")
+        return r.json()
+
+    async def bootstrap(
+        self, email: str, password: str, hwid_hash: str, product_code: str, license_code: Optional[str] = None
+    ) -> Dict[str, Any]:
+        body: Dict[str, Any] = {
+            "email": email, "password": password, "hwid_hash": hwid_hash, "product_code": product_code,
+        }
+        if license_code:
+            body["license_code"] = license_code
+        r = await self._post_idempotent("/client/bootstrap", body)
+        if r.status_code != 200:
+            raise ApiError(f"bootstrap failed: {r.status_code} {r.text}")
+        return r.json()
+
+    async def logout(self, token: str) -> None:
+        r = await self._request("POST", "/auth/logout", headers={"Authorization": f"Bearer {token}"})
+        if r.status_code != 200:
+            raise ApiError(f"logout failed: {r.status_code} {r.text}")
+
+    async def heartbeat(self, token: str) -> str:
+        r = await self._request("POST", "/session/heartbeat", idempotent=True, headers={"Authorization": f"Bearer {token}"})
+        status = r.headers.get("X-Session-Status")
+        if r.status_code not in (204, 401) or not status:
+            raise ApiError(f"heartbeat failed: {r.status_code} {r.text}")
+        return status
+
+    async def get_product(self, product_code: str) -> Dict[str, Any]:
+        cached = self._product_cache.get(product_code)
+        headers = {"If-None-Match": cached[0]} if cached else {}
+        r = await self._request("GET", f"/products/{product_code}", idempotent=True, headers=headers)
+        if r.status_code == 304 and cached:
+            return dict(cached[1])
+        if r.status_code != 200:
+            raise ApiError(f"get_product failed: {r.status_code} {r.text}")
+        body = r.json()
+        etag = r.headers.get("ETag")
+        if etag:
+            self._product_cache[product_code] = (etag, body)
+        return body
+
+    async def redeem_license(self, token: str, product_code: str, license_code: str, hwid_hash: str) -> Dict[str, Any]:
+        r = await self._post_idempotent(
+            "/license/redeem",
+            {"product_code": product_code, "license_code": license_code, "hwid_hash": hwid_hash},
+            headers={"Authorization": f"Bearer {token}"},
+        )
+        if r.status_code != 200:
+            raise ApiError(f"redeem failed: {r.status_code} {r.text}")
+        return r.json()
+
+    async def validate_license(self, token: str, product_code: str, hwid_hash: str) -> Dict[str, Any]:
+        r = await self._request(
+            "POST",
+            "/license/validate",
+            idempotent=True,
+            headers={"Authorization": f"Bearer {token}"},
+            json={"product_code": product_code, "hwid_hash": hwid_hash},
+        )
+        if r.status_code != 200:
+            raise ApiError(f"validate failed: {r.status_code} {r.text}")
+        return r.json()
+
+    async def validate_licenses(self, token: str, product_codes: List[str], hwid_hash: str) -> Dict[str, Dict[str, Any]]:
+        r = await self._request(
+            "POST",
+            "/license/validate-batch",
+            idempotent=True,
+            headers={"Authorization": f"Bearer {token}"},
+            json={"product_codes": list(product_codes), "hwid_hash": hwid_hash},
+        )
+        if r.status_code != 200:
+            raise ApiError(f"validate-batch failed: {r.status_code} {r.text}")
+        return {res["product_code"]: res for res in r.json()["results"]}
@@ -8,10 +8,36 @@ PRODUCT_CODE = "demo_paid"  # demo_free 또는 demo_paid
 
 APP_NAME = "DemoApp"
 
-def get_state_path() -> str:
-    """PyInstaller(onefile)에서도 항상 쓰기 가능한 위치를 사용."""
-    # Windows: %APPDATA%\DemoApp\license_state.json
+# HTTP 전송 설정 (LicensingApi)
+HTTP_CONNECT_TIMEOUT_SEC = 3.0
+HTTP_READ_TIMEOUT_SEC = 8.0
+HTTP_POOL_SIZE = 4
+HTTP_MAX_RETRIES = 3  # 멱등 호출만 재시도 (jitter 지수 백오프)
+
+# 백그라운드 세션 heartbeat 주기(초). 0 이면 사용 안 함
+# 세션 TTL(서버 ACCESS_TOKEN_TTL_MIN)보다 충분히 짧게, revoke 감지 지연 = 최대 이 주기
+HEARTBEAT_INTERVAL_SEC = 300
+
+# HWID 수집 결과 캐시: guid/mac 이 같고 이 시간 이내면 재수집하지 않음
+HWID_CACHE_MAX_AGE_SEC = 7 * 24 * 3600
+
+# 오프라인 lease 검증용 공개키 {kid: base64url Ed25519 공개키} (admin_tools/generate_lease_keypair.py)
+# 비어 있으면 lease 를 쓰지 않고 매 실행마다 온라인 검증
+# lease 남은 시간이 RENEW_BEFORE 보다 적으면 온라인 검증으로 갱신 (서버 장애 시에는 남은 lease 로 실행)
+LEASE_PUBLIC_KEYS: dict = {}
+LEASE_RENEW_BEFORE_SEC = 6 * 3600
+
+def _app_dir() -> Path:
+    # Windows: %APPDATA%\DemoApp
     base = os.getenv("APPDATA") or str(Path.home())
     p = Path(base) / APP_NAME
     p.mkdir(parents=True, exist_ok=True)
-    return str(p / "license_state.json")
+    return p
+
+def get_hwid_cache_path() -> str:
+    return str(_app_dir() / "hwid_cache.json")
+
+def get_state_path() -> str:
+    """PyInstaller(onefile)에서도 항상 쓰기 가능한 위치를 사용."""
+    # Windows: %APPDATA%\DemoApp\license_state.json
+    return str(_app_dir() / "license_state.json")
@@ -0,0 +1,50 @@
+from __future__ import annotations
+import threading
+from typing import Callable, Optional
+from api import LicensingApi
+
+# 백그라운드 세션 heartbeat (선택)
+# - interval 초마다 POST /session/heartbeat (204, body 없음) 로 세션 TTL 을 연장
+# - 세션이 revoke/만료되면 on_lost(status) 를 한 번 호출하고 멈춤
+# - 네트워크 오류는 다음 주기에 다시 시도
+
+class SessionHeartbeat:
+    def __init__(
+        self,
+        api: LicensingApi,
+        token: str,
+        interval_sec: float,
+        on_lost: Optional[Callable[[str], None]] = None,
+    ):
+        self._api = api
+        self._token = token
+        self._interval = interval_sec
+        self._on_lost = on_lost
+        self._stopping = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.status = "active"
+
+    def _run(self) -> None:
+        while not self._stopping.wait(self._interval):
+            try:
+                status = self._api.heartbeat(self._token)
+            except Exception:
+                continue
+            self.status = status
+            if status != "active":
+                if self._on_lost is not None:
+                    self._on_lost(status)
+                return
+
+    def start(self) -> None:
+        if self._thread is not None or self._interval <= 0:
+            return
+        self._stopping.clear()
+        self._thread = threading.Thread(target=self._run, name="session-heartbeat", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        if self._thread is not None:
+            self._stopping.set()
+            self._thread.join()
+            self._thread = None
@@ -1,75 +1,206 @@
 from __future__ import annotations
+import glob
 import hashlib
 import json
 import os
-import re
 import subprocess
+import sys
+import time
 import uuid
-from typing import Dict, List, Tuple
+from dataclasses import dataclass
+from typing import Callable, Dict, Optional
 
-def _run_powershell(cmd: str) -> str:
-    # Windows에서만 기대. 실패하면 빈 문자열 반환.
-    try:
-        completed = subprocess.run(
-            ["powershell", "-NoProfile", "-ExecutionPolicy", "Bypass", "-Command", cmd],
-            stdout=subprocess.PIPE,
-            stderr=subprocess.DEVNULL,
-            text=True,
-            timeout=4,
-        )
-        return (completed.stdout or "").strip()
-    except Exception:
-        return ""
+# HWID 수집
+# - 플랫폼별 provider 가 같은 키(cpu/bios/disk/guid/mac)를 채움. 값이 없으면 빈 문자열
+#   (해시 형식은 그대로: 빈 값 제거 -> "key=value" 정렬 -> "|" 로 연결 -> sha256)
+# - Windows: CIM 조회를 PowerShell 프로세스 1개에서 한 번에 실행, MachineGuid 는 레지스트리 직접 조회
+# - Linux: /etc/machine-id, /sys/class/dmi/id/*, /sys/block/*/device/serial 파일을 직접 읽음
+# - 수집 결과는 로컬 캐시 파일에 저장하고, 값싼 필드(guid/mac)가 같고 MAX_AGE 이내면 재사용
+
+HWID_KEYS = ("cpu", "bios", "disk", "guid", "mac")
 
 def _safe_first_line(s: str) -> str:
     return (s.splitlines()[0].strip() if s else "")
 
-def _get_cpu_id() -> str:
-    # Win32_Processor.ProcessorId
-    out = _run_powershell("(Get-CimInstance Win32_Processor | Select-Object -First 1 -ExpandProperty ProcessorId)")
-    return _safe_first_line(out)
-
-def _get_bios_serial() -> str:
-    out = _run_powershell("(Get-CimInstance Win32_BIOS | Select-Object -First 1 -ExpandProperty SerialNumber)")
-    return _safe_first_line(out)
-
-def _get_disk_serial() -> str:
-    # PhysicalMedia SerialNumber가 비어있는 환경이 있어 DiskDrive SerialNumber도 시도
-    out = _run_powershell("(Get-CimInstance Win32_PhysicalMedia | Select-Object -First 1 -ExpandProperty SerialNumber)")
-    v = _safe_first_line(out)
-    if v:
-        return v
-    out2 = _run_powershell("(Get-CimInstance Win32_DiskDrive | Select-Object -First 1 -ExpandProperty SerialNumber)")
-    return _safe_first_line(out2)
-
-def _get_machine_guid() -> str:
-    # HKLM:\SOFTWARE\Microsoft\Cryptography\MachineGuid
-    out = _run_powershell("(Get-ItemProperty 'HKLM:\\SOFTWARE\\Microsoft\\Cryptography' -Name MachineGuid).MachineGuid")
-    return _safe_first_line(out)
-
 def _get_mac_address() -> str:
     # uuid.getnode(): MAC or random if not available
     mac = uuid.getnode()
     return f"{mac:012x}"
 
-def build_hwid_components() -> Dict[str, str]:
-    # 가능한 것들을 모아 “변화에 덜 민감한” 조합을 구성
-    # (CPU/BIOS/Disk는 교체 시 바뀔 수 있음. 정책에 따라 가중치/허용 범위 조정 가능)
-    return {
-        "cpu": _get_cpu_id(),
-        "bios": _get_bios_serial(),
-        "disk": _get_disk_serial(),
-        "guid": _get_machine_guid(),
-        "mac": _get_mac_address(),
-    }
-
-def hwid_hash_sha256() -> str:
-    comp = build_hwid_components()
+def _read_text(path: str) -> str:
+    try:
+        with open(path, "r", encoding="utf-8", errors="ignore") as f:
+            return _safe_first_line(f.read())
+    except OSError:
+        return ""
+
+class HwidProvider:
+    name = "fallback"
+
+    def quick(self) -> Dict[str, str]:
+        """캐시 유효성 확인용 값싼 필드 (프로세스 실행 없음)."""
+        return {"mac": _get_mac_address()}
+
+    def collect(self) -> Dict[str, str]:
+        return {k: "" for k in HWID_KEYS} | self.quick()
+
+# 한 번의 PowerShell 실행으로 CIM 값 조회 (기존 개별 조회와 같은 속성/우선순위)
+_WINDOWS_CIM_SCRIPT = r"""
+$o = @{}
+$o.cpu = (Get-CimInstance Win32_Processor | Select-Object -First 1 -ExpandProperty ProcessorId)
+$o.bios = (Get-CimInstance Win32_BIOS | Select-Object -First 1 -ExpandProperty SerialNumber)
+$d = (Get-CimInstance Win32_PhysicalMedia | Select-Object -First 1 -ExpandProperty SerialNumber)
+if (-not $d) { $d = (Get-CimInstance Win32_DiskDrive | Select-Object -First 1 -ExpandProperty SerialNumber) }
+$o.disk = $d
+$o | ConvertTo-Json -Compress
+"""
+
+class WindowsHwidProvider(HwidProvider):
+    name = "windows"
+
+    def _machine_guid(self) -> str:
+        # HKLM:\SOFTWARE\Microsoft\Cryptography\MachineGuid
+        try:
+            import winreg
+            with winreg.OpenKey(
+                winreg.HKEY_LOCAL_MACHINE, r"SOFTWARE\Microsoft\Cryptography", 0,
+                winreg.KEY_READ | winreg.KEY_WOW64_64KEY,
+            ) as k:
+                return str(winreg.QueryValueEx(k, "MachineGuid")[0]).strip()
+        except Exception:
+            return ""
+
+    def _cim(self) -> Dict[str, str]:
+        # 실패하면 빈 dict
+        try:
+            completed = subprocess.run(
+                ["powershell", "-NoProfile", "-NonInteractive", "-ExecutionPolicy", "Bypass", "-Command", _WINDOWS_CIM_SCRIPT],
+                stdout=subprocess.PIPE,
+                stderr=subprocess.DEVNULL,
+                text=True,
+                timeout=10,
+            )
+            data = json.loads(completed.stdout or "{}")
+        except Exception:
+            return {}
+        return {k: _safe_first_line(str(data.get(k) or "")) for k in ("cpu", "bios", "disk")}
+
+    def quick(self) -> Dict[str, str]:
+        return {"guid": self._machine_guid(), "mac": _get_mac_address()}
+
+    def collect(self) -> Dict[str, str]:
+        return {"cpu": "", "bios": "", "disk": ""} | self._cim() | self.quick()
+
+class LinuxHwidProvider(HwidProvider):
+    name = "linux"
+
+    def _disk_serial(self) -> str:
+        # 가상/임시 장치 제외, 이름순 첫 번째 물리 디스크의 serial
+        for path in sorted(glob.glob("/sys/block/*/device/serial")):
+            dev = path.split("/")[3]
+            if dev.startswith(("loop", "ram", "zram", "dm-", "md", "sr")):
+                continue
+            serial = _read_text(path)
+            if serial:
+                return serial
+        return ""
+
+    def quick(self) -> Dict[str, str]:
+        guid = _read_text("/etc/machine-id") or _read_text("/var/lib/dbus/machine-id")
+        return {"guid": guid, "mac": _get_mac_address()}
+
+    def collect(self) -> Dict[str, str]:
+        # product_serial/board_serial 은 보통 root 전용 -> 읽지 못하면 빈 값
+        bios = _read_text("/sys/class/dmi/id/product_serial") or _read_text("/sys/class/dmi/id/board_serial")
+        return {
+            "cpu": "",  # ProcessorId 에 해당하는 값은 root/cpuid 없이 얻을 수 없음
+            "bios": bios,
+            "disk": self._disk_serial(),
+            **self.quick(),
+        }
+
+# sys.platform 접두사 -> provider. register_provider 로 추가/교체 가능
+_PROVIDERS: Dict[str, Callable[[], HwidProvider]] = {
+    "win32": WindowsHwidProvider,
+    "linux": LinuxHwidProvider,
+}
+
+def register_provider(platform_prefix: str, factory: Callable[[], HwidProvider]) -> None:
+    _PROVIDERS[platform_prefix] = factory
+
+def get_provider(platform: Optional[str] = None) -> HwidProvider:
+    platform = platform or sys.platform
+    for prefix, factory in _PROVIDERS.items():
+        if platform.startswith(prefix):
+            return factory()
+    return HwidProvider()
+
+@dataclass
+class HwidResult:
+    components: Dict[str, str]
+    hash: str
+    provider: str
+    from_cache: bool
+    elapsed_ms: float
+
+def _hash_components(comp: Dict[str, str]) -> str:
     # 빈 값 제거 후 정규화
     items = [f"{k}={comp[k].strip().lower()}" for k in sorted(comp.keys()) if comp[k]]
     raw = "|".join(items).encode("utf-8")
     return hashlib.sha256(raw).hexdigest()
 
+def _load_cache(path: str) -> Optional[dict]:
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except Exception:
+        return None
+
+def _save_cache(path: str, data: dict) -> None:
+    try:
+        tmp = path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False, indent=2)
+        os.replace(tmp, path)
+    except OSError:
+        pass  # 캐시는 최적화일 뿐, 실패해도 수집 결과는 그대로 사용
+
+def collect_hwid(
+    cache_path: Optional[str] = None,
+    max_age_sec: float = 7 * 24 * 3600,
+    provider: Optional[HwidProvider] = None,
+) -> HwidResult:
+    t0 = time.perf_counter()
+    provider = provider or get_provider()
+    quick = provider.quick()
+    if cache_path:
+        cached = _load_cache(cache_path)
+        if (
+            cached
+            and cached.get("provider") == provider.name
+            and time.time() - float(cached.get("collected_at", 0)) < max_age_sec
+            and all(cached.get("components", {}).get(k) == v for k, v in quick.items())
+        ):
+            comp = {k: str(cached["components"].get(k, "")) for k in HWID_KEYS}
+            return HwidResult(comp, _hash_components(comp), provider.name, True, (time.perf_counter() - t0) * 1000)
+
+    comp = provider.collect()
+    if cache_path:
+        _save_cache(cache_path, {"provider": provider.name, "collected_at": time.time(), "components": comp})
+    return HwidResult(comp, _hash_components(comp), provider.name, False, (time.perf_counter() - t0) * 1000)
+
+def build_hwid_components() -> Dict[str, str]:
+    # 가능한 것들을 모아 “변화에 덜 민감한” 조합을 구성
+    # (CPU/BIOS/Disk는 교체 시 바뀔 수 있음. 정책에 따라 가중치/허용 범위 조정 가능)
+    return get_provider().collect()
+
+def hwid_hash_sha256(cache_path: Optional[str] = None, max_age_sec: float = 7 * 24 * 3600) -> str:
+    if cache_path is None:
+        return _hash_components(build_hwid_components())
+    return collect_hwid(cache_path, max_age_sec).hash
+
 if __name__ == "__main__":
-    print("HWID components:", json.dumps(build_hwid_components(), indent=2))
-    print("HWID hash:", hwid_hash_sha256())
+    res = collect_hwid()
+    print("HWID provider:", res.provider, f"({res.elapsed_ms:.1f} ms)")
+    print("HWID components:", json.dumps(res.components, indent=2))
+    print("HWID hash:", res.hash)
@@ -0,0 +1,48 @@
+from __future__ import annotations
+import base64
+import json
+import time
+from typing import Any, Dict, Optional
+
+# 서버가 발급한 오프라인 lease(LEASE1.<payload>.<sig>, Ed25519) 검증
+# - 공개키만 사용 (SERVER_SECRET 없음), 키는 kid 로 선택
+# - product/HWID/만료를 확인해 통과한 payload 반환, 아니면 None
+# cryptography 가 없으면 항상 None (온라인 검증으로 동작)
+
+PREFIX = "LEASE1"
+CLOCK_SKEW_SEC = 300
+
+def _b64d(s: str) -> bytes:
+    return base64.urlsafe_b64decode(s + "=" * (-len(s) % 4))
+
+def verify_lease(
+    lease: str, public_keys: Dict[str, str], product_code: str, hwid_hash: str, now: Optional[float] = None
+) -> Optional[Dict[str, Any]]:
+    try:
+        from cryptography.exceptions import InvalidSignature
+        from cryptography.hazmat.primitives.asymmetric.ed25519 import Ed25519PublicKey
+    except ImportError:
+        return None
+    parts = (lease or "").split(".")
+    if len(parts) != 3 or parts[0] != PREFIX:
+        return None
+    try:
+        payload_bytes, sig = _b64d(parts[1]), _b64d(parts[2])
+        payload = json.loads(payload_bytes.decode("utf-8"))
+        key = public_keys.get(payload.get("kid"))
+        if not key:
+            return None
+        Ed25519PublicKey.from_public_bytes(_b64d(key)).verify(sig, payload_bytes)
+    except (InvalidSignature, ValueError, TypeError, AttributeError):
+        return None
+
+    now = time.time() if now is None else now
+    if payload.get("v") != 1 or payload.get("product") != product_code or payload.get("hwid") != hwid_hash:
+        return None
+    if not (payload.get("iat", 0) - CLOCK_SKEW_SEC <= now < payload.get("exp", 0)):
+        return None
+    return payload
+
+def lease_remaining_sec(payload: Dict[str, Any], now: Optional[float] = None) -> float:
+    now = time.time() if now is None else now
+    return float(payload["exp"]) - now
@@ -2,9 +2,12 @@ from __future__ import annotations
 import getpass
 import sys
 import traceback
+import requests
 from api import LicensingApi, ApiError
-from hwid import hwid_hash_sha256
-from state import load_state, save_state
+from heartbeat import SessionHeartbeat
+from hwid import collect_hwid
+from lease import lease_remaining_sec, verify_lease
+from state import get_lease, load_state, put_lease, save_state
 import config
 
 def _fatal(msg: str, code: int = 1) -> None:
@@ -26,21 +29,72 @@ def run_business_logic():
     print("... (여기에 실제 프로그램 기능 구현) ...")
     input("\n엔터를 누르면 종료합니다...")
 
+def _redeem_and_validate(api: LicensingApi, token: str, hwid: str, state: dict, state_path) -> dict:
+    # Paid이면 라이선스 등록/검증 필수
+    license_code = state.get("license_code")
+    if not license_code:
+        print("\n유료 제품입니다. 라이선스 코드 등록이 필요합니다.")
+        license_code = _prompt_license()
+        redeem = api.redeem_license(token, config.PRODUCT_CODE, license_code, hwid)
+        print("✅ License redeemed:", redeem)
+        state["license_code"] = license_code
+        save_state(state_path, state)
+
+    # 라이선스 검증
+    return api.validate_license(token, config.PRODUCT_CODE, hwid)
+
+def _check_validation(is_paid: bool, v: dict) -> None:
+    if is_paid:
+        if not v.get("valid"):
+            _fatal(f"License validation failed: {v}")
+        print("✅ License validation OK.", v)
+    else:
+        # Free면 로그인만으로 OK (서버 validate도 true)
+        if not v.get("valid"):
+            _fatal(f"Validation failed: {v}")
+        print("✅ Free product validation OK.")
+
+def _print_product(product: dict) -> None:
+    print(f"Product: {product['name']} ({product['code']}) / paid={bool(product['is_paid'])}")
+
+def _local_lease(state: dict, hwid: str):
+    # 저장된 lease 가 이 제품/HWID 에 대해 아직 유효하면 payload, 아니면 None
+    if not config.LEASE_PUBLIC_KEYS:
+        return None
+    lease = get_lease(state, config.PRODUCT_CODE)
+    return verify_lease(lease, config.LEASE_PUBLIC_KEYS, config.PRODUCT_CODE, hwid) if lease else None
+
+def _store_lease(state: dict, state_path, hwid: str, v: dict) -> None:
+    lease = v.get("lease")
+    if config.LEASE_PUBLIC_KEYS and lease and verify_lease(lease, config.LEASE_PUBLIC_KEYS, config.PRODUCT_CODE, hwid):
+        put_lease(state_path, state, config.PRODUCT_CODE, lease)
+
 def main():
-    hwid = hwid_hash_sha256()
-    api = LicensingApi(config.SERVER_BASE_URL)
+    hw = collect_hwid(config.get_hwid_cache_path(), config.HWID_CACHE_MAX_AGE_SEC)
+    hwid = hw.hash
+    api = LicensingApi(
+        config.SERVER_BASE_URL,
+        timeout=config.HTTP_READ_TIMEOUT_SEC,
+        connect_timeout=config.HTTP_CONNECT_TIMEOUT_SEC,
+        pool_size=config.HTTP_POOL_SIZE,
+        max_retries=config.HTTP_MAX_RETRIES,
+    )
     state_path = config.get_state_path()
     state = load_state(state_path)
 
+    # 유효한 오프라인 lease 가 있고 만료가 충분히 남았으면 서버 접속 없이 실행
+    lease = _local_lease(state, hwid)
+    if lease is not None and lease_remaining_sec(lease) > config.LEASE_RENEW_BEFORE_SEC:
+        print(f"✅ Offline lease OK ({lease['email']}, {lease_remaining_sec(lease) / 3600:.1f}h left). Skipping server check.")
+        run_business_logic()
+        return
+
     try:
-        # 제품 정보 조회 (Free/Paid 분기)
-        product = api.get_product(config.PRODUCT_CODE)
-        is_paid = bool(product["is_paid"])
-        print(f"Product: {product['name']} ({product['code']}) / paid={is_paid}")
-        print(f"HWID hash: {hwid}")
+        print(f"HWID hash: {hwid} ({hw.provider}, {'cached' if hw.from_cache else 'collected'} in {hw.elapsed_ms:.0f} ms)")
         print(f"State file: {state_path}")
 
-        # 로그인 (동시 세션 정책: 이미 활성 세션 있으면 서버가 거절)
+        # 입력은 네트워크 요청 전에 모두 받음: 이후 시작 요청들이 keep-alive 연결 하나로 연달아 처리됨
+        # (입력 대기 중에 서버가 유휴 연결을 닫지 않도록)
         email = state.get("email") or ""
         if email:
             use_saved = input(f"Use saved email '{email}'? (Y/n): ").strip().lower() != "n"
@@ -53,38 +107,49 @@ def main():
             # 비밀번호는 로컬에 저장하지 않는 것을 권장. (샘플에서는 매번 입력)
             password = getpass.getpass("Password: ").strip()
 
-        token_resp = api.login(email, password, hwid)
+        # 서버가 /client/bootstrap 을 지원하면 제품 조회/로그인/검증을 한 번의 요청으로 처리
+        use_bootstrap = api.supports("bootstrap")
+        if not use_bootstrap:
+            # 제품 정보 조회 (Free/Paid 분기)
+            product = api.get_product(config.PRODUCT_CODE)
+            _print_product(product)
+
+        # 로그인 (동시 세션 정책: 이미 활성 세션 있으면 서버가 거절)
+        v = None
+        if use_bootstrap:
+            boot = api.bootstrap(email, password, hwid, config.PRODUCT_CODE)
+            token_resp, product, v = boot["token"], boot["product"], boot["validation"]
+            _print_product(product)
+        else:
+            token_resp = api.login(email, password, hwid)
         token = token_resp["access_token"]
+        is_paid = bool(product["is_paid"])
         print("✅ Login OK. Session token issued.")
         state["email"] = email
         save_state(state_path, state)
 
         try:
-            # Paid이면 라이선스 등록/검증 필수
-            if is_paid:
-                license_code = state.get("license_code")
-                if not license_code:
-                    print("\n유료 제품입니다. 라이선스 코드 등록이 필요합니다.")
-                    license_code = _prompt_license()
-                    redeem = api.redeem_license(token, config.PRODUCT_CODE, license_code, hwid)
-                    print("✅ License redeemed:", redeem)
-                    state["license_code"] = license_code
-                    save_state(state_path, state)
-
-                # 라이선스 검증
+            if is_paid and (v is None or v.get("reason") == "NO_LICENSE"):
+                # bootstrap 결과 라이선스가 없을 때만 redeem 흐름으로 (추가 왕복)
+                v = _redeem_and_validate(api, token, hwid, state, state_path)
+            elif v is None:
                 v = api.validate_license(token, config.PRODUCT_CODE, hwid)
-                if not v.get("valid"):
-                    _fatal(f"License validation failed: {v}")
-                print("✅ License validation OK.", v)
-            else:
-                # Free면 로그인만으로 OK (서버 validate도 true)
-                v = api.validate_license(token, config.PRODUCT_CODE, hwid)
-                if not v.get("valid"):
-                    _fatal(f"Validation failed: {v}")
-                print("✅ Free product validation OK.")
+            _check_validation(is_paid, v)
+            _store_lease(state, state_path, hwid, v)
+            net = api.connection_stats()
+            print(f"Network: {net['requests']} request(s) over {net['connections_opened']} connection(s), "
+                  f"retries={net['retries']}")
 
-            # 여기까지 통과해야 앱 실행
-            run_business_logic()
+            # 여기까지 통과해야 앱 실행 (실행 중에는 heartbeat 로 세션 유지 + revoke 감지)
+            hb = SessionHeartbeat(
+                api, token, config.HEARTBEAT_INTERVAL_SEC,
+                on_lost=lambda status: print(f"\n[WARN] session {status}. 다시 로그인이 필요합니다."),
+            )
+            hb.start()
+            try:
+                run_business_logic()
+            finally:
+                hb.stop()
 
         finally:
             # 로그아웃(세션 해제) - 실패해도 앱 종료는 진행
@@ -96,11 +161,19 @@ def main():
 
     except ApiError as e:
         _fatal(str(e))
+    except requests.RequestException as e:
+        # 서버에 닿지 않지만 아직 만료되지 않은 lease 가 있으면 그것으로 실행 (짧은 장애 대응)
+        if lease is None:
+            _fatal(f"Server unreachable: {e}")
+        print(f"[WARN] server unreachable, using offline lease ({lease_remaining_sec(lease) / 3600:.1f}h left)")
+        run_business_logic()
     except KeyboardInterrupt:
         _fatal("Interrupted.", 130)
     except Exception as e:
         traceback.print_exc()
         _fatal(f"Unexpected error: {e}")
+    finally:
+        api.close()
 
 if __name__ == "__main__":
     main()
@@ -17,3 +17,17 @@ def save_state(path: str, state: Dict[str, Any]) -> None:
     with open(tmp, "w", encoding="utf-8") as f:
         json.dump(state, f, ensure_ascii=False, indent=2)
     os.replace(tmp, path)
+
+# 오프라인 lease: state["leases"][product_code] = lease 문자열
+
+def get_lease(state: Dict[str, Any], product_code: str) -> Optional[str]:
+    return (state.get("leases") or {}).get(product_code)
+
+def put_lease(path: str, state: Dict[str, Any], product_code: str, lease: Optional[str]) -> None:
+    leases = dict(state.get("leases") or {})
+    if lease:
+        leases[product_code] = lease
+    else:
+        leases.pop(product_code, None)
+    state["leases"] = leases
+    save_state(path, state)
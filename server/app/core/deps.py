@@ -1,52 +1,153 @@
 from __future__ import annotations
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from datetime import datetime
-from app.db.database import get_db
+from typing import Iterable
+from app.db.database import get_db, get_async_db
 from app.db import models
-from app.core.security import sha256_hex, utcnow, expires_at_from_now
+from app.core.security import constant_time_equal, utcnow, expires_at_from_now
 from app.core.config import settings
+from app.core.touch_buffer import touch_buffer
+from app.core.session_cache import session_cache, SessionInfo, UserInfo
+from app.core.event_bus import record_session_revoked
+from app.core.session_token import TokenRef, parse_session_token
 
 bearer = HTTPBearer(auto_error=False)
 
-def _session_is_expired(s: models.Session) -> bool:
+def session_last_seen(s: models.Session | SessionInfo) -> datetime:
+    # DB 값과 아직 flush되지 않은 touch 중 최신 값
+    pending = touch_buffer.pending(s.id)
+    if pending is not None and pending > s.last_seen_at:
+        return pending
+    return s.last_seen_at
+
+def _session_is_expired(s: models.Session | SessionInfo) -> bool:
     # last_seen 기준 TTL
     ttl = settings.ACCESS_TOKEN_TTL_MIN
-    return (utcnow() - s.last_seen_at).total_seconds() > ttl * 60
+    return (utcnow() - session_last_seen(s)).total_seconds() > ttl * 60
 
-def get_current_session(
-    creds: HTTPAuthorizationCredentials = Depends(bearer),
-    db: Session = Depends(get_db),
-) -> models.Session:
+def revoke_sessions(db: Session, session_ids: Iterable[int], reason: str) -> None:
+    """세션 revoke(logout/만료/관리자) 공통 처리. commit은 호출자가 한다."""
+    ids = list(session_ids)
+    if not ids:
+        return
+    # SSE 구독자용 이벤트 (같은 트랜잭션, 아직 활성인 세션만)
+    record_session_revoked(db, ids, reason)
+    (
+        db.query(models.Session)
+          .filter(models.Session.id.in_(ids), models.Session.is_active == True)  # noqa: E712
+          .update(
+              {"is_active": False, "revoked_at": utcnow(), "revoke_reason": reason},
+              synchronize_session=False,
+          )
+    )
+    session_cache.invalidate_sessions(ids)
+    for sid in ids:
+        touch_buffer.discard(sid)
+
+def _load_session_info(db: Session, ref: TokenRef) -> SessionInfo | None:
+    # 세션 + 사용자 email을 한 번의 쿼리로 조회 (새 포맷 토큰은 PK, 기존 토큰은 token_hash 인덱스)
+    q = db.query(models.Session, models.User.email).join(models.User, models.User.id == models.Session.user_id)
+    if ref.session_id is not None:
+        row = q.filter(models.Session.id == ref.session_id).first()
+        if row is not None and not constant_time_equal(row[0].token_hash, ref.token_hash):
+            row = None
+    else:
+        row = q.filter(models.Session.token_hash == ref.token_hash).first()
+    if row is None:
+        return None
+    s, email = row
+    return SessionInfo(
+        id=s.id,
+        user_id=s.user_id,
+        user_email=email,
+        token_hash=s.token_hash,
+        hwid_hash=s.hwid_hash,
+        created_at=s.created_at,
+        last_seen_at=s.last_seen_at,
+        is_active=s.is_active,
+        revoke_reason=s.revoke_reason,
+    )
+
+def _token_ref(creds: HTTPAuthorizationCredentials | None) -> TokenRef:
+    # 형식/HMAC tag 가 맞지 않는 토큰은 DB 에 가기 전에 거절
     if creds is None or not creds.scheme.lower().startswith("bearer"):
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Missing token")
+    ref = parse_session_token(creds.credentials.strip())
+    if ref is None:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid session")
+    return ref
 
-    token = creds.credentials.strip()
-    token_hash = sha256_hex(token.encode("utf-8"))
-
-    s = db.query(models.Session).filter(models.Session.token_hash == token_hash).first()
+def _load_active_session(db: Session, ref: TokenRef) -> SessionInfo:
+    s = _load_session_info(db, ref)
     if not s or not s.is_active:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid session")
+    session_cache.put(s)
+    return s
+
+def _expire_session(db: Session, s: SessionInfo) -> None:
+    revoke_sessions(db, [s.id], "EXPIRED")
+    db.commit()
+    raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Session expired")
+
+def _touch(s: SessionInfo) -> None:
+    # last_seen 갱신: write-behind 버퍼에 기록 (GRANULARITY 이내면 생략)
+    now = utcnow()
+    if (now - session_last_seen(s)).total_seconds() >= settings.SESSION_TOUCH_GRANULARITY_SEC:
+        touch_buffer.touch(s.id, now)
+        s.last_seen_at = now
 
+def get_current_session(
+    creds: HTTPAuthorizationCredentials = Depends(bearer),
+    db: Session = Depends(get_db),
+) -> SessionInfo:
+    return authenticate_session(db, _token_ref(creds))
+
+def authenticate_session(db: Session, ref: TokenRef) -> SessionInfo:
+    """캐시 또는 DB 에서 활성 세션 확인 + 만료 처리 + touch. 실패하면 401."""
+    s = session_cache.get(ref.token_hash) or _load_active_session(db, ref)
+    if _session_is_expired(s):
+        _expire_session(db, s)
+    _touch(s)
+    return s
+
+def session_status(db: Session, ref: TokenRef) -> str:
+    """heartbeat 용 상태 확인 + touch. "active" | "expired" | "revoked" | "invalid" (401 대신 상태로 반환)."""
+    s = session_cache.get(ref.token_hash)
+    if s is None:
+        s = _load_session_info(db, ref)
+        if s is None:
+            return "invalid"
+        if not s.is_active:
+            return "expired" if s.revoke_reason == "EXPIRED" else "revoked"
+        session_cache.put(s)
     if _session_is_expired(s):
-        s.is_active = False
-        s.revoked_at = utcnow()
-        s.revoke_reason = "EXPIRED"
+        revoke_sessions(db, [s.id], "EXPIRED")
         db.commit()
-        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Session expired")
+        return "expired"
+    _touch(s)
+    return "active"
 
-    # last_seen 갱신
-    s.last_seen_at = utcnow()
-    db.commit()
-    db.refresh(s)
+def get_current_user(sess: SessionInfo = Depends(get_current_session)) -> UserInfo:
+    # 사용자 정보는 세션 조회 시 함께 읽어 둔 값을 사용 (추가 쿼리 없음)
+    return UserInfo(id=sess.user_id, email=sess.user_email)
+
+# async 모드용 의존성: 동일 로직을 AsyncSession.run_sync 로 실행 (캐시 hit 이면 DB 접근 없음)
+
+async def get_current_session_async(
+    creds: HTTPAuthorizationCredentials = Depends(bearer),
+    db: AsyncSession = Depends(get_async_db),
+) -> SessionInfo:
+    ref = _token_ref(creds)
+    s = session_cache.get(ref.token_hash)
+    if s is None:
+        s = await db.run_sync(_load_active_session, ref)
+    if _session_is_expired(s):
+        await db.run_sync(_expire_session, s)
+    _touch(s)
     return s
 
-def get_current_user(
-    sess: models.Session = Depends(get_current_session),
-    db: Session = Depends(get_db),
-) -> models.User:
-    u = db.query(models.User).filter(models.User.id == sess.user_id).first()
-    if not u:
-        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="User not found")
-    return u
+async def get_current_user_async(sess: SessionInfo = Depends(get_current_session_async)) -> UserInfo:
+    return UserInfo(id=sess.user_id, email=sess.user_email)
@@ -0,0 +1,150 @@
+from __future__ import annotations
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Iterable, Optional
+from sqlalchemy import or_, select
+from sqlalchemy.orm import Session
+from app.db import models
+from app.core.security import utcnow
+from app.core.event_bus import record_license_revoked
+
+# entitlements 테이블 유지 관리
+# - (user_id, product_id)당 1행: 가장 좋은 라이선스의 만료일/바인딩 HWID/revoke 상태
+# - redeem/revoke 시 refresh_entitlement로 갱신, validate는 PK 1회 조회로 판정
+# - 만료는 읽을 때 expires_at 비교로 판정 (가장 늦은 만료일을 저장하므로 별도 갱신 불필요)
+# - 순위는 HWID 와 무관 -> 저장된 행이 다른 HWID 에 bind 되어 있으면 licenses_for_hwid 로
+#   요청 HWID 에서 쓸 수 있는 라이선스를 license_codes 에서 다시 고름 (HWID 가 여러 개인 계정만 해당)
+# - rebuild_entitlements: license_codes 로부터 전체 재계산 (backfill / drift 점검)
+
+def _rank(lc: models.LicenseCode) -> tuple:
+    # revoke되지 않은 것 > 만료 없음 > 만료일이 늦은 것 > 최근 redeem
+    return (
+        not lc.is_revoked,
+        lc.expires_at is None,
+        lc.expires_at or datetime.min,
+        lc.redeemed_at or datetime.min,
+    )
+
+def best_license(lcs: Iterable[models.LicenseCode]) -> Optional[models.LicenseCode]:
+    return max(lcs, key=_rank, default=None)
+
+def bound_elsewhere(ent: models.Entitlement | None, hwid_hash: str) -> bool:
+    """저장된 가장 좋은 라이선스가 다른 HWID 에 bind 되어 있는지."""
+    return ent is not None and ent.bound_hwid_hash is not None and ent.bound_hwid_hash != hwid_hash
+
+def licenses_for_hwid(
+    db: Session, user_id: int, product_ids: Iterable[int], hwid_hash: str
+) -> dict[int, models.LicenseCode]:
+    """product_id -> 이 HWID 에서 쓸 수 있는(revoke 안 됨, 미bind 또는 같은 HWID) 가장 좋은 라이선스."""
+    lc = models.LicenseCode
+    by_product: dict[int, list[models.LicenseCode]] = {}
+    for row in db.execute(
+        select(lc).where(
+            lc.redeemed_by_user_id == user_id,
+            lc.product_id.in_(list(product_ids)),
+            lc.is_revoked == False,  # noqa: E712
+            or_(lc.bound_hwid_hash.is_(None), lc.bound_hwid_hash == hwid_hash),
+        )
+    ).scalars():
+        by_product.setdefault(row.product_id, []).append(row)
+    return {pid: best_license(rows) for pid, rows in by_product.items()}
+
+def _apply(ent: models.Entitlement, lc: models.LicenseCode) -> bool:
+    """ent를 lc 기준으로 맞춘다. 변경이 있었으면 True."""
+    values = {
+        "license_code_id": lc.id,
+        "expires_at": lc.expires_at,
+        "bound_hwid_hash": lc.bound_hwid_hash,
+        "is_revoked": lc.is_revoked,
+    }
+    changed = False
+    for k, v in values.items():
+        if getattr(ent, k) != v:
+            setattr(ent, k, v)
+            changed = True
+    if changed:
+        ent.updated_at = utcnow()
+    return changed
+
+def refresh_entitlement(db: Session, user_id: int, product_id: int) -> Optional[models.Entitlement]:
+    """(user, product)의 entitlement 행을 license_codes 기준으로 다시 계산. commit은 호출자가 한다."""
+    db.flush()
+    lcs = (
+        db.query(models.LicenseCode)
+          .filter(models.LicenseCode.redeemed_by_user_id == user_id, models.LicenseCode.product_id == product_id)
+          .all()
+    )
+    ent = db.get(models.Entitlement, (user_id, product_id))
+    lc = best_license(lcs)
+    if lc is None:
+        if ent is not None:
+            db.delete(ent)
+        return None
+    if ent is None:
+        ent = models.Entitlement(user_id=user_id, product_id=product_id)
+        db.add(ent)
+    _apply(ent, lc)
+    return ent
+
+def revoke_license(db: Session, lc: models.LicenseCode, reason: str) -> None:
+    """라이선스 정지 + entitlement 반영. commit은 호출자가 한다."""
+    lc.is_revoked = True
+    lc.revoke_reason = reason
+    if lc.redeemed_by_user_id is not None:
+        refresh_entitlement(db, lc.redeemed_by_user_id, lc.product_id)
+        record_license_revoked(db, lc.redeemed_by_user_id, lc.product.code, reason)
+
+@dataclass
+class RebuildReport:
+    checked: int = 0
+    missing: list[tuple[int, int]] = field(default_factory=list)
+    stale: list[tuple[int, int]] = field(default_factory=list)
+    orphaned: list[tuple[int, int]] = field(default_factory=list)
+
+    @property
+    def drift(self) -> int:
+        return len(self.missing) + len(self.stale) + len(self.orphaned)
+
+def rebuild_entitlements(db: Session, apply: bool = True) -> RebuildReport:
+    """license_codes 로부터 entitlements 전체를 재계산. apply=False면 drift만 보고."""
+    report = RebuildReport()
+    best: dict[tuple[int, int], models.LicenseCode] = {}
+    q = (
+        select(models.LicenseCode)
+          .where(models.LicenseCode.redeemed_by_user_id.isnot(None))
+          .execution_options(yield_per=1000)
+    )
+    for lc in db.execute(q).scalars():
+        key = (lc.redeemed_by_user_id, lc.product_id)
+        cur = best.get(key)
+        if cur is None or _rank(lc) > _rank(cur):
+            best[key] = lc
+
+    existing = {(e.user_id, e.product_id): e for e in db.query(models.Entitlement)}
+    for key, lc in best.items():
+        report.checked += 1
+        ent = existing.pop(key, None)
+        if ent is None:
+            report.missing.append(key)
+            if apply:
+                ent = models.Entitlement(user_id=key[0], product_id=key[1])
+                db.add(ent)
+                _apply(ent, lc)
+            continue
+        if apply:
+            if _apply(ent, lc):
+                report.stale.append(key)
+        elif (ent.license_code_id, ent.expires_at, ent.bound_hwid_hash, ent.is_revoked) != (
+            lc.id, lc.expires_at, lc.bound_hwid_hash, lc.is_revoked
+        ):
+            report.stale.append(key)
+
+    # 대응하는 license_codes 가 없는 행
+    for key, ent in existing.items():
+        report.orphaned.append(key)
+        if apply:
+            db.delete(ent)
+
+    if apply:
+        db.commit()
+    return report
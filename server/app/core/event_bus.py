@@ -0,0 +1,242 @@
+from __future__ import annotations
+import asyncio
+import json
+import logging
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Any, Callable, Iterable, Optional
+from sqlalchemy import delete, func, insert, literal, select
+from sqlalchemy.orm import Session
+from app.db import models
+from app.db.database import SessionLocal
+from app.core.config import settings
+from app.core.security import utcnow
+
+# revoke 이벤트 pub/sub (GET /session/events, SSE)
+# - 기록: revoke_sessions / revoke_license 가 같은 트랜잭션에서 session_events 에 INSERT
+#   -> commit 된 revoke 만 전달되고, id(autoincrement) 가 워커 간 공통 cursor 가 됨
+# - 전달: 워커마다 폴러 task 하나가 POLL_INTERVAL 마다 cursor 이후 행을 읽어
+#   이 워커에 연결된 구독자 큐로 fan-out (연결 수와 무관하게 워커당 주기 1회 조회)
+# - 구독자 큐가 넘치면 overflowed 표시 후 연결 종료 -> 클라이언트가 Last-Event-ID 로 재개 (DB 에서 backfill)
+# - id 는 INSERT 순서이지 commit 순서가 아님 (PostgreSQL: 작은 id 의 트랜잭션이 더 늦게 commit 될 수 있음)
+#   -> 폴링마다 cursor 이하라도 created_at 이 EVENTS_LOOKBACK_SEC 안인 행을 다시 조회하고,
+#      이미 전달한 id 는 건너뜀 (창 안의 id 만 기억). Last-Event-ID backfill 도 같은 창으로 재조회 (at-least-once)
+
+log = logging.getLogger(__name__)
+
+_ev = models.SessionEvent.__table__
+_s = models.Session.__table__
+
+SESSION_REVOKED = "session_revoked"
+LICENSE_REVOKED = "license_revoked"
+
+@dataclass(frozen=True)
+class Event:
+    id: int
+    user_id: int
+    session_id: Optional[int]
+    kind: str
+    data: dict[str, Any]
+    created_at: datetime
+
+def _dumps(data: dict[str, Any]) -> str:
+    return json.dumps(data, separators=(",", ":"), ensure_ascii=False)
+
+def record_session_revoked(db: Session, session_ids: list[int], reason: str, active_only: bool = True) -> None:
+    """세션마다 session_revoked 이벤트. commit은 호출자가 한다.
+
+    기본은 아직 활성인 세션만 (revoke UPDATE 전에 호출). active_only=False 는 UPDATE ... RETURNING 으로
+    방금 revoke 한 id 를 넘길 때 (UPDATE 후 호출)."""
+    q = select(
+        _s.c.user_id, _s.c.id, literal(SESSION_REVOKED), literal(_dumps({"reason": reason})), literal(utcnow()),
+    ).where(_s.c.id.in_(session_ids))
+    if active_only:
+        q = q.where(_s.c.is_active == True)  # noqa: E712
+    db.execute(insert(_ev).from_select(["user_id", "session_id", "kind", "data", "created_at"], q))
+
+def record_license_revoked(db: Session, user_id: int, product_code: str, reason: str) -> None:
+    db.execute(
+        insert(_ev).values(
+            user_id=user_id, session_id=None, kind=LICENSE_REVOKED,
+            data=_dumps({"product_code": product_code, "reason": reason}), created_at=utcnow(),
+        )
+    )
+
+def _row_event(row) -> Event:
+    return Event(row.id, row.user_id, row.session_id, row.kind, json.loads(row.data or "{}"), row.created_at)
+
+def events_after(db: Session, after_id: int, user_id: Optional[int] = None, limit: int = 1000) -> list[Event]:
+    q = select(_ev).where(_ev.c.id > after_id).order_by(_ev.c.id).limit(limit)
+    if user_id is not None:
+        q = q.where(_ev.c.user_id == user_id)
+    return [_row_event(r) for r in db.execute(q)]
+
+def recent_events_upto(db: Session, upto_id: int, since: datetime, user_id: Optional[int] = None) -> list[Event]:
+    """id <= upto_id 이고 created_at >= since 인 이벤트 (늦게 commit 된 행 재조회, ix_session_events_created_at)."""
+    q = select(_ev).where(_ev.c.id <= upto_id, _ev.c.created_at >= since).order_by(_ev.c.id)
+    if user_id is not None:
+        q = q.where(_ev.c.user_id == user_id)
+    return [_row_event(r) for r in db.execute(q)]
+
+def backfill_events(db: Session, user_id: int, after_id: int, lookback_sec: float, limit: int = 1000) -> list[Event]:
+    """Last-Event-ID 재개: after_id 이후 + after_id 이벤트 시각 기준 lookback 창 안의 더 작은 id (id 순).
+
+    창 안의 이벤트는 이미 받은 것일 수도 있음 (at-least-once, 같은 id 는 같은 이벤트)."""
+    events = events_after(db, after_id, user_id=user_id, limit=limit)
+    anchor = db.execute(select(_ev.c.created_at).where(_ev.c.id == after_id)).scalar()
+    if anchor is None or lookback_sec <= 0:
+        return events
+    late = recent_events_upto(db, after_id - 1, anchor - timedelta(seconds=lookback_sec), user_id=user_id)
+    return late + events
+
+def purge_old_events(db: Session, now: datetime | None = None) -> int:
+    """보관 기간이 지난 이벤트 삭제. 삭제한 행 수 반환. commit 포함."""
+    cutoff = (now or utcnow()) - timedelta(hours=settings.EVENTS_RETENTION_HOURS)
+    n = db.execute(delete(_ev).where(_ev.c.created_at < cutoff)).rowcount
+    db.commit()
+    return n
+
+class Subscriber:
+    __slots__ = ("user_id", "queue", "overflowed")
+
+    def __init__(self, user_id: int, queue_size: int):
+        self.user_id = user_id
+        self.queue: asyncio.Queue[Event] = asyncio.Queue(queue_size)
+        self.overflowed = False
+
+class EventBus:
+    def __init__(
+        self, session_factory: Callable, poll_interval_sec: float, queue_size: int,
+        lookback_sec: float = 0.0, batch: int = 1000,
+    ):
+        self._session_factory = session_factory
+        self._interval = poll_interval_sec
+        self._queue_size = queue_size
+        self._lookback = lookback_sec
+        self._batch = batch
+        self._subs: dict[int, set[Subscriber]] = {}
+        self._cursor = 0
+        # lookback 창 안에서 이미 전달한 이벤트 id -> created_at (창을 벗어나면 정리)
+        self._seen: dict[int, datetime] = {}
+        self.late = 0
+        self._task: Optional[asyncio.Task] = None
+        self.polls = 0
+        self.delivered = 0
+        self.overflows = 0
+
+    # 구독자 관리는 이벤트 루프 스레드에서만 호출됨
+    def subscribe(self, user_id: int) -> Subscriber:
+        sub = Subscriber(user_id, self._queue_size)
+        self._subs.setdefault(user_id, set()).add(sub)
+        return sub
+
+    def unsubscribe(self, sub: Subscriber) -> None:
+        subs = self._subs.get(sub.user_id)
+        if subs is not None:
+            subs.discard(sub)
+            if not subs:
+                del self._subs[sub.user_id]
+
+    def publish(self, events: Iterable[Event]) -> None:
+        for ev in events:
+            for sub in tuple(self._subs.get(ev.user_id, ())):
+                if sub.overflowed:
+                    continue
+                try:
+                    sub.queue.put_nowait(ev)
+                    self.delivered += 1
+                except asyncio.QueueFull:
+                    # 느린 연결: 이후 이벤트는 받지 않고 종료 신호만 (스트림이 큐를 비운 뒤 끊음)
+                    sub.overflowed = True
+                    self.overflows += 1
+
+    def _since(self) -> datetime:
+        return utcnow() - timedelta(seconds=self._lookback)
+
+    def _prime(self) -> tuple[int, list[Event]]:
+        # (최신 id, 창 안의 이벤트): 시작 시점에 이미 있던 이벤트는 전달하지 않음
+        with self._session_factory() as db:
+            latest = db.execute(select(func.max(_ev.c.id))).scalar() or 0
+            recent = recent_events_upto(db, latest, self._since()) if self._lookback > 0 else []
+            return latest, recent
+
+    def _fetch(self, after_id: int, rescan: bool) -> tuple[list[Event], list[Event]]:
+        # (cursor 이하의 창 안 이벤트, cursor 이후 batch)
+        with self._session_factory() as db:
+            late = recent_events_upto(db, after_id, self._since()) if rescan else []
+            return late, events_after(db, after_id, limit=self._batch)
+
+    def _mark_seen(self, events: list[Event]) -> list[Event]:
+        if self._lookback <= 0:
+            return events
+        fresh = [ev for ev in events if ev.id not in self._seen]
+        for ev in fresh:
+            self._seen[ev.id] = ev.created_at
+        return fresh
+
+    async def poll_once(self) -> int:
+        n = 0
+        rescan = self._lookback > 0
+        while True:
+            late, events = await asyncio.to_thread(self._fetch, self._cursor, rescan)
+            self.polls += 1
+            late = self._mark_seen(late)
+            if late:
+                # cursor 를 지나간 뒤에 commit 된 행
+                self.late += len(late)
+                self.publish(late)
+                n += len(late)
+            if events:
+                self._cursor = events[-1].id
+                self.publish(self._mark_seen(events))
+                n += len(events)
+            rescan = False
+            if len(events) < self._batch:
+                break
+        if self._seen:
+            since = self._since()
+            self._seen = {i: t for i, t in self._seen.items() if t >= since}
+        return n
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self._interval)
+            try:
+                await self.poll_once()
+            except Exception:
+                log.exception("event bus poll failed")
+
+    async def start(self) -> None:
+        if self._task is not None or self._interval <= 0:
+            return
+        # 시작 이전 이벤트는 Last-Event-ID backfill 로만 전달
+        self._cursor, recent = await asyncio.to_thread(self._prime)
+        self._mark_seen(recent)
+        self._task = asyncio.create_task(self._run(), name="event-bus-poller")
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def stats(self) -> dict:
+        return {
+            "subscribers": sum(len(s) for s in self._subs.values()),
+            "users": len(self._subs),
+            "cursor": self._cursor,
+            "polls": self.polls,
+            "late": self.late,
+            "delivered": self.delivered,
+            "overflows": self.overflows,
+        }
+
+event_bus = EventBus(
+    session_factory=SessionLocal,
+    poll_interval_sec=settings.EVENTS_POLL_INTERVAL_SEC,
+    queue_size=settings.EVENTS_QUEUE_SIZE,
+    lookback_sec=settings.EVENTS_LOOKBACK_SEC,
+)
@@ -0,0 +1,127 @@
+from __future__ import annotations
+import asyncio
+import threading
+import time
+from collections import deque
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable
+from app.core.config import settings
+
+# 비밀번호 해시 전용 워커 풀 + 입장 제어
+# - bcrypt 연산을 Starlette 기본 threadpool과 분리된 전용 풀에서 실행
+# - 실행(WORKERS) + 대기(QUEUE_SIZE) 슬롯이 모두 차면 즉시 HashPoolBusy (main.py에서 503 + Retry-After)
+#   -> 로그인 폭주 시에도 해시 대기로 묶이는 요청 스레드 수가 WORKERS + QUEUE_SIZE 로 제한됨
+
+class HashPoolBusy(RuntimeError):
+    pass
+
+def _timed(fn: Callable, *args: Any) -> tuple[Any, float]:
+    # 워커 안에서 실행: 순수 해시 시간(큐 대기 제외) 측정
+    t0 = time.perf_counter()
+    result = fn(*args)
+    return result, time.perf_counter() - t0
+
+def _percentile(sorted_values: list[float], q: float) -> float:
+    if not sorted_values:
+        return 0.0
+    i = min(len(sorted_values) - 1, int(q * len(sorted_values)))
+    return sorted_values[i]
+
+class PasswordHashPool:
+    def __init__(self, kind: str, workers: int, queue_size: int):
+        if kind not in ("thread", "process"):
+            raise ValueError(f"invalid PASSWORD_HASH_POOL_KIND: {kind}")
+        self._kind = kind
+        self._workers = workers
+        self._queue_size = queue_size
+        self._slots = threading.BoundedSemaphore(workers + queue_size)
+        self._executor: Executor | None = None
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self.completed = 0
+        self.rejected = 0
+        self._hash_sec: deque[float] = deque(maxlen=1024)
+        self._wait_sec: deque[float] = deque(maxlen=1024)
+
+    def _get_executor(self) -> Executor:
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    if self._kind == "process":
+                        self._executor = ProcessPoolExecutor(max_workers=self._workers)
+                    else:
+                        self._executor = ThreadPoolExecutor(max_workers=self._workers, thread_name_prefix="pwhash")
+        return self._executor
+
+    def _submit(self, fn: Callable, *args: Any) -> Future:
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                self.rejected += 1
+            raise HashPoolBusy("password hashing capacity exhausted")
+        with self._lock:
+            self._in_flight += 1
+        t0 = time.perf_counter()
+        try:
+            fut = self._get_executor().submit(_timed, fn, *args)
+        except BaseException:
+            self._release()
+            raise
+
+        # 슬롯은 작업이 실제로 끝났을 때 반환 (대기 쪽이 취소되어도 풀 점유는 정확히 집계)
+        def _done(f: Future) -> None:
+            self._release()
+            if f.cancelled() or f.exception() is not None:
+                return
+            hash_sec = f.result()[1]
+            with self._lock:
+                self.completed += 1
+                self._hash_sec.append(hash_sec)
+                self._wait_sec.append(max(0.0, time.perf_counter() - t0 - hash_sec))
+
+        fut.add_done_callback(_done)
+        return fut
+
+    def _release(self) -> None:
+        with self._lock:
+            self._in_flight -= 1
+        self._slots.release()
+
+    def run(self, fn: Callable, *args: Any) -> Any:
+        return self._submit(fn, *args).result()[0]
+
+    async def run_async(self, fn: Callable, *args: Any) -> Any:
+        # async 핸들러용: 이벤트 루프를 막지 않고 결과를 기다림
+        result, _ = await asyncio.wrap_future(self._submit(fn, *args))
+        return result
+
+    def shutdown(self) -> None:
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True)
+
+    def stats(self) -> dict:
+        with self._lock:
+            hash_sec = sorted(self._hash_sec)
+            wait_sec = sorted(self._wait_sec)
+            in_flight = self._in_flight
+            completed, rejected = self.completed, self.rejected
+        return {
+            "kind": self._kind,
+            "workers": self._workers,
+            "queue_size": self._queue_size,
+            "in_flight": in_flight,
+            "queue_depth": max(0, in_flight - self._workers),
+            "completed": completed,
+            "rejected": rejected,
+            "hash_ms_p50": round(_percentile(hash_sec, 0.50) * 1000, 2),
+            "hash_ms_p99": round(_percentile(hash_sec, 0.99) * 1000, 2),
+            "queue_wait_ms_p50": round(_percentile(wait_sec, 0.50) * 1000, 2),
+            "queue_wait_ms_p99": round(_percentile(wait_sec, 0.99) * 1000, 2),
+        }
+
+hash_pool = PasswordHashPool(
+    kind=settings.PASSWORD_HASH_POOL_KIND,
+    workers=settings.PASSWORD_HASH_WORKERS,
+    queue_size=settings.PASSWORD_HASH_QUEUE_SIZE,
+)
@@ -0,0 +1,165 @@
+from __future__ import annotations
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Optional, TypeVar
+from fastapi import HTTPException, Response
+from pydantic import BaseModel
+from app.core.config import settings
+
+# Idempotency-Key 응답 재생 저장소 (login / redeem)
+# - (scope, principal, key) 별로 첫 응답(성공 또는 4xx)을 TTL 동안 보관, 같은 키의 재시도에는 저장된 응답을 그대로 반환
+#   -> 타임아웃 후 재시도해도 bcrypt/redeem 쓰기가 다시 실행되지 않고, 로그인 재시도가 "Active session exists" 로 막히지 않음
+# - 요청 본문 fingerprint 가 다르면 422, 첫 요청이 아직 처리 중이면 409 + Retry-After
+# - 5xx/예외(해시 풀 포화 등)는 저장하지 않음 -> 재시도 시 다시 실행
+# - 프로세스 내 LRU (워커 간 공유 안 됨)
+
+T = TypeVar("T")
+
+REPLAY_HEADER = "Idempotent-Replayed"
+MAX_KEY_LENGTH = 255
+
+@dataclass
+class _Entry:
+    fingerprint: str
+    created_at: float
+    done: bool = False
+    result: Any = None
+    error: Optional[HTTPException] = None
+
+class IdempotencyStore:
+    def __init__(self, max_entries: int, ttl_sec: float):
+        self._max_entries = max_entries
+        self._ttl = ttl_sec
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[tuple, _Entry]" = OrderedDict()
+        self.replays = 0
+        self.conflicts = 0
+        self.evictions = 0
+
+    def begin(self, k: tuple, fingerprint: str) -> Optional[_Entry]:
+        """처음 보는 키면 처리 중으로 등록하고 None. 완료된 키면 저장된 항목(재생용)을 반환."""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(k)
+            if entry is not None and now - entry.created_at > self._ttl:
+                del self._entries[k]
+                entry = None
+            if entry is None:
+                self._entries[k] = _Entry(fingerprint=fingerprint, created_at=now)
+                while len(self._entries) > self._max_entries:
+                    self._entries.popitem(last=False)
+                    self.evictions += 1
+                return None
+            if entry.fingerprint != fingerprint:
+                self.conflicts += 1
+                raise HTTPException(status_code=422, detail="Idempotency-Key reused with a different request")
+            if not entry.done:
+                self.conflicts += 1
+                raise HTTPException(
+                    status_code=409,
+                    detail="A request with this Idempotency-Key is still in progress",
+                    headers={"Retry-After": "1"},
+                )
+            self._entries.move_to_end(k)
+            self.replays += 1
+            return entry
+
+    def finish(self, k: tuple, result: Any = None, error: Optional[HTTPException] = None) -> None:
+        with self._lock:
+            entry = self._entries.get(k)
+            if entry is not None:
+                entry.done = True
+                entry.result = result
+                entry.error = error
+
+    def abandon(self, k: tuple) -> None:
+        with self._lock:
+            entry = self._entries.get(k)
+            if entry is not None and not entry.done:
+                del self._entries[k]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "size": len(self._entries),
+                "max_entries": self._max_entries,
+                "replays": self.replays,
+                "conflicts": self.conflicts,
+                "evictions": self.evictions,
+            }
+
+idempotency_store = IdempotencyStore(
+    max_entries=settings.IDEMPOTENCY_MAX_ENTRIES,
+    ttl_sec=settings.IDEMPOTENCY_TTL_SEC,
+)
+
+def request_fingerprint(req: BaseModel) -> str:
+    # 비밀번호 등 원문을 보관하지 않도록 해시만 저장
+    body = json.dumps(req.model_dump(mode="json"), sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(body.encode("utf-8")).hexdigest()
+
+def _begin(scope: str, principal: Any, key: str, req: BaseModel) -> tuple[tuple, Optional[_Entry]]:
+    if len(key) > MAX_KEY_LENGTH:
+        raise HTTPException(status_code=400, detail="Idempotency-Key too long")
+    k = (scope, principal, key)
+    return k, idempotency_store.begin(k, request_fingerprint(req))
+
+def _replay(entry: _Entry, response: Response) -> Any:
+    if entry.error is not None:
+        e = entry.error
+        raise HTTPException(status_code=e.status_code, detail=e.detail, headers={**(e.headers or {}), REPLAY_HEADER: "true"})
+    response.headers[REPLAY_HEADER] = "true"
+    return entry.result
+
+def _record_error(k: tuple, e: HTTPException) -> None:
+    if e.status_code < 500:
+        idempotency_store.finish(k, error=e)
+    else:
+        idempotency_store.abandon(k)
+
+def run_idempotent(
+    scope: str, principal: Any, key: str | None, req: BaseModel, response: Response, fn: Callable[[], T]
+) -> T:
+    """key 가 있으면 fn 결과를 저장/재생. key 가 없으면 fn 을 그대로 실행."""
+    if not key:
+        return fn()
+    k, entry = _begin(scope, principal, key, req)
+    if entry is not None:
+        return _replay(entry, response)
+    try:
+        result = fn()
+    except HTTPException as e:
+        _record_error(k, e)
+        raise
+    except BaseException:
+        idempotency_store.abandon(k)
+        raise
+    idempotency_store.finish(k, result=result)
+    return result
+
+async def run_idempotent_async(
+    scope: str, principal: Any, key: str | None, req: BaseModel, response: Response, fn: Callable[[], Awaitable[T]]
+) -> T:
+    if not key:
+        return await fn()
+    k, entry = _begin(scope, principal, key, req)
+    if entry is not None:
+        return _replay(entry, response)
+    try:
+        result = await fn()
+    except HTTPException as e:
+        _record_error(k, e)
+        raise
+    except BaseException:
+        idempotency_store.abandon(k)
+        raise
+    idempotency_store.finish(k, result=result)
+    return result
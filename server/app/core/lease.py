@@ -0,0 +1,62 @@
+from __future__ import annotations
+import base64
+import json
+import time
+from datetime import datetime, timezone
+from typing import Any, Optional
+from app.core.config import settings
+
+# 오프라인 entitlement lease (Ed25519 서명)
+# 포맷: LEASE1.<b64url(payload_json)>.<b64url(sig)>
+# payload: {"v":1,"kid":..,"sub":user_id,"email":..,"product":..,"hwid":..,"iat":ts,"exp":ts}
+# - validate 가 valid 일 때만 발급, exp = min(now + LEASE_TTL, 라이선스 만료)
+# - 클라이언트는 공개키로만 검증 (SERVER_SECRET 을 갖지 않음)
+# - revoke 는 발급된 lease 의 exp 까지는 반영되지 않음 (LEASE_TTL 이 최대 지연)
+# cryptography 패키지가 필요 (LEASE_SIGNING_KEY 를 설정한 경우에만)
+
+PREFIX = "LEASE1"
+
+def _b64e(b: bytes) -> str:
+    return base64.urlsafe_b64encode(b).decode("ascii").rstrip("=")
+
+def _b64d(s: str) -> bytes:
+    return base64.urlsafe_b64decode(s + "=" * (-len(s) % 4))
+
+def _load_private_key(seed_b64: str):
+    try:
+        from cryptography.hazmat.primitives.asymmetric.ed25519 import Ed25519PrivateKey
+    except ImportError:
+        raise RuntimeError("LIC_LEASE_SIGNING_KEY 를 쓰려면 cryptography 패키지가 필요합니다 (pip install cryptography)")
+    return Ed25519PrivateKey.from_private_bytes(_b64d(seed_b64))
+
+_private_key = _load_private_key(settings.LEASE_SIGNING_KEY) if settings.LEASE_SIGNING_KEY else None
+
+def leases_enabled() -> bool:
+    return _private_key is not None
+
+def _ts(dt: datetime) -> int:
+    # DB 의 datetime 은 naive UTC
+    return int(dt.replace(tzinfo=timezone.utc).timestamp())
+
+def issue_lease(
+    user_id: int, email: str, product_code: str, hwid_hash: str, license_expires_at: Optional[datetime] = None
+) -> Optional[str]:
+    """lease 문자열. 서명 키가 없으면 None."""
+    if _private_key is None:
+        return None
+    now = int(time.time())
+    exp = now + settings.LEASE_TTL_SEC
+    if license_expires_at is not None:
+        exp = min(exp, _ts(license_expires_at))
+    payload: dict[str, Any] = {
+        "v": 1,
+        "kid": settings.LEASE_KEY_ID,
+        "sub": user_id,
+        "email": email,
+        "product": product_code,
+        "hwid": hwid_hash,
+        "iat": now,
+        "exp": exp,
+    }
+    payload_bytes = json.dumps(payload, separators=(",", ":"), sort_keys=True).encode("utf-8")
+    return f"{PREFIX}.{_b64e(payload_bytes)}.{_b64e(_private_key.sign(payload_bytes))}"
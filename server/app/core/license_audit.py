@@ -0,0 +1,117 @@
+from __future__ import annotations
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Iterator, NamedTuple, Optional, Sequence
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+from app.db import models
+from app.core.license_codec import decode_and_verify, payload_exp_datetime
+
+# license_codes 전체 점검 (admin_tools/audit_licenses.py)
+# - 행을 yield_per 로 chunk 단위 스트리밍 (PostgreSQL 은 server-side cursor), 서명 검증은 DB 없이 chunk 마다 (프로세스 풀 가능)
+# - secrets: [현재, 이전...] 순서. 현재 secret 으로 검증되지 않고 이전 secret 으로만 되면 old_secret (재발급 대상)
+# - 발견 종류
+#   tampered          어떤 secret 으로도 검증되지 않음 (형식 오류/서명 불일치)
+#   old_secret        이전 secret 으로만 검증됨
+#   product_mismatch  서명된 제품과 product_id 가 다름
+#   expiry_mismatch   서명된 만료와 expires_at 이 다름
+#   expired_active    서명된 만료가 지났는데 revoke 되지 않음
+#   orphaned_binding  redeemed_by_user_id 의 사용자가 없음, 또는 사용자 없이 HWID 만 bind
+
+FINDING_KINDS = (
+    "tampered", "old_secret", "product_mismatch", "expiry_mismatch", "expired_active", "orphaned_binding",
+)
+
+class AuditRow(NamedTuple):
+    id: int
+    code: str
+    product_id: int
+    expires_at: Optional[datetime]
+    is_revoked: bool
+    redeemed_by_user_id: Optional[int]
+    user_exists: bool
+    bound_hwid_hash: Optional[str]
+
+@dataclass
+class AuditReport:
+    scanned: int = 0
+    ok: int = 0
+    findings: dict[str, int] = field(default_factory=lambda: dict.fromkeys(FINDING_KINDS, 0))
+    elapsed_sec: float = 0.0
+
+    def add(self, scanned: int, ok: int, findings: Sequence[dict[str, Any]]) -> None:
+        self.scanned += scanned
+        self.ok += ok
+        for f in findings:
+            self.findings[f["kind"]] += 1
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "scanned": self.scanned,
+            "ok": self.ok,
+            "findings": dict(self.findings),
+            "elapsed_sec": round(self.elapsed_sec, 3),
+        }
+
+def iter_chunks(db: Session, chunk_size: int) -> Iterator[list[AuditRow]]:
+    """license_codes 를 id 순으로 chunk_size 행씩 (메모리는 chunk 하나 만큼)."""
+    c = models.LicenseCode
+    q = (
+        select(
+            c.id, c.code, c.product_id, c.expires_at, c.is_revoked, c.redeemed_by_user_id,
+            models.User.id.isnot(None), c.bound_hwid_hash,
+        )
+        .outerjoin(models.User, models.User.id == c.redeemed_by_user_id)
+        .order_by(c.id)
+        .execution_options(yield_per=chunk_size)
+    )
+    for part in db.execute(q).partitions():
+        yield [AuditRow(*r) for r in part]
+
+def load_product_codes(db: Session) -> dict[str, int]:
+    return {code: pid for pid, code in db.execute(select(models.Product.id, models.Product.code))}
+
+def _verify(code: str, secrets: Sequence[str]) -> tuple[dict[str, Any], Optional[str], int]:
+    """(payload, error, 검증된 secret 의 index). 서명 불일치일 때만 다음 secret 으로."""
+    payload, err = {}, None
+    for i, secret in enumerate(secrets):
+        payload, err = decode_and_verify(code, secret, check_expiry=False)
+        if err != "INVALID_SIGNATURE":
+            return payload, err, i
+    return payload, err, -1
+
+def audit_chunk(
+    rows: Sequence[AuditRow], secrets: Sequence[str], product_codes: dict[str, int], now: datetime
+) -> tuple[int, int, list[dict[str, Any]]]:
+    """(점검 행 수, 문제 없는 행 수, 발견 목록). DB 접근 없음 -> 프로세스 풀에서도 실행 가능."""
+    out: list[dict[str, Any]] = []
+    ok = 0
+    for r in rows:
+        found: list[dict[str, Any]] = []
+        if r.redeemed_by_user_id is not None and not r.user_exists:
+            found.append({"kind": "orphaned_binding", "detail": f"user {r.redeemed_by_user_id} not found"})
+        elif r.redeemed_by_user_id is None and r.bound_hwid_hash:
+            found.append({"kind": "orphaned_binding", "detail": "hwid bound without user"})
+
+        payload, err, idx = _verify(r.code, secrets)
+        if err:
+            found.append({"kind": "tampered", "detail": err})
+        else:
+            if idx > 0:
+                found.append({"kind": "old_secret", "detail": f"secret #{idx}"})
+            signed_pid = payload["product_id"] if payload["v"] == 2 else product_codes.get(payload["product"])
+            if signed_pid != r.product_id:
+                found.append({"kind": "product_mismatch", "detail": f"signed {payload.get('product_id', payload.get('product'))}"})
+            signed_exp = payload_exp_datetime(payload)
+            stored_exp = r.expires_at.replace(microsecond=0) if r.expires_at else None
+            if signed_exp != stored_exp:
+                found.append({"kind": "expiry_mismatch", "detail": f"signed {signed_exp.isoformat() if signed_exp else None}"})
+            if signed_exp and signed_exp < now and not r.is_revoked:
+                found.append({"kind": "expired_active", "detail": f"redeemed={r.redeemed_by_user_id is not None}"})
+
+        if not found:
+            ok += 1
+        for f in found:
+            f.update(id=r.id, code=r.code, product_id=r.product_id)
+            out.append(f)
+    return len(rows), ok, out
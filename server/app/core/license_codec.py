@@ -1,6 +1,6 @@
 from __future__ import annotations
-import base64, json
-from datetime import datetime
+import base64, hashlib, hmac, json, secrets, struct, time
+from datetime import datetime, timezone
 from typing import Any, Optional, Tuple
 from app.core.security import hmac_sha256, constant_time_equal
 from app.core.config import settings
@@ -12,8 +12,18 @@ from app.core.config import settings
 #
 # - 위변조 방지: sig = HMAC-SHA256(secret, payload_bytes)
 # - DB에 코드를 저장해 redeem 상태/바인딩/정지(revoke) 관리
+#
+# LIC2 (짧은 바이너리 포맷, 사용자 입력용):
+#   LIC2-XXXXX-XXXXX-...-XXC   (Crockford base32 56자 + check 문자 1개, 5자씩 '-' 로 묶음)
+# 35바이트 = payload 25바이트 + tag 10바이트 (big-endian)
+#   version u8 (=2) | product_id u32 (products.id) | exp u32 (epoch 초, 0이면 만료 없음) | nonce 16바이트
+#   tag = HMAC-SHA256(secret, "LIC2" + payload)[:10]
+# - 입력은 대소문자/'-'/공백 무시, I·L -> 1, O -> 0 으로 읽음. DB 에는 normalize_code 의 정규형으로 저장
+# - check 문자(값 mod 37)로 오타를 서명 검증 전에 INVALID_CHECK 로 구분
+# - tag 80비트: 검증은 서버 온라인 redeem 에서만 하므로 오프라인 위조 시도가 불가능
 
 PREFIX = "LIC1"
+PREFIX_V2 = "LIC2"
 
 def _b32e(b: bytes) -> str:
     return base64.b32encode(b).decode("ascii").rstrip("=")
@@ -29,10 +39,15 @@ def encode_license(payload: dict[str, Any], secret: str | None = None) -> str:
     sig = hmac_sha256(secret, payload_bytes)
     return f"{PREFIX}.{_b32e(payload_bytes)}.{_b32e(sig)}"
 
-def decode_and_verify(code: str, secret: str | None = None) -> Tuple[dict[str, Any], Optional[str]]:
-    """return (payload, error). error is None if OK."""
+def decode_and_verify(
+    code: str, secret: str | None = None, check_expiry: bool = True
+) -> Tuple[dict[str, Any], Optional[str]]:
+    """return (payload, error). error is None if OK.
+    check_expiry=False: 만료된 코드도 payload 반환 (감사/점검용, redeem 에서는 쓰지 않음)."""
     if secret is None:
         secret = settings.SERVER_SECRET
+    if _is_v2(code):
+        return _decode_v2(code, secret, check_expiry)
     parts = code.strip().split(".")
     if len(parts) != 3 or parts[0] != PREFIX:
         return {}, "INVALID_FORMAT"
@@ -63,12 +78,110 @@ def decode_and_verify(code: str, secret: str | None = None) -> Tuple[dict[str, A
             exp_dt = datetime.fromisoformat(exp.replace("Z", "+00:00")).replace(tzinfo=None)
         except Exception:
             return {}, "INVALID_EXP"
-        if datetime.utcnow() > exp_dt:
+        if check_expiry and datetime.utcnow() > exp_dt:
             return {}, "EXPIRED"
     return payload, None
 
 def payload_exp_datetime(payload: dict[str, Any]) -> Optional[datetime]:
+    if payload.get("v") == 2:
+        ts = payload.get("exp_ts")
+        return datetime.fromtimestamp(ts, timezone.utc).replace(tzinfo=None) if ts else None
     exp = payload.get("exp")
     if not exp:
         return None
     return datetime.fromisoformat(exp.replace("Z", "+00:00")).replace(tzinfo=None)
+
+def payload_matches_product(payload: dict[str, Any], product_id: int, product_code: str) -> bool:
+    # LIC1 은 제품 코드, LIC2 는 products.id 를 담음
+    if payload.get("v") == 2:
+        return payload["product_id"] == product_id
+    return payload.get("product") == product_code
+
+# ---- LIC2 ----
+
+_CROCKFORD = "0123456789ABCDEFGHJKMNPQRSTVWXYZ"
+_CHECK_SYMBOLS = _CROCKFORD + "*~$=U"
+# 본문 디코드는 int(s, 32) (C 구현, base64.b32decode 는 순수 파이썬)로: Crockford 문자 -> int 의 32진 숫자
+# U 는 check 문자 전용이므로 본문에서는 잘못된 문자로
+_FROM_CROCKFORD = str.maketrans(_CROCKFORD + "U", "0123456789abcdefghijklmnopqrstuv" + "!")
+_V2_LAYOUT = struct.Struct(">BII")  # version, product_id, exp
+_V2_NONCE_BYTES = 16
+_V2_TAG_BYTES = 10
+_V2_PAYLOAD_BYTES = _V2_LAYOUT.size + _V2_NONCE_BYTES  # 25
+_V2_BODY_CHARS = (_V2_PAYLOAD_BYTES + _V2_TAG_BYTES) * 8 // 5  # 56
+_V2_GROUP = 5
+_V2_DOMAIN = PREFIX_V2.encode("ascii")
+
+def _is_v2(code: str) -> bool:
+    return code.lstrip()[:4].upper() == PREFIX_V2
+
+_V2_INPUT = str.maketrans({"-": None, ".": None, " ": None, "I": "1", "L": "1", "O": "0"})
+
+def _v2_body(code: str) -> str:
+    # 접두사 뒤의 본문: 대문자, 구분자 제거, 별칭(I/L -> 1, O -> 0) 치환 (check 문자 포함)
+    return code.strip()[4:].upper().translate(_V2_INPUT)
+
+# secret 별로 key 와 도메인 접두사까지 처리한 HMAC 상태를 두고 copy() 해서 사용
+_v2_macs: dict[str, "hmac.HMAC"] = {}
+
+def _v2_tag(secret: str, payload: bytes | memoryview) -> bytes:
+    base = _v2_macs.get(secret)
+    if base is None:
+        base = _v2_macs[secret] = hmac.new(secret.encode("utf-8"), _V2_DOMAIN, hashlib.sha256)
+    h = base.copy()
+    h.update(payload)
+    return h.digest()[:_V2_TAG_BYTES]
+
+def _group(body: str) -> str:
+    return "-".join(body[i:i + _V2_GROUP] for i in range(0, len(body), _V2_GROUP))
+
+def encode_license_v2(
+    product_id: int, exp_ts: int | None = None, nonce: bytes | None = None, secret: str | None = None
+) -> str:
+    if secret is None:
+        secret = settings.SERVER_SECRET
+    nonce = nonce if nonce is not None else secrets.token_bytes(_V2_NONCE_BYTES)
+    if len(nonce) != _V2_NONCE_BYTES:
+        raise ValueError("nonce must be 16 bytes")
+    payload = _V2_LAYOUT.pack(2, product_id, exp_ts or 0) + nonce
+    n = int.from_bytes(payload + _v2_tag(secret, payload), "big")
+    body = "".join(_CROCKFORD[(n >> shift) & 31] for shift in range(5 * (_V2_BODY_CHARS - 1), -1, -5))
+    return f"{PREFIX_V2}-{_group(body + _CHECK_SYMBOLS[n % 37])}"
+
+def normalize_code(code: str) -> str:
+    """DB 저장용 정규형. LIC2 는 대문자/별칭 치환 후 5자 묶음, 그 외는 그대로."""
+    if not _is_v2(code):
+        return code
+    return f"{PREFIX_V2}-{_group(_v2_body(code))}"
+
+def _decode_v2(code: str, secret: str, check_expiry: bool = True) -> Tuple[dict[str, Any], Optional[str]]:
+    body = _v2_body(code)
+    if len(body) != _V2_BODY_CHARS + 1:
+        return {}, "INVALID_FORMAT"
+    digits = body[:-1].translate(_FROM_CROCKFORD)
+    # int() 는 '_', 부호, 공백, 비ASCII 숫자도 받으므로 먼저 거름
+    if not (digits.isascii() and digits.isalnum()):
+        return {}, "INVALID_BASE32"
+    n = int(digits, 32)
+    if _CHECK_SYMBOLS[n % 37] != body[-1]:
+        return {}, "INVALID_CHECK"
+
+    raw = n.to_bytes(_V2_PAYLOAD_BYTES + _V2_TAG_BYTES, "big")
+    view = memoryview(raw)
+    expected = _v2_tag(secret, view[:_V2_PAYLOAD_BYTES])
+    if not constant_time_equal(expected, view[_V2_PAYLOAD_BYTES:]):
+        return {}, "INVALID_SIGNATURE"
+
+    version, product_id, exp_ts = _V2_LAYOUT.unpack_from(raw, 0)
+    if version != 2:
+        return {}, "INVALID_FIELDS"
+    if check_expiry and exp_ts and time.time() > exp_ts:
+        return {}, "EXPIRED"
+    payload: dict[str, Any] = {
+        "v": 2,
+        "product_id": product_id,
+        "nonce": view[_V2_LAYOUT.size:_V2_PAYLOAD_BYTES].hex(),
+    }
+    if exp_ts:
+        payload["exp_ts"] = exp_ts
+    return payload, None
@@ -0,0 +1,168 @@
+from __future__ import annotations
+import csv
+import io
+import json
+import time
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Iterable, Optional
+from sqlalchemy import select, text
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+from app.db import models
+from app.core.config import settings
+from app.core.license_codec import decode_and_verify, normalize_code, payload_exp_datetime
+
+# 라이선스 코드 사전 등록 (bulk import)
+# - 입력 한 줄 = 코드 하나: 코드만 / NDJSON({"code": ...}) / CSV(admin_tools/generate_license.py 출력, 헤더 줄 무시)
+# - 코드마다 decode_and_verify + 제품 확인, 정규형(normalize_code)으로 저장
+# - batch_size 행씩 INSERT ... ON CONFLICT (code) DO NOTHING (executemany -> SQLAlchemy 가 multi-row VALUES 로 묶음)
+#   PostgreSQL 은 COPY 로 임시 테이블에 적재한 뒤 INSERT ... SELECT ... ON CONFLICT DO NOTHING
+# - 이미 있는 코드는 건너뜀(duplicates) -> 같은 파일을 다시 넣어도 안전, 배치마다 commit
+# 등록된 코드의 redeem 은 UPDATE 만 발생 (LICENSE_REQUIRE_PREREGISTERED 이면 미등록 코드는 거절)
+
+_codes = models.LicenseCode.__table__
+
+_STAGING = "license_codes_import"
+
+@dataclass
+class ImportReport:
+    read: int = 0
+    inserted: int = 0
+    duplicates: int = 0
+    invalid: dict[str, int] = field(default_factory=dict)
+    elapsed_sec: float = 0.0
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "read": self.read,
+            "inserted": self.inserted,
+            "duplicates": self.duplicates,
+            "invalid": dict(sorted(self.invalid.items())),
+            "elapsed_sec": round(self.elapsed_sec, 3),
+        }
+
+def extract_code(line: str) -> Optional[str]:
+    """한 줄에서 코드. 빈 줄/CSV 헤더는 None, 알 수 없는 줄은 그대로 (검증에서 거절)."""
+    line = line.strip()
+    if not line:
+        return None
+    if line.startswith("{"):
+        try:
+            return str(json.loads(line).get("code") or "")
+        except (ValueError, AttributeError):
+            return line
+    if "," in line:
+        fields = next(csv.reader([line]))
+        if fields[0] == "batch_id":
+            return None
+        return fields[2] if len(fields) > 2 else fields[0]
+    return line
+
+def verify_lines(
+    lines: Iterable[str | bytes], product_ids: dict[Any, int], secret: str | None = None
+) -> tuple[list[dict[str, Any]], dict[str, int], int]:
+    """(INSERT 할 행, 거절 사유별 수, 읽은 코드 수). DB 접근 없음 -> 프로세스 풀에서도 실행 가능."""
+    rows: list[dict[str, Any]] = []
+    invalid: dict[str, int] = {}
+    read = 0
+    for line in lines:
+        if isinstance(line, bytes):
+            line = line.decode("utf-8", "replace")
+        code = extract_code(line)
+        if code is None:
+            continue
+        read += 1
+        code = normalize_code(code)
+        payload, err = decode_and_verify(code, secret)
+        if not err:
+            # LIC1 은 제품 코드, LIC2 는 products.id
+            product_id = product_ids.get(payload["product_id"] if payload["v"] == 2 else payload["product"])
+            if product_id is None:
+                err = "UNKNOWN_PRODUCT"
+        if err:
+            invalid[err] = invalid.get(err, 0) + 1
+            continue
+        rows.append({"code": code, "product_id": product_id, "expires_at": payload_exp_datetime(payload)})
+    return rows, invalid, read
+
+def load_product_ids(db: Session) -> dict[Any, int]:
+    """제품 코드와 products.id 모두 -> products.id."""
+    out: dict[Any, int] = {}
+    for pid, pcode in db.execute(select(models.Product.id, models.Product.code)):
+        out[pcode] = pid
+        out[pid] = pid
+    return out
+
+class LicenseImporter:
+    """한 번의 import. add_lines (또는 미리 검증한 결과를 add_verified) 로 넣고 finish 로 마무리 (배치마다 commit)."""
+
+    def __init__(self, db: Session, batch_size: int | None = None, secret: str | None = None):
+        self.db = db
+        self.batch_size = batch_size or settings.LICENSE_IMPORT_BATCH_SIZE
+        self.secret = secret
+        self.product_ids = load_product_ids(db)
+        self.report = ImportReport()
+        self._rows: list[dict[str, Any]] = []
+        self._t0 = time.perf_counter()
+        self._use_copy = db.get_bind().dialect.name == "postgresql"
+
+    def add_lines(self, lines: Iterable[str | bytes]) -> None:
+        self.add_verified(*verify_lines(lines, self.product_ids, self.secret))
+
+    def add_verified(self, rows: list[dict[str, Any]], invalid: dict[str, int], read: int) -> None:
+        self.report.read += read
+        for reason, n in invalid.items():
+            self.report.invalid[reason] = self.report.invalid.get(reason, 0) + n
+        self._rows.extend(rows)
+        while len(self._rows) >= self.batch_size:
+            self._flush(self.batch_size)
+
+    def _flush(self, n: int) -> None:
+        rows, self._rows = self._rows[:n], self._rows[n:]
+        if not rows:
+            return
+        inserted = _copy_rows(self.db, rows) if self._use_copy else _insert_rows(self.db, rows)
+        self.db.commit()
+        self.report.inserted += inserted
+        self.report.duplicates += len(rows) - inserted
+
+    def finish(self) -> ImportReport:
+        self._flush(len(self._rows))
+        self.report.elapsed_sec = time.perf_counter() - self._t0
+        return self.report
+
+def _insert_rows(db: Session, rows: list[dict[str, Any]]) -> int:
+    # executemany + RETURNING: SQLAlchemy insertmanyvalues 가 multi-row VALUES 문으로 나눠 실행
+    # ON CONFLICT DO NOTHING 으로 건너뛴 행은 RETURNING 에 나오지 않음 -> 반환 행 수 = 실제 INSERT 수
+    ins = sqlite_insert(_codes) if db.get_bind().dialect.name == "sqlite" else pg_insert(_codes)
+    stmt = ins.values(is_revoked=False).on_conflict_do_nothing(index_elements=[_codes.c.code]).returning(_codes.c.id)
+    return len(db.execute(stmt, rows).all())
+
+def _copy_rows(db: Session, rows: list[dict[str, Any]]) -> int:
+    # PostgreSQL: COPY -> 트랜잭션 임시 테이블 -> INSERT ... SELECT (commit 시 임시 테이블 비움)
+    db.execute(text(
+        f"CREATE TEMP TABLE IF NOT EXISTS {_STAGING} "
+        "(code text, product_id integer, expires_at timestamp) ON COMMIT DELETE ROWS"
+    ))
+    raw = db.connection().connection.driver_connection
+    copy_sql = f"COPY {_STAGING} (code, product_id, expires_at) FROM STDIN"
+    with raw.cursor() as cur:
+        if hasattr(cur, "copy"):  # psycopg 3
+            with cur.copy(copy_sql) as cp:
+                for r in rows:
+                    cp.write_row((r["code"], r["product_id"], r["expires_at"]))
+        else:  # psycopg2
+            buf = io.StringIO("".join(
+                f"{r['code']}\t{r['product_id']}\t{_copy_ts(r['expires_at'])}\n" for r in rows
+            ))
+            cur.copy_expert(copy_sql, buf)
+    return db.execute(text(
+        "INSERT INTO license_codes (code, product_id, expires_at, is_revoked) "
+        f"SELECT code, product_id, expires_at, false FROM {_STAGING} "
+        "ON CONFLICT (code) DO NOTHING"
+    )).rowcount
+
+def _copy_ts(dt: Optional[datetime]) -> str:
+    return dt.isoformat(sep=" ") if dt else "\\N"
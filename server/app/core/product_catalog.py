@@ -0,0 +1,118 @@
+from __future__ import annotations
+import hashlib
+import logging
+import threading
+import time
+from dataclasses import dataclass
+from typing import Callable, Dict, Optional
+from sqlalchemy import event, update
+from sqlalchemy.orm import Session
+from app.db import models
+from app.db.database import SessionLocal
+from app.core.config import settings
+
+# 제품 카탈로그 인메모리 캐시
+# - 시작 시 전체 로드, 조회는 DB 접근 없이 dict 조회
+# - catalog_version 행을 CHECK_INTERVAL 초마다 (백그라운드에서) 확인해 다른 워커의 변경을 reload
+# - products 를 변경하는 flush는 자동으로 catalog_version 을 증가시킴 (아래 before_flush 리스너)
+
+log = logging.getLogger(__name__)
+
+@dataclass(frozen=True)
+class ProductInfo:
+    id: int
+    code: str
+    name: str
+    is_paid: bool
+    etag: str
+
+def _etag(p: models.Product) -> str:
+    digest = hashlib.sha256(f"{p.code}|{p.name}|{int(p.is_paid)}".encode("utf-8")).hexdigest()
+    return f'"{digest[:16]}"'
+
+def _read_version(db: Session) -> int:
+    v = db.get(models.CatalogVersion, 1)
+    return v.version if v else 0
+
+def bump_catalog_version(db: Session) -> None:
+    """catalog_version 증가 (없으면 생성). commit은 호출자가 한다."""
+    if db.execute(
+        update(models.CatalogVersion)
+        .where(models.CatalogVersion.id == 1)
+        .values(version=models.CatalogVersion.version + 1)
+    ).rowcount == 0:
+        db.add(models.CatalogVersion(id=1, version=1))
+
+@event.listens_for(Session, "before_flush")
+def _bump_on_product_change(db: Session, flush_context, instances) -> None:
+    if db.info.get("_catalog_bumped"):
+        return
+    for obj in (*db.new, *db.dirty, *db.deleted):
+        if isinstance(obj, models.Product):
+            db.info["_catalog_bumped"] = True
+            try:
+                bump_catalog_version(db)
+            finally:
+                db.info.pop("_catalog_bumped", None)
+            return
+
+class ProductCatalog:
+    def __init__(self, session_factory: Callable, check_interval_sec: float):
+        self._session_factory = session_factory
+        self._check_interval = check_interval_sec
+        self._refresh_lock = threading.Lock()
+        self._by_code: Dict[str, ProductInfo] = {}
+        self._version: int | None = None
+        self._checked_at = 0.0
+
+    @property
+    def version(self) -> int | None:
+        return self._version
+
+    def load(self, db: Session | None = None) -> None:
+        if db is None:
+            with self._session_factory() as db:
+                return self.load(db)
+        version = _read_version(db)
+        by_code = {
+            p.code: ProductInfo(id=p.id, code=p.code, name=p.name, is_paid=p.is_paid, etag=_etag(p))
+            for p in db.query(models.Product).all()
+        }
+        # dict 교체는 원자적이므로 조회 쪽은 lock 없이 읽음
+        self._by_code = by_code
+        self._version = version
+        self._checked_at = time.monotonic()
+
+    def _refresh(self) -> None:
+        try:
+            with self._session_factory() as db:
+                if self._version is None or _read_version(db) != self._version:
+                    self.load(db)
+                else:
+                    self._checked_at = time.monotonic()
+        except Exception:
+            log.exception("product catalog refresh failed")
+        finally:
+            self._refresh_lock.release()
+
+    def _maybe_refresh(self) -> None:
+        if time.monotonic() - self._checked_at < self._check_interval:
+            return
+        # 버전 확인은 백그라운드 스레드 하나에서만 수행하고, 요청은 기존 캐시로 즉시 응답
+        # (요청 경로에서 DB를 기다리지 않으므로 async 핸들러에서도 이벤트 루프를 막지 않음)
+        if not self._refresh_lock.acquire(blocking=False):
+            return
+        if self._version is None:
+            # 아직 로드 전이면 동기 로드
+            self._refresh()
+            return
+        threading.Thread(target=self._refresh, name="product-catalog-refresh", daemon=True).start()
+
+    def get(self, code: str) -> Optional[ProductInfo]:
+        self._maybe_refresh()
+        return self._by_code.get(code)
+
+product_catalog = ProductCatalog(
+    session_factory=SessionLocal,
+    check_interval_sec=settings.PRODUCT_CATALOG_CHECK_INTERVAL_SEC,
+)
@@ -1,7 +1,7 @@
 from __future__ import annotations
 from pydantic import BaseModel, EmailStr, Field
 from datetime import datetime
-from typing import Optional
+from typing import List, Optional
 
 class RegisterRequest(BaseModel):
     email: EmailStr
@@ -46,3 +46,26 @@ class LicenseValidateResponse(BaseModel):
     product_code: str
     reason: Optional[str] = None
     expires_at: Optional[datetime] = None
+    lease: Optional[str] = None  # valid 이고 서버에 lease 키가 설정된 경우 Ed25519 서명 lease
+
+class LicenseValidateBatchRequest(BaseModel):
+    product_codes: List[str] = Field(min_length=1, max_length=100)
+    hwid_hash: str = Field(min_length=64, max_length=64)
+
+class LicenseValidateBatchResponse(BaseModel):
+    results: List[LicenseValidateResponse]
+
+class BootstrapRequest(BaseModel):
+    email: EmailStr
+    password: str
+    hwid_hash: str = Field(min_length=64, max_length=64)
+    product_code: str
+    license_code: Optional[str] = None
+
+class BootstrapResponse(BaseModel):
+    token: TokenResponse
+    product: ProductResponse
+    redeem: Optional[RedeemResponse] = None
+    redeem_error: Optional[str] = None
+    redeem_status: Optional[int] = None
+    validation: LicenseValidateResponse
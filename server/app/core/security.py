@@ -2,17 +2,92 @@ from __future__ import annotations
 from passlib.context import CryptContext
 import hashlib
 import hmac
+import logging
+import re
 from datetime import datetime, timedelta, timezone
 from app.core.config import settings
+from app.core.hash_pool import hash_pool
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+log = logging.getLogger(__name__)
 
-def hash_password(password: str) -> str:
+_BCRYPT_COST = re.compile(r"^\$2[abxy]?\$(\d{2})\$")
+_ARGON2_COST = re.compile(r"^\$argon2(?:id|i|d)\$(?:v=\d+\$)?m=(\d+),t=(\d+),p=\d+\$")
+
+def _floored(name: str, value: int, minimum: int) -> int:
+    if value < minimum:
+        log.warning("%s=%d is below the security floor, using %d", name, value, minimum)
+    return max(value, minimum)
+
+# 실제로 쓰는 cost (설정값이 보안 하한보다 약하면 하한)
+BCRYPT_ROUNDS = _floored("PASSWORD_BCRYPT_ROUNDS", settings.PASSWORD_BCRYPT_ROUNDS, settings.PASSWORD_BCRYPT_MIN_ROUNDS)
+ARGON2_TIME_COST = _floored(
+    "PASSWORD_ARGON2_TIME_COST", settings.PASSWORD_ARGON2_TIME_COST, settings.PASSWORD_ARGON2_MIN_TIME_COST
+)
+ARGON2_MEMORY_COST_KIB = _floored(
+    "PASSWORD_ARGON2_MEMORY_COST_KIB", settings.PASSWORD_ARGON2_MEMORY_COST_KIB, settings.PASSWORD_ARGON2_MIN_MEMORY_COST_KIB
+)
+
+def _build_pwd_context() -> CryptContext:
+    # 기본 scheme 외의 해시는 deprecated -> 로그인 시 재해시
+    # cost는 min=max=설정값으로 고정해 설정과 다른 기존 해시가 needs_update 대상이 됨
+    # (더 약한 cost 로의 재해시는 _is_downgrade 로 막음, PASSWORD_HASH_ALLOW_DOWNGRADE 이면 허용)
+    scheme = settings.PASSWORD_HASH_SCHEME
+    schemes = ["bcrypt", "argon2"] if scheme == "bcrypt" else ["argon2", "bcrypt"]
+    return CryptContext(
+        schemes=schemes,
+        default=scheme,
+        deprecated="auto",
+        bcrypt__default_rounds=BCRYPT_ROUNDS,
+        bcrypt__min_rounds=BCRYPT_ROUNDS,
+        bcrypt__max_rounds=BCRYPT_ROUNDS,
+        argon2__default_rounds=ARGON2_TIME_COST,
+        argon2__min_rounds=ARGON2_TIME_COST,
+        argon2__max_rounds=ARGON2_TIME_COST,
+        argon2__memory_cost=ARGON2_MEMORY_COST_KIB,
+        argon2__parallelism=settings.PASSWORD_ARGON2_PARALLELISM,
+    )
+
+def _is_downgrade(password_hash: str) -> bool:
+    """저장된 해시가 현재 설정보다 강한 cost 인지 (같은 scheme 끼리만 비교, scheme 변경은 재해시 허용)."""
+    if settings.PASSWORD_HASH_SCHEME == "bcrypt":
+        m = _BCRYPT_COST.match(password_hash)
+        return m is not None and int(m.group(1)) > BCRYPT_ROUNDS
+    m = _ARGON2_COST.match(password_hash)
+    return m is not None and (int(m.group(1)) > ARGON2_MEMORY_COST_KIB or int(m.group(2)) > ARGON2_TIME_COST)
+
+pwd_context = _build_pwd_context()
+
+# 워커(스레드/프로세스)에서 실행되는 함수 - 프로세스 풀에서도 pickle 가능하도록 모듈 레벨에 둠
+def _hash(password: str) -> str:
     return pwd_context.hash(password)
 
-def verify_password(password: str, password_hash: str) -> bool:
+def _verify(password: str, password_hash: str) -> bool:
     return pwd_context.verify(password, password_hash)
 
+def _verify_and_update(password: str, password_hash: str) -> tuple[bool, str | None]:
+    # 검증 성공 + needs_update(파라미터가 현재 설정과 다름)이면 새 해시도 함께 반환
+    # 저장된 해시가 더 강하면 검증만 (약한 cost 로 내리지 않음)
+    if not settings.PASSWORD_HASH_ALLOW_DOWNGRADE and _is_downgrade(password_hash):
+        return pwd_context.verify(password, password_hash), None
+    return pwd_context.verify_and_update(password, password_hash)
+
+def hash_password(password: str) -> str:
+    # 전용 해시 풀에서 실행. 풀이 가득 차면 HashPoolBusy
+    return hash_pool.run(_hash, password)
+
+def verify_password(password: str, password_hash: str) -> bool:
+    return hash_pool.run(_verify, password, password_hash)
+
+def verify_and_update_password(password: str, password_hash: str) -> tuple[bool, str | None]:
+    """(ok, new_hash). new_hash 가 있으면 저장된 해시를 교체해야 한다."""
+    return hash_pool.run(_verify_and_update, password, password_hash)
+
+async def hash_password_async(password: str) -> str:
+    return await hash_pool.run_async(_hash, password)
+
+async def verify_and_update_password_async(password: str, password_hash: str) -> tuple[bool, str | None]:
+    return await hash_pool.run_async(_verify_and_update, password, password_hash)
+
 def sha256_hex(data: bytes) -> str:
     return hashlib.sha256(data).hexdigest()
 
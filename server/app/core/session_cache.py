@@ -0,0 +1,127 @@
+from __future__ import annotations
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Iterable, Optional
+from app.core.config import settings
+
+# 인증된 세션 캐시 (token_hash -> 세션/사용자 스냅샷)
+# - LRU + TTL: MAX_STALENESS 초가 지난 항목은 miss로 처리하고 DB에서 다시 읽음
+#   (다른 워커/관리자가 revoke한 세션도 최대 MAX_STALENESS 초 안에 반영됨)
+# - 같은 프로세스에서의 logout/만료/revoke는 invalidate로 즉시 제거
+#   (session_id / user_id -> token_hash 색인으로 revoke 대상만 찾음, 전체 순회 없음)
+
+@dataclass
+class SessionInfo:
+    id: int
+    user_id: int
+    user_email: str
+    token_hash: str
+    hwid_hash: str
+    created_at: datetime
+    last_seen_at: datetime
+    is_active: bool = True
+    revoke_reason: Optional[str] = None
+
+@dataclass
+class UserInfo:
+    id: int
+    email: str
+
+class SessionCache:
+    def __init__(self, max_entries: int, max_staleness_sec: float):
+        self._max_entries = max_entries
+        self._max_staleness = max_staleness_sec
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, tuple[float, SessionInfo]]" = OrderedDict()
+        self._by_session: dict[int, str] = {}
+        self._by_user: dict[int, set[str]] = {}
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def get(self, token_hash: str) -> Optional[SessionInfo]:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(token_hash)
+            if entry is None:
+                self.misses += 1
+                return None
+            cached_at, info = entry
+            if now - cached_at > self._max_staleness:
+                self._remove(token_hash)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(token_hash)
+            self.hits += 1
+            return info
+
+    def put(self, info: SessionInfo) -> None:
+        if self._max_entries <= 0:
+            return
+        with self._lock:
+            self._remove(info.token_hash)
+            self._entries[info.token_hash] = (time.monotonic(), info)
+            self._by_session[info.id] = info.token_hash
+            self._by_user.setdefault(info.user_id, set()).add(info.token_hash)
+            while len(self._entries) > self._max_entries:
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+
+    def _remove(self, token_hash: str) -> bool:
+        # lock 안에서 호출. 항목과 색인을 함께 제거
+        entry = self._entries.pop(token_hash, None)
+        if entry is None:
+            return False
+        info = entry[1]
+        if self._by_session.get(info.id) == token_hash:
+            del self._by_session[info.id]
+        hashes = self._by_user.get(info.user_id)
+        if hashes is not None:
+            hashes.discard(token_hash)
+            if not hashes:
+                del self._by_user[info.user_id]
+        return True
+
+    def invalidate(self, token_hash: str) -> None:
+        with self._lock:
+            if self._remove(token_hash):
+                self.invalidations += 1
+
+    def invalidate_sessions(self, session_ids: Iterable[int]) -> None:
+        with self._lock:
+            for sid in session_ids:
+                token_hash = self._by_session.get(sid)
+                if token_hash is not None and self._remove(token_hash):
+                    self.invalidations += 1
+
+    def invalidate_user(self, user_id: int) -> None:
+        with self._lock:
+            for token_hash in list(self._by_user.get(user_id, ())):
+                if self._remove(token_hash):
+                    self.invalidations += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._by_session.clear()
+            self._by_user.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "size": len(self._entries),
+                "max_entries": self._max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+            }
+
+session_cache = SessionCache(
+    max_entries=settings.SESSION_CACHE_MAX_ENTRIES,
+    max_staleness_sec=settings.SESSION_CACHE_MAX_STALENESS_SEC,
+)
@@ -0,0 +1,137 @@
+from __future__ import annotations
+import logging
+import threading
+from datetime import datetime, timedelta
+from typing import Callable, Optional
+from sqlalchemy import delete, select, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+from app.db import models
+from app.db.database import SessionLocal
+from app.core.config import settings
+from app.core.security import utcnow
+from app.core.touch_buffer import touch_buffer
+from app.core.session_cache import session_cache
+from app.core.event_bus import purge_old_events, record_session_revoked
+
+# 만료 세션 reaper (백그라운드 스레드)
+# - TTL 이 지난 활성 세션을 배치 단위 UPDATE ... RETURNING 으로 만료 처리 (ix_sessions_active_last_seen)
+#   만료한 id 로 같은 트랜잭션에서 session_revoked(EXPIRED) 이벤트 기록 + 이 워커의 세션 캐시/touch 버퍼 정리
+#   (요청 경로의 지연 만료 deps._expire_session 과 같은 결과, SSE 연결에도 만료가 전달됨)
+# - revoke 후 보관 기간이 지난 세션은 배치 단위로 sessions_archive 로 옮기거나 삭제
+# - 보관 기간(EVENTS_RETENTION_HOURS)이 지난 session_events 삭제
+# 여러 워커에서 동시에 돌아도 결과는 같음 (조건부 UPDATE, archive 는 DELETE ... RETURNING 으로 배치를 먼저 가져감)
+
+log = logging.getLogger(__name__)
+
+_s = models.Session.__table__
+_archive = models.SessionArchive.__table__
+
+def expire_stale_sessions(db: Session, now: datetime | None = None) -> int:
+    """TTL 이 지난 활성 세션 만료. 만료된 행 수 반환. 배치마다 commit."""
+    # 이 워커의 버퍼만 먼저 기록됨. 다른 워커의 아직 flush 되지 않은 touch 는 DB 에 없으므로
+    # 살아 있는 세션을 만료시키지 않는 것은 SESSION_TOUCH_FLUSH_INTERVAL_SEC 가 TTL 보다 훨씬 짧기 때문
+    touch_buffer.flush()
+    now = now or utcnow()
+    cutoff = now - timedelta(minutes=settings.ACCESS_TOKEN_TTL_MIN)
+    batch = settings.SESSION_REAPER_BATCH_SIZE
+    total = 0
+    while True:
+        stale = (
+            select(_s.c.id)
+            .where(_s.c.is_active == True, _s.c.last_seen_at < cutoff)  # noqa: E712
+            .limit(batch)
+            .with_for_update(skip_locked=True)
+            .scalar_subquery()
+        )
+        ids = db.execute(
+            update(_s)
+            .where(_s.c.id.in_(stale), _s.c.is_active == True)  # noqa: E712
+            .values(is_active=False, revoked_at=now, revoke_reason="EXPIRED")
+            .returning(_s.c.id)
+        ).scalars().all()
+        if not ids:
+            break
+        record_session_revoked(db, ids, "EXPIRED", active_only=False)
+        db.commit()
+        session_cache.invalidate_sessions(ids)
+        for sid in ids:
+            touch_buffer.discard(sid)
+        total += len(ids)
+        if len(ids) < batch:
+            break
+    return total
+
+def archive_old_sessions(db: Session, now: datetime | None = None, mode: str | None = None) -> int:
+    """보관 기간이 지난 revoke 세션을 배치로 archive/delete. 처리한 행 수 반환. 배치마다 commit."""
+    mode = mode or settings.SESSION_ARCHIVE_MODE
+    if mode not in ("archive", "delete"):
+        raise ValueError(f"invalid SESSION_ARCHIVE_MODE: {mode}")
+    now = now or utcnow()
+    cutoff = now - timedelta(days=settings.SESSION_RETENTION_DAYS)
+    batch = settings.SESSION_REAPER_BATCH_SIZE
+    total = 0
+    while True:
+        # claim: 삭제한 워커만 그 행을 받음 (PostgreSQL 은 SKIP LOCKED 로 워커마다 다른 배치)
+        # archive INSERT 는 ON CONFLICT DO NOTHING -> 같은 id 가 이미 보관돼 있어도 IntegrityError 없음
+        claim = (
+            select(_s.c.id)
+            .where(_s.c.is_active == False, _s.c.revoked_at < cutoff)  # noqa: E712
+            .limit(batch)
+            .with_for_update(skip_locked=True)
+            .scalar_subquery()
+        )
+        rows = db.execute(delete(_s).where(_s.c.id.in_(claim)).returning(*_s.columns)).mappings().all()
+        if not rows:
+            break
+        if mode == "archive":
+            ins = sqlite_insert(_archive) if db.get_bind().dialect.name == "sqlite" else pg_insert(_archive)
+            db.execute(
+                ins.on_conflict_do_nothing(index_elements=[_archive.c.id]),
+                [{**r, "archived_at": now} for r in rows],
+            )
+        db.commit()
+        total += len(rows)
+        if len(rows) < batch:
+            break
+    return total
+
+class SessionReaper:
+    def __init__(self, session_factory: Callable, interval_sec: float):
+        self._session_factory = session_factory
+        self._interval = interval_sec
+        self._stopping = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def run_once(self) -> tuple[int, int, int]:
+        with self._session_factory() as db:
+            expired = expire_stale_sessions(db)
+            archived = archive_old_sessions(db)
+            purged = purge_old_events(db)
+        return expired, archived, purged
+
+    def _run(self) -> None:
+        while not self._stopping.wait(self._interval):
+            try:
+                self.run_once()
+            except Exception:
+                log.exception("session reaper failed")
+
+    def start(self) -> None:
+        if self._thread is not None or self._interval <= 0:
+            return
+        self._stopping.clear()
+        self._thread = threading.Thread(target=self._run, name="session-reaper", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        if self._thread is not None:
+            self._stopping.set()
+            self._thread.join()
+            self._thread = None
+
+session_reaper = SessionReaper(
+    session_factory=SessionLocal,
+    interval_sec=settings.SESSION_REAPER_INTERVAL_SEC,
+)
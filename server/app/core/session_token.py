@@ -0,0 +1,51 @@
+from __future__ import annotations
+import base64
+import re
+import secrets
+from dataclasses import dataclass
+from typing import Optional
+from app.core.config import settings
+from app.core.security import constant_time_equal, hmac_sha256, sha256_hex
+
+# 세션 토큰 포맷: st2.<session_id>.<rand>.<tag>
+# - tag = b64url(HMAC-SHA256(SERVER_SECRET, "st2.<session_id>.<rand>")[:16])
+# - 형식/tag 검증을 메모리에서 먼저 수행 -> 위조/손상 토큰은 DB 접근 없이 401
+# - 통과한 토큰은 session_id(PK)로 조회하고 저장된 sha256(토큰)과 비교
+#   (DB 에는 여전히 토큰 해시만 저장, 세션 캐시 키도 token_hash 그대로)
+# - 기존 토큰(uuid4 두 개를 이은 문자열): SESSION_ACCEPT_LEGACY_TOKENS 이면 token_hash 인덱스로 조회
+#   모든 기존 세션이 만료된 뒤(ACCESS_TOKEN_TTL_MIN 경과) 끄면 됨
+
+PREFIX = "st2"
+_TAG_BYTES = 16
+_MAX_LEN = 128
+
+_UUID4 = "[0-9a-f]{8}-[0-9a-f]{4}-4[0-9a-f]{3}-[89ab][0-9a-f]{3}-[0-9a-f]{12}"
+_LEGACY_RE = re.compile(f"{_UUID4}{_UUID4}")
+
+@dataclass(frozen=True)
+class TokenRef:
+    token_hash: str
+    session_id: Optional[int]  # None 이면 기존 포맷 토큰 (token_hash 로 조회)
+
+# 형식/tag 검증에서 거절된 토큰 수 (/metrics)
+token_stats = {"rejected": 0, "legacy": 0}
+
+def _tag(body: str) -> str:
+    mac = hmac_sha256(settings.SERVER_SECRET, body.encode("utf-8"))[:_TAG_BYTES]
+    return base64.urlsafe_b64encode(mac).decode("ascii").rstrip("=")
+
+def issue_session_token(session_id: int) -> str:
+    body = f"{PREFIX}.{session_id}.{secrets.token_urlsafe(24)}"
+    return f"{body}.{_tag(body)}"
+
+def parse_session_token(token: str) -> Optional[TokenRef]:
+    """검증된 토큰 참조. 형식/tag 가 맞지 않으면 None (DB 조회 불필요)."""
+    if len(token) <= _MAX_LEN and token.isascii() and token.startswith(PREFIX + "."):
+        parts = token.split(".")
+        if len(parts) == 4 and parts[1].isdigit() and constant_time_equal(parts[3], _tag(token[: -len(parts[3]) - 1])):
+            return TokenRef(sha256_hex(token.encode("utf-8")), int(parts[1]))
+    elif settings.SESSION_ACCEPT_LEGACY_TOKENS and _LEGACY_RE.fullmatch(token):
+        token_stats["legacy"] += 1
+        return TokenRef(sha256_hex(token.encode("utf-8")), None)
+    token_stats["rejected"] += 1
+    return None
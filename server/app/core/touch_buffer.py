@@ -0,0 +1,112 @@
+from __future__ import annotations
+import logging
+import threading
+from datetime import datetime
+from typing import Callable, Dict, Optional
+from sqlalchemy import bindparam, update
+from app.db import models
+from app.db.database import SessionLocal
+from app.core.config import settings
+
+# 세션 last_seen_at write-behind 버퍼
+# - 요청 경로에서는 메모리에만 기록 (세션 id 별로 최신 값만 유지)
+# - 백그라운드 flusher가 주기적으로, 또는 dirty 세션이 MAX_DIRTY개 이상이면 한 번의 bulk UPDATE로 기록
+# - 종료 시 stop()이 남은 값을 모두 기록
+
+log = logging.getLogger(__name__)
+
+_sessions = models.Session.__table__
+
+_flush_stmt = (
+    update(_sessions)
+    .where(_sessions.c.id == bindparam("b_id"))
+    .where(_sessions.c.last_seen_at < bindparam("b_seen"))  # 값이 뒤로 가지 않도록
+    .values(last_seen_at=bindparam("b_seen"))
+)
+
+class TouchBuffer:
+    def __init__(
+        self,
+        session_factory: Callable,
+        flush_interval_sec: float,
+        max_dirty: int,
+    ):
+        self._session_factory = session_factory
+        self._flush_interval = flush_interval_sec
+        self._max_dirty = max_dirty
+        self._lock = threading.Lock()
+        self._dirty: Dict[int, datetime] = {}
+        self._wakeup = threading.Event()
+        self._stopping = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def touch(self, session_id: int, seen_at: datetime) -> None:
+        with self._lock:
+            prev = self._dirty.get(session_id)
+            if prev is None or seen_at > prev:
+                self._dirty[session_id] = seen_at
+            full = len(self._dirty) >= self._max_dirty
+        if full:
+            if self._thread is not None:
+                self._wakeup.set()
+            else:
+                self.flush()
+
+    def pending(self, session_id: int) -> Optional[datetime]:
+        with self._lock:
+            return self._dirty.get(session_id)
+
+    def discard(self, session_id: int) -> None:
+        with self._lock:
+            self._dirty.pop(session_id, None)
+
+    def flush(self) -> int:
+        with self._lock:
+            if not self._dirty:
+                return 0
+            batch, self._dirty = self._dirty, {}
+        rows = [{"b_id": sid, "b_seen": seen} for sid, seen in batch.items()]
+        try:
+            with self._session_factory() as db:
+                db.execute(_flush_stmt, rows)
+                db.commit()
+        except Exception:
+            # 실패하면 다음 flush에서 다시 시도 (그 사이 들어온 더 최신 값은 유지)
+            with self._lock:
+                for sid, seen in batch.items():
+                    cur = self._dirty.get(sid)
+                    if cur is None or seen > cur:
+                        self._dirty[sid] = seen
+            raise
+        return len(rows)
+
+    def _run(self) -> None:
+        while not self._stopping.is_set():
+            self._wakeup.wait(self._flush_interval)
+            self._wakeup.clear()
+            try:
+                self.flush()
+            except Exception:
+                log.exception("session touch flush failed")
+
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+        self._stopping.clear()
+        self._thread = threading.Thread(target=self._run, name="session-touch-flusher", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        if self._thread is not None:
+            self._stopping.set()
+            self._wakeup.set()
+            self._thread.join()
+            self._thread = None
+        # 남은 touch drain
+        self.flush()
+
+touch_buffer = TouchBuffer(
+    session_factory=SessionLocal,
+    flush_interval_sec=settings.SESSION_TOUCH_FLUSH_INTERVAL_SEC,
+    max_dirty=settings.SESSION_TOUCH_MAX_DIRTY,
+)
@@ -1,21 +1,115 @@
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker, DeclarativeBase
+from sqlalchemy import create_engine, event
+from sqlalchemy import exc as sa_exc
+from sqlalchemy.engine import Engine
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import Session, sessionmaker, DeclarativeBase
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
 from app.core.config import settings
 
-engine = create_engine(
-    settings.SERVER_DB_URL,
-    connect_args={"check_same_thread": False} if settings.SERVER_DB_URL.startswith("sqlite") else {},
-    pool_pre_ping=True,
-)
+_is_sqlite = settings.SERVER_DB_URL.startswith("sqlite")
+_sqlite_production = _is_sqlite and settings.SQLITE_PROFILE == "production"
 
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+def async_db_url(url: str) -> str:
+    # 동기 드라이버 URL -> async 드라이버 URL
+    if url.startswith("sqlite:"):
+        return "sqlite+aiosqlite:" + url[len("sqlite:"):]
+    if url.startswith("postgresql:") or url.startswith("postgresql+psycopg2:"):
+        return "postgresql+asyncpg:" + url.split(":", 1)[1]
+    return url  # postgresql+psycopg 등은 그대로 async 지원
+
+def _install_sqlite_pragmas(sync_engine: Engine, read_only: bool) -> None:
+    @event.listens_for(sync_engine, "connect")
+    def _on_connect(dbapi_conn, _record):
+        cur = dbapi_conn.cursor()
+        cur.execute("PRAGMA journal_mode=WAL")
+        cur.execute("PRAGMA synchronous=NORMAL")
+        cur.execute(f"PRAGMA mmap_size={int(settings.SQLITE_MMAP_SIZE)}")
+        cur.execute(f"PRAGMA busy_timeout={int(settings.SQLITE_BUSY_TIMEOUT_MS)}")
+        cur.execute(f"PRAGMA cache_size=-{int(settings.SQLITE_CACHE_SIZE_KIB)}")
+        if read_only:
+            cur.execute("PRAGMA query_only=ON")
+        cur.close()
+
+def _engine_kwargs(read_only: bool, is_async: bool = False) -> dict:
+    kw: dict = {"pool_pre_ping": True}
+    if _is_sqlite and not is_async:
+        kw["connect_args"] = {"check_same_thread": False}
+    if _sqlite_production:
+        kw["poolclass"] = AsyncAdaptedQueuePool if is_async else QueuePool
+        if read_only:
+            kw.update(pool_size=settings.SQLITE_READ_POOL_SIZE, max_overflow=0)
+        else:
+            # 단일 writer 연결: 쓰기 트랜잭션은 풀 checkout 에서 순서대로 대기
+            kw.update(pool_size=1, max_overflow=0, pool_timeout=settings.SQLITE_WRITE_QUEUE_TIMEOUT_SEC)
+    return kw
+
+engine = create_engine(settings.SERVER_DB_URL, **_engine_kwargs(read_only=False))
+
+# production 프로필에서만 별도 read-only 풀 (그 외에는 writer 와 동일)
+read_engine = engine
+if _sqlite_production:
+    read_engine = create_engine(settings.SERVER_DB_URL, **_engine_kwargs(read_only=True))
+    _install_sqlite_pragmas(engine, read_only=False)
+    _install_sqlite_pragmas(read_engine, read_only=True)
+
+def _routing_session_class(writer: Engine, reader: Engine) -> type[Session]:
+    class RoutingSession(Session):
+        # flush/DML 은 writer, 그 외 조회는 reader.
+        # 한 번 writer 를 쓴 세션은 이후 조회도 writer 로 (자기 쓰기 결과를 읽을 수 있도록)
+        def get_bind(self, mapper=None, clause=None, **kw):
+            if self.info.get("_writer") or self._flushing or getattr(clause, "is_dml", False):
+                self.info["_writer"] = True
+                return writer
+            return reader
+
+    return RoutingSession
+
+if _sqlite_production:
+    SessionLocal = sessionmaker(
+        autocommit=False, autoflush=False, class_=_routing_session_class(engine, read_engine)
+    )
+else:
+    SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+# async 모드에서만 생성 (백그라운드 작업/초기화는 계속 동기 engine 사용)
+async_engine = None
+async_read_engine = None
+AsyncSessionLocal = None
+if settings.DB_ASYNC:
+    _async_url = settings.SERVER_ASYNC_DB_URL or async_db_url(settings.SERVER_DB_URL)
+    async_engine = create_async_engine(_async_url, **_engine_kwargs(read_only=False, is_async=True))
+    if _sqlite_production:
+        async_read_engine = create_async_engine(_async_url, **_engine_kwargs(read_only=True, is_async=True))
+        _install_sqlite_pragmas(async_engine.sync_engine, read_only=False)
+        _install_sqlite_pragmas(async_read_engine.sync_engine, read_only=True)
+        AsyncSessionLocal = async_sessionmaker(
+            class_=AsyncSession,
+            sync_session_class=_routing_session_class(async_engine.sync_engine, async_read_engine.sync_engine),
+            autoflush=False,
+            expire_on_commit=False,
+        )
+    else:
+        AsyncSessionLocal = async_sessionmaker(async_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False)
 
 class Base(DeclarativeBase):
     pass
 
+class DatabaseBusy(Exception):
+    """쓰기 경합으로 지금은 처리할 수 없음 (main.py 에서 503 + Retry-After)."""
+
+def is_write_contention(e: Exception) -> bool:
+    # SQLite busy_timeout 초과 또는 단일 writer 풀 checkout timeout
+    if isinstance(e, sa_exc.TimeoutError):
+        return True
+    return isinstance(e, sa_exc.OperationalError) and "locked" in str(e.orig)
+
 def get_db():
     db = SessionLocal()
     try:
         yield db
     finally:
         db.close()
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
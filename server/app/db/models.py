@@ -23,6 +23,12 @@ class Product(Base):
 
     license_codes: Mapped[list["LicenseCode"]] = relationship(back_populates="product")
 
+class CatalogVersion(Base):
+    # 제품 카탈로그 버전 (단일 행). products 변경 시 증가 -> 각 워커가 캐시 reload
+    __tablename__ = "catalog_version"
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    version: Mapped[int] = mapped_column(Integer, default=1, nullable=False)
+
 class LicenseCode(Base):
     __tablename__ = "license_codes"
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
@@ -64,4 +70,53 @@ class Session(Base):
 
     __table_args__ = (
         Index("ix_sessions_user_active", "user_id", "is_active"),
+        # reaper: 만료 대상(활성 + last_seen 오래됨) / 보관 대상(revoke 후 오래됨) 조회용
+        Index("ix_sessions_active_last_seen", "is_active", "last_seen_at"),
+        Index("ix_sessions_active_revoked_at", "is_active", "revoked_at"),
+    )
+
+class SessionArchive(Base):
+    # 보관 기간이 지난 revoke 세션 (sessions 테이블을 작게 유지)
+    __tablename__ = "sessions_archive"
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=False)
+    user_id: Mapped[int] = mapped_column(Integer, index=True, nullable=False)
+    token_hash: Mapped[str] = mapped_column(String(64), nullable=False)
+    hwid_hash: Mapped[str] = mapped_column(String(64), nullable=False)
+    created_at: Mapped[datetime] = mapped_column(DateTime, nullable=False)
+    last_seen_at: Mapped[datetime] = mapped_column(DateTime, nullable=False)
+    is_active: Mapped[bool] = mapped_column(Boolean, nullable=False)
+    revoked_at: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)
+    revoke_reason: Mapped[str | None] = mapped_column(Text, nullable=True)
+    archived_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, nullable=False)
+
+class Entitlement(Base):
+    # (user, product)별 비정규화 라이선스 상태. license_codes 에서 재계산 가능 (app/core/entitlements.py)
+    __tablename__ = "entitlements"
+    user_id: Mapped[int] = mapped_column(ForeignKey("users.id"), primary_key=True)
+    product_id: Mapped[int] = mapped_column(ForeignKey("products.id"), primary_key=True)
+
+    # 선택된(가장 좋은) 라이선스
+    license_code_id: Mapped[int | None] = mapped_column(ForeignKey("license_codes.id"), nullable=True)
+    expires_at: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)
+    bound_hwid_hash: Mapped[str | None] = mapped_column(String(64), nullable=True)
+    is_revoked: Mapped[bool] = mapped_column(Boolean, default=False, nullable=False)
+
+    updated_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, nullable=False)
+
+class SessionEvent(Base):
+    # revoke 알림 (GET /session/events). 모든 워커가 id(cursor) 순서로 폴링해 자기 SSE 연결로 전달
+    __tablename__ = "session_events"
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    user_id: Mapped[int] = mapped_column(Integer, nullable=False)
+    session_id: Mapped[int | None] = mapped_column(Integer, nullable=True)  # session_revoked 대상 세션
+    kind: Mapped[str] = mapped_column(String(32), nullable=False)  # "session_revoked" | "license_revoked"
+    data: Mapped[str] = mapped_column(Text, default="{}", nullable=False)  # JSON
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, nullable=False)
+
+    __table_args__ = (
+        # Last-Event-ID 재개: 사용자별 cursor 이후 이벤트 조회
+        Index("ix_session_events_user_id", "user_id", "id"),
+        Index("ix_session_events_created_at", "created_at"),
+        # 행을 지워도 id 가 재사용되지 않도록 (cursor 가 뒤로 가지 않음)
+        {"sqlite_autoincrement": True},
     )
@@ -1,17 +1,63 @@
 from __future__ import annotations
-from fastapi import FastAPI
-from app.db.database import engine
-from app.db.database import Base
+import sys
+from contextlib import asynccontextmanager
+from fastapi import Depends, FastAPI, Request
+from fastapi.responses import JSONResponse
+from app.db.database import engine, async_engine, async_read_engine
+from app.db.database import Base, DatabaseBusy
 from app.db import models
 from sqlalchemy.orm import Session
 from app.core.config import settings
-from app.routers import auth, license, session, products
+from app.core.touch_buffer import touch_buffer
+from app.core.session_reaper import session_reaper
+from app.core.session_cache import session_cache
+from app.core.hash_pool import hash_pool, HashPoolBusy
+from app.core.idempotency import idempotency_store
+from app.core.event_bus import event_bus
+from app.core.session_token import token_stats
+from app.core.entitlements import rebuild_entitlements
+from app.core.product_catalog import product_catalog
+from app.core.lease import leases_enabled
+from app.routers import admin, auth, license, session, products, client
+
+# /health 로 알리는 선택 기능 목록
+SERVER_FEATURES = ["bootstrap", "validate-batch", "idempotency-key", "session-events"]
+
+def _max_rss_kib() -> int | None:
+    # ru_maxrss 단위: Linux KiB, macOS bytes (Windows 에는 resource 모듈 없음)
+    try:
+        import resource
+    except ImportError:
+        return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss // 1024 if sys.platform == "darwin" else rss
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    touch_buffer.start()
+    session_reaper.start()
+    await event_bus.start()
+    try:
+        yield
+    finally:
+        await event_bus.stop()
+        session_reaper.stop()
+        # 종료 시 남은 last_seen 갱신을 DB에 기록
+        touch_buffer.stop()
+        hash_pool.shutdown()
+        for e in (async_engine, async_read_engine):
+            if e is not None:
+                await e.dispose()
 
 def create_app() -> FastAPI:
-    app = FastAPI(title="HW Lock Licensing Server", version="1.0.0")
+    app = FastAPI(title="HW Lock Licensing Server", version="1.0.0", lifespan=lifespan)
 
     # DB init
     Base.metadata.create_all(bind=engine)
+    # 기존 테이블에 나중에 추가된 인덱스 생성 (create_all 은 기존 테이블의 인덱스를 만들지 않음)
+    for table in Base.metadata.sorted_tables:
+        for ix in table.indexes:
+            ix.create(bind=engine, checkfirst=True)
 
     # seed products if missing
     with Session(engine) as db:
@@ -22,14 +68,53 @@ def create_app() -> FastAPI:
             ])
             db.commit()
 
-    app.include_router(auth.router)
-    app.include_router(products.router)
-    app.include_router(license.router)
-    app.include_router(session.router)
+        # entitlements 테이블이 새로 생긴 경우 기존 license_codes 로부터 backfill
+        if (
+            db.query(models.Entitlement).first() is None
+            and db.query(models.LicenseCode).filter(models.LicenseCode.redeemed_by_user_id.isnot(None)).first() is not None
+        ):
+            rebuild_entitlements(db)
+
+        product_catalog.load(db)
+
+    @app.exception_handler(HashPoolBusy)
+    async def hash_pool_busy(request: Request, exc: HashPoolBusy):
+        # 해시 풀 포화: 빠르게 거절하고 재시도 시점 안내
+        return JSONResponse(
+            status_code=503,
+            content={"detail": "Server busy. Retry later."},
+            headers={"Retry-After": str(settings.PASSWORD_HASH_RETRY_AFTER_SEC)},
+        )
+
+    @app.exception_handler(DatabaseBusy)
+    async def database_busy(request: Request, exc: DatabaseBusy):
+        # DB 쓰기 경합 (SQLite lock / writer 대기열 timeout): 재시도 시점 안내
+        return JSONResponse(
+            status_code=503,
+            content={"detail": "Server busy. Retry later."},
+            headers={"Retry-After": str(settings.SQLITE_BUSY_RETRY_AFTER_SEC)},
+        )
+
+    # DB_ASYNC=true 이면 async 라우터(AsyncSession) 사용
+    for m in (auth, products, license, session, client, admin):
+        app.include_router(m.async_router if settings.DB_ASYNC else m.router)
 
     @app.get("/health")
     def health():
-        return {"ok": True}
+        # features: 클라이언트가 새 엔드포인트 사용 여부를 판단 (없으면 기존 방식으로 동작)
+        return {"ok": True, "features": SERVER_FEATURES + (["lease"] if leases_enabled() else [])}
+
+    @app.get("/metrics", dependencies=[Depends(admin.require_admin)])
+    def metrics():
+        # 캐시/버퍼 크기 산정용 내부 카운터 (관리자 전용: X-Admin-Token)
+        return {
+            "session_cache": session_cache.stats(),
+            "password_hash_pool": hash_pool.stats(),
+            "idempotency": idempotency_store.stats(),
+            "events": event_bus.stats(),
+            "session_tokens": dict(token_stats),
+            "process": {"max_rss_kib": _max_rss_kib()},
+        }
 
     return app
 
@@ -0,0 +1,88 @@
+from __future__ import annotations
+from typing import Optional
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import case, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from app.db.database import SessionLocal, get_db, get_async_db
+from app.db import models
+from app.core.config import settings
+from app.core.license_import import LicenseImporter
+from app.core.security import constant_time_equal
+
+# 관리자 API: X-Admin-Token 헤더 == ADMIN_API_TOKEN (비어 있으면 비활성, 404)
+
+def require_admin(x_admin_token: Optional[str] = Header(default=None)) -> None:
+    if not settings.ADMIN_API_TOKEN:
+        raise HTTPException(status_code=404, detail="Not Found")
+    if not x_admin_token or not constant_time_equal(x_admin_token, settings.ADMIN_API_TOKEN):
+        raise HTTPException(status_code=403, detail="Forbidden")
+
+router = APIRouter(prefix="/admin", tags=["admin"], dependencies=[Depends(require_admin)])
+async_router = APIRouter(prefix="/admin", tags=["admin"], dependencies=[Depends(require_admin)])
+
+# 라이선스 코드 bulk import (app/core/license_import.py)
+# - 요청 body 를 줄 단위로 스트리밍: 전체 업로드를 메모리에 올리지 않고 batch_size 줄마다 스레드풀에서 검증 + INSERT
+# - 배치마다 commit 하므로 중간에 끊겨도 들어간 코드는 남음, 같은 파일을 다시 올리면 나머지만 들어감
+
+def _open_importer(batch_size: Optional[int]) -> LicenseImporter:
+    return LicenseImporter(SessionLocal(), batch_size)
+
+def _finish(importer: LicenseImporter) -> dict:
+    try:
+        return importer.finish().as_dict()
+    finally:
+        importer.db.close()
+
+async def import_licenses(request: Request, batch_size: Optional[int] = Query(default=None, ge=1, le=100000)):
+    importer = await run_in_threadpool(_open_importer, batch_size)
+    try:
+        lines: list[bytes] = []
+        tail = b""
+        async for chunk in request.stream():
+            *complete, tail = (tail + chunk).split(b"\n")
+            lines.extend(complete)
+            if len(lines) >= importer.batch_size:
+                await run_in_threadpool(importer.add_lines, lines)
+                lines = []
+        lines.append(tail)
+        await run_in_threadpool(importer.add_lines, lines)
+    except BaseException:
+        importer.db.close()
+        raise
+    return await run_in_threadpool(_finish, importer)
+
+# 두 라우터 모두 같은 async 핸들러 (DB 작업은 스레드풀의 동기 세션)
+router.post("/licenses/import")(import_licenses)
+async_router.post("/licenses/import")(import_licenses)
+
+def _inventory(db: Session) -> dict:
+    # 제품별 등록/사용/정지 수 (사전 등록된 미사용 재고 = available)
+    c = models.LicenseCode
+    rows = db.execute(
+        select(
+            models.Product.code,
+            func.count(c.id),
+            func.count(c.redeemed_by_user_id),
+            func.sum(case((c.is_revoked == True, 1), else_=0)),  # noqa: E712
+            func.sum(case(((c.is_revoked == False) & c.redeemed_by_user_id.is_(None), 1), else_=0)),  # noqa: E712
+        )
+        .join(c, c.product_id == models.Product.id)
+        .group_by(models.Product.code)
+        .order_by(models.Product.code)
+    ).all()
+    return {
+        "products": [
+            {"product_code": code, "total": total, "redeemed": redeemed, "revoked": revoked, "available": available}
+            for code, total, redeemed, revoked, available in rows
+        ]
+    }
+
+@router.get("/licenses/inventory")
+def inventory(db: Session = Depends(get_db)):
+    return _inventory(db)
+
+@async_router.get("/licenses/inventory")
+async def inventory_async(db: AsyncSession = Depends(get_async_db)):
+    return await db.run_sync(_inventory)
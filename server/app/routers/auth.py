@@ -1,82 +1,191 @@
 from __future__ import annotations
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, Header, HTTPException, Response, status
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from uuid import uuid4
-from app.db.database import get_db
+from sqlalchemy import DateTime, Integer, String, and_, func, insert, literal, select, true, update
+from sqlalchemy.exc import IntegrityError, OperationalError, TimeoutError as PoolTimeoutError
+from datetime import timedelta
+import secrets
+from app.db.database import DatabaseBusy, get_db, get_async_db, is_write_contention
 from app.db import models
 from app.core.schemas import RegisterRequest, LoginRequest, TokenResponse, LogoutResponse
-from app.core.security import hash_password, verify_password, sha256_hex, utcnow, expires_at_from_now
+from app.core.security import (
+    hash_password, hash_password_async, verify_and_update_password, verify_and_update_password_async,
+    sha256_hex, utcnow, expires_at_from_now,
+)
 from app.core.config import settings
-from app.core.deps import get_current_session
+from app.core.deps import get_current_session, get_current_session_async, revoke_sessions
+from app.core.session_cache import SessionInfo
+from app.core.idempotency import run_idempotent, run_idempotent_async
+from app.core.session_token import issue_session_token
 
 router = APIRouter(prefix="/auth", tags=["auth"])
+async_router = APIRouter(prefix="/auth", tags=["auth"])
 
-@router.post("/register", status_code=201)
-def register(req: RegisterRequest, db: Session = Depends(get_db)):
-    if db.query(models.User).filter(models.User.email == req.email).first():
+_sessions = models.Session.__table__
+
+# 라우터 로직은 동기 Session 기준 함수로 두고,
+# 동기 라우터는 직접 호출 / async 라우터는 AsyncSession.run_sync 로 호출한다.
+# 비밀번호 해시는 DB 작업과 분리해 해시 풀에서 실행 (async 모드에서는 await)
+# 해시(수백 ms)를 기다리기 전에 읽기 트랜잭션을 끝내 DB 커넥션을 풀에 돌려준다 (필요한 값은 plain 값으로 읽어 둠)
+
+def _ensure_email_available(db: Session, email: str) -> None:
+    if db.query(models.User).filter(models.User.email == email).first():
         raise HTTPException(status_code=409, detail="Email already exists")
-    u = models.User(email=req.email, password_hash=hash_password(req.password))
+
+def _create_user(db: Session, email: str, password_hash: str) -> dict:
+    # 확인(_ensure_email_available)과 INSERT 사이에 같은 email 로 먼저 가입한 요청이 있으면 unique 위반 -> 409
+    u = models.User(email=email, password_hash=password_hash)
     db.add(u)
-    db.commit()
+    try:
+        db.commit()
+    except IntegrityError:
+        db.rollback()
+        raise HTTPException(status_code=409, detail="Email already exists")
     db.refresh(u)
     return {"ok": True, "email": u.email}
 
-def _active_sessions_for_user(db: Session, user_id: int):
-    return (
-        db.query(models.Session)
-          .filter(models.Session.user_id == user_id, models.Session.is_active == True)  # noqa: E712
-          .all()
+@router.post("/register", status_code=201)
+def register(req: RegisterRequest, db: Session = Depends(get_db)):
+    _ensure_email_available(db, req.email)
+    db.rollback()
+    return _create_user(db, req.email, hash_password(req.password))
+
+@async_router.post("/register", status_code=201)
+async def register_async(req: RegisterRequest, db: AsyncSession = Depends(get_async_db)):
+    await db.run_sync(_ensure_email_available, req.email)
+    await db.rollback()
+    password_hash = await hash_password_async(req.password)
+    return await db.run_sync(_create_user, req.email, password_hash)
+
+def _active_sessions_clause(user_id: int):
+    # 만료 처리는 reaper 가 담당. TTL 이 지난(아직 reaper 가 처리하지 않은) 세션은 세지 않음
+    cutoff = utcnow() - timedelta(minutes=settings.ACCESS_TOKEN_TTL_MIN)
+    return and_(
+        _sessions.c.user_id == user_id,
+        _sessions.c.is_active == True,  # noqa: E712
+        _sessions.c.last_seen_at >= cutoff,
     )
 
-@router.post("/login", response_model=TokenResponse)
-def login(req: LoginRequest, db: Session = Depends(get_db)):
-    u = db.query(models.User).filter(models.User.email == req.email).first()
-    if not u or not verify_password(req.password, u.password_hash):
+def _count_active_sessions(db: Session, user_id: int) -> int:
+    return db.execute(select(func.count()).select_from(_sessions).where(_active_sessions_clause(user_id))).scalar_one()
+
+def _admit_session(db: Session, user_id: int, token_hash: str, hwid_hash: str) -> int | None:
+    """동시 세션 한도 안에서만 세션을 INSERT 하는 단일 조건부 문장. 발급된 세션 id (한도 초과면 None). commit은 호출자가 한다.
+
+    INSERT INTO sessions (...) SELECT ... WHERE (SELECT COUNT(*) ... 활성 세션) < MAX
+    - SQLite: 문장 하나가 writer lock 아래에서 실행되므로 COUNT 와 INSERT 사이에 끼어들 수 없음
+    - PostgreSQL 등: 같은 트랜잭션에서 users 행을 FOR UPDATE 로 잠가 같은 계정의 로그인을 직렬화
+    """
+    if db.get_bind().dialect.name != "sqlite":
+        db.execute(select(models.User.id).where(models.User.id == user_id).with_for_update())
+    now = utcnow()
+    active = select(func.count()).select_from(_sessions).where(_active_sessions_clause(user_id)).scalar_subquery()
+    stmt = insert(_sessions).from_select(
+        ["user_id", "token_hash", "hwid_hash", "created_at", "last_seen_at", "is_active"],
+        select(
+            literal(user_id, Integer),
+            literal(token_hash, String),
+            literal(hwid_hash, String),
+            literal(now, DateTime),
+            literal(now, DateTime),
+            true(),
+        ).where(active < settings.MAX_CONCURRENT_SESSIONS_PER_USER),
+    ).returning(_sessions.c.id)
+    try:
+        return db.execute(stmt).scalar()
+    except (OperationalError, PoolTimeoutError) as e:
+        # 동시 로그인 쓰기 경합 ("database is locked" 등): 500 대신 503 + Retry-After
+        if not is_write_contention(e):
+            raise
+        db.rollback()
+        raise DatabaseBusy() from e
+
+def _find_user(db: Session, email: str) -> tuple[int, str, str]:
+    """(id, email, password_hash)."""
+    row = db.execute(
+        select(models.User.id, models.User.email, models.User.password_hash).where(models.User.email == email)
+    ).first()
+    if not row:
         raise HTTPException(status_code=401, detail="Invalid credentials")
+    return tuple(row)
 
-    # 동시 세션 차단: 이미 활성 세션이 있으면 로그인 차단
-    active = _active_sessions_for_user(db, u.id)
-    # TTL 만료된 세션은 정리
-    cleaned = []
-    for s in active:
-        ttl_sec = settings.ACCESS_TOKEN_TTL_MIN * 60
-        if (utcnow() - s.last_seen_at).total_seconds() > ttl_sec:
-            s.is_active = False
-            s.revoked_at = utcnow()
-            s.revoke_reason = "EXPIRED"
-            cleaned.append(s)
-    if cleaned:
-        db.commit()
+def _issue_session(db: Session, user_id: int, email: str, req: LoginRequest, new_hash: str | None) -> TokenResponse:
+    if new_hash:
+        # 해시 파라미터가 현재 설정과 다르면 재해시 (아래 세션 발급과 함께 commit)
+        db.execute(update(models.User).where(models.User.id == user_id).values(password_hash=new_hash))
 
-    active = _active_sessions_for_user(db, u.id)
-    if len(active) >= settings.MAX_CONCURRENT_SESSIONS_PER_USER:
+    # 새 세션 발급: 동시 세션 검사와 INSERT 를 하나의 원자적 문장으로 처리
+    # 토큰에 세션 id 가 들어가므로 임시 token_hash 로 INSERT 한 뒤 같은 트랜잭션에서 실제 해시로 교체
+    pending_hash = sha256_hex(secrets.token_bytes(32))
+    session_id = _admit_session(db, user_id, pending_hash, req.hwid_hash)
+    if session_id is None:
+        db.rollback()
         # 요구사항: 동일 계정으로 2대 이상 로그인 불가. 활성 세션 존재 시 로그인 차단.
-        raise HTTPException(status_code=403, detail="Active session exists. Logout first.")
-
-    # 새 세션 발급
-    raw_token = str(uuid4()) + str(uuid4())  # 길게
-    token_hash = sha256_hex(raw_token.encode("utf-8"))
-    s = models.Session(
-        user_id=u.id,
-        token_hash=token_hash,
-        hwid_hash=req.hwid_hash,
-        created_at=utcnow(),
-        last_seen_at=utcnow(),
-        is_active=True,
+        raise HTTPException(
+            status_code=403,
+            detail="Active session exists. Logout first.",
+            headers={"X-Active-Sessions": str(_count_active_sessions(db, user_id))},
+        )
+    raw_token = issue_session_token(session_id)
+    db.execute(
+        update(_sessions).where(_sessions.c.id == session_id).values(token_hash=sha256_hex(raw_token.encode("utf-8")))
     )
-    db.add(s)
     db.commit()
 
     return TokenResponse(
         access_token=raw_token,
-        user_email=u.email,
+        user_email=email,
         session_expires_at=expires_at_from_now(settings.ACCESS_TOKEN_TTL_MIN),
     )
 
-@router.post("/logout", response_model=LogoutResponse)
-def logout(sess = Depends(get_current_session), db: Session = Depends(get_db)):
-    sess.is_active = False
-    sess.revoked_at = utcnow()
-    sess.revoke_reason = "LOGOUT"
+def _login(db: Session, req: LoginRequest) -> TokenResponse:
+    user_id, email, password_hash = _find_user(db, req.email)
+    db.rollback()
+    ok, new_hash = verify_and_update_password(req.password, password_hash)
+    if not ok:
+        raise HTTPException(status_code=401, detail="Invalid credentials")
+    return _issue_session(db, user_id, email, req, new_hash)
+
+async def _login_async(db: AsyncSession, req: LoginRequest) -> TokenResponse:
+    user_id, email, password_hash = await db.run_sync(_find_user, req.email)
+    await db.rollback()
+    ok, new_hash = await verify_and_update_password_async(req.password, password_hash)
+    if not ok:
+        raise HTTPException(status_code=401, detail="Invalid credentials")
+    return await db.run_sync(_issue_session, user_id, email, req, new_hash)
+
+# Idempotency-Key 가 있으면 같은 키의 재시도에는 첫 응답을 재생 (bcrypt/세션 발급 재실행 없음)
+
+@router.post("/login", response_model=TokenResponse)
+def login(
+    req: LoginRequest,
+    response: Response,
+    db: Session = Depends(get_db),
+    idempotency_key: str | None = Header(None, alias="Idempotency-Key"),
+):
+    return run_idempotent("login", req.email.lower(), idempotency_key, req, response, lambda: _login(db, req))
+
+@async_router.post("/login", response_model=TokenResponse)
+async def login_async(
+    req: LoginRequest,
+    response: Response,
+    db: AsyncSession = Depends(get_async_db),
+    idempotency_key: str | None = Header(None, alias="Idempotency-Key"),
+):
+    return await run_idempotent_async(
+        "login", req.email.lower(), idempotency_key, req, response, lambda: _login_async(db, req)
+    )
+
+def _logout(db: Session, sess: SessionInfo) -> LogoutResponse:
+    revoke_sessions(db, [sess.id], "LOGOUT")
     db.commit()
     return LogoutResponse(ok=True)
+
+@router.post("/logout", response_model=LogoutResponse)
+def logout(sess: SessionInfo = Depends(get_current_session), db: Session = Depends(get_db)):
+    return _logout(db, sess)
+
+@async_router.post("/logout", response_model=LogoutResponse)
+async def logout_async(sess: SessionInfo = Depends(get_current_session_async), db: AsyncSession = Depends(get_async_db)):
+    return await db.run_sync(_logout, sess)
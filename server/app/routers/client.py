@@ -0,0 +1,81 @@
+from __future__ import annotations
+from fastapi import APIRouter, Depends, Header, HTTPException, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from app.db.database import get_db, get_async_db
+from app.core.schemas import (
+    BootstrapRequest, BootstrapResponse, LoginRequest, LicenseValidateRequest, ProductResponse, RedeemRequest,
+    TokenResponse,
+)
+from app.core.deps import _load_active_session
+from app.core.session_token import parse_session_token
+from app.core.session_cache import UserInfo
+from app.core.idempotency import run_idempotent, run_idempotent_async
+from app.routers.auth import _login, _login_async
+from app.routers.license import _get_product_or_404, _redeem, _validate
+
+router = APIRouter(prefix="/client", tags=["client"])
+async_router = APIRouter(prefix="/client", tags=["client"])
+
+# 클라이언트 시작 1회 왕복: 제품 조회 + 로그인 + (선택) redeem + validate
+# 각 단계는 기존 라우터 로직을 그대로 호출한다.
+# redeem 실패는 응답에 담아 돌려주고(세션은 유지), 클라이언트가 다시 입력받아 /license/redeem 으로 재시도
+
+def _login_request(req: BootstrapRequest) -> LoginRequest:
+    return LoginRequest(email=req.email, password=req.password, hwid_hash=req.hwid_hash)
+
+def _after_login(db: Session, req: BootstrapRequest, token: TokenResponse) -> BootstrapResponse:
+    p = _get_product_or_404(req.product_code)
+    # 방금 발급한 세션을 읽어 캐시에 올려 둠 (이후 요청은 캐시 hit)
+    sess = _load_active_session(db, parse_session_token(token.access_token))
+    user = UserInfo(id=sess.user_id, email=sess.user_email)
+
+    redeemed, redeem_error, redeem_status = None, None, None
+    if req.license_code and p.is_paid:
+        try:
+            redeemed = _redeem(
+                db,
+                RedeemRequest(product_code=p.code, license_code=req.license_code, hwid_hash=req.hwid_hash),
+                user,
+                sess,
+            )
+        except HTTPException as e:
+            redeem_error, redeem_status = str(e.detail), e.status_code
+
+    validation = _validate(db, LicenseValidateRequest(product_code=p.code, hwid_hash=req.hwid_hash), user, sess)
+    return BootstrapResponse(
+        token=token,
+        product=ProductResponse(code=p.code, name=p.name, is_paid=p.is_paid),
+        redeem=redeemed,
+        redeem_error=redeem_error,
+        redeem_status=redeem_status,
+        validation=validation,
+    )
+
+@router.post("/bootstrap", response_model=BootstrapResponse)
+def bootstrap(
+    req: BootstrapRequest,
+    response: Response,
+    db: Session = Depends(get_db),
+    idempotency_key: str | None = Header(None, alias="Idempotency-Key"),
+):
+    def run() -> BootstrapResponse:
+        # 없는 제품이면 세션을 발급하기 전에 404
+        _get_product_or_404(req.product_code)
+        return _after_login(db, req, _login(db, _login_request(req)))
+
+    return run_idempotent("bootstrap", req.email.lower(), idempotency_key, req, response, run)
+
+@async_router.post("/bootstrap", response_model=BootstrapResponse)
+async def bootstrap_async(
+    req: BootstrapRequest,
+    response: Response,
+    db: AsyncSession = Depends(get_async_db),
+    idempotency_key: str | None = Header(None, alias="Idempotency-Key"),
+):
+    async def run() -> BootstrapResponse:
+        _get_product_or_404(req.product_code)
+        token = await _login_async(db, _login_request(req))
+        return await db.run_sync(_after_login, req, token)
+
+    return await run_idempotent_async("bootstrap", req.email.lower(), idempotency_key, req, response, run)
@@ -1,29 +1,91 @@
 from __future__ import annotations
-from fastapi import APIRouter, Depends, HTTPException, status
+from datetime import datetime
+from fastapi import APIRouter, Depends, Header, HTTPException, Response, status
+from sqlalchemy import and_, case, or_, select, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from app.db.database import get_db
+from app.db.database import get_db, get_async_db
 from app.db import models
-from app.core.schemas import RedeemRequest, RedeemResponse, LicenseValidateRequest, LicenseValidateResponse
-from app.core.deps import get_current_user, get_current_session
-from app.core.license_codec import decode_and_verify, payload_exp_datetime
+from app.core.schemas import (
+    RedeemRequest, RedeemResponse, LicenseValidateRequest, LicenseValidateResponse,
+    LicenseValidateBatchRequest, LicenseValidateBatchResponse,
+)
+from app.core.deps import get_current_user, get_current_session, get_current_user_async, get_current_session_async
+from app.core.session_cache import SessionInfo, UserInfo
+from app.core.license_codec import decode_and_verify, normalize_code, payload_exp_datetime, payload_matches_product
 from app.core.security import utcnow
+from app.core.config import settings
+from app.core.entitlements import bound_elsewhere, licenses_for_hwid, refresh_entitlement
+from app.core.product_catalog import product_catalog, ProductInfo
+from app.core.idempotency import run_idempotent, run_idempotent_async
+from app.core.lease import issue_lease
 
 router = APIRouter(prefix="/license", tags=["license"])
+async_router = APIRouter(prefix="/license", tags=["license"])
 
-def _get_product_or_404(db: Session, code: str) -> models.Product:
-    p = db.query(models.Product).filter(models.Product.code == code).first()
+_codes = models.LicenseCode.__table__
+
+def _dialect_insert(db: Session):
+    # ON CONFLICT ... DO UPDATE ... RETURNING 은 SQLite(3.35+)/PostgreSQL 공통
+    if db.get_bind().dialect.name == "postgresql":
+        return pg_insert
+    return sqlite_insert
+
+def _get_product_or_404(code: str) -> ProductInfo:
+    p = product_catalog.get(code)
     if not p:
         raise HTTPException(status_code=404, detail="Product not found")
     return p
 
-@router.post("/redeem", response_model=RedeemResponse)
-def redeem(
-    req: RedeemRequest,
-    user: models.User = Depends(get_current_user),
-    sess: models.Session = Depends(get_current_session),
-    db: Session = Depends(get_db),
-):
-    p = _get_product_or_404(db, req.product_code)
+def _bind_license(db: Session, code: str, product_id: int, expires_at: datetime | None, user_id: int, hwid_hash: str):
+    """license_codes 행을 만들거나 user/HWID 를 bind 하는 단일 UPSERT. 결과 행 상태를 반환. commit은 호출자가 한다.
+    LICENSE_REQUIRE_PREREGISTERED 이면 등록된 행의 UPDATE 만 (미등록 코드는 None).
+
+    INSERT ... ON CONFLICT (code) DO UPDATE SET col = CASE WHEN <bind 가능> THEN 새 값 ELSE 기존 값 END RETURNING ...
+    - bind 가능: revoke 되지 않았고, 미사용이거나 같은 계정에 bind 되어 있으며, HWID 가 없거나 같은 경우
+    - 조건이 맞지 않으면 행은 바뀌지 않고 현재 상태가 그대로 반환됨
+    읽고-검사하고-쓰는 사이의 경쟁이 없으므로 두 계정이 같은 코드를 동시에 redeem 할 수 없음
+    """
+    now = utcnow()
+    bindable = and_(
+        _codes.c.is_revoked == False,  # noqa: E712
+        or_(_codes.c.redeemed_by_user_id.is_(None), _codes.c.redeemed_by_user_id == user_id),
+        or_(_codes.c.bound_hwid_hash.is_(None), _codes.c.bound_hwid_hash == hwid_hash),
+    )
+    bind_values = {
+        "redeemed_by_user_id": case((bindable, user_id), else_=_codes.c.redeemed_by_user_id),
+        "redeemed_at": case((bindable, now), else_=_codes.c.redeemed_at),
+        "bound_hwid_hash": case((bindable, hwid_hash), else_=_codes.c.bound_hwid_hash),
+    }
+    returning = (
+        _codes.c.redeemed_by_user_id,
+        _codes.c.bound_hwid_hash,
+        _codes.c.is_revoked,
+        _codes.c.revoke_reason,
+        _codes.c.expires_at,
+    )
+    if settings.LICENSE_REQUIRE_PREREGISTERED:
+        # 사전 등록(app/core/license_import.py)된 코드만: 같은 CASE 로 UPDATE 만, 없으면 None
+        return db.execute(
+            update(_codes).where(_codes.c.code == code).values(bind_values).returning(*returning)
+        ).one_or_none()
+
+    ins = _dialect_insert(db)(_codes).values(
+        code=code,
+        product_id=product_id,
+        expires_at=expires_at,
+        redeemed_by_user_id=user_id,
+        redeemed_at=now,
+        bound_hwid_hash=hwid_hash,
+        is_revoked=False,
+    )
+    stmt = ins.on_conflict_do_update(index_elements=[_codes.c.code], set_=bind_values).returning(*returning)
+    return db.execute(stmt).one()
+
+def _redeem(db: Session, req: RedeemRequest, user: UserInfo, sess: SessionInfo) -> RedeemResponse:
+    p = _get_product_or_404(req.product_code)
     if not p.is_paid:
         raise HTTPException(status_code=400, detail="Product is free. No license needed.")
 
@@ -31,86 +93,156 @@ def redeem(
     if req.hwid_hash != sess.hwid_hash:
         raise HTTPException(status_code=400, detail="HWID mismatch with current session")
 
-    payload, err = decode_and_verify(req.license_code)
+    code = normalize_code(req.license_code)
+    payload, err = decode_and_verify(code)
     if err:
         raise HTTPException(status_code=400, detail=f"License invalid: {err}")
-    if payload["product"] != p.code:
+    if not payload_matches_product(payload, p.id, p.code):
         raise HTTPException(status_code=400, detail="License not for this product")
 
-    exp_dt = payload_exp_datetime(payload)
-
-    # DB에 있는지 확인
-    lc = db.query(models.LicenseCode).filter(models.LicenseCode.code == req.license_code).first()
-    if lc is None:
-        lc = models.LicenseCode(
-            code=req.license_code,
-            product_id=p.id,
-            expires_at=exp_dt,
-            redeemed_by_user_id=None,
-            redeemed_at=None,
-            bound_hwid_hash=None,
-            is_revoked=False,
-        )
-        db.add(lc)
-        db.commit()
-        db.refresh(lc)
-
-    if lc.is_revoked:
-        raise HTTPException(status_code=403, detail=f"License revoked: {lc.revoke_reason or 'REVOKED'}")
-
-    # 이미 redeem 되었는지
-    if lc.redeemed_by_user_id is not None and lc.redeemed_by_user_id != user.id:
-        raise HTTPException(status_code=409, detail="License already redeemed by another account")
+    row = _bind_license(db, code, p.id, payload_exp_datetime(payload), user.id, req.hwid_hash)
+    if row is None:
+        raise HTTPException(status_code=400, detail="License invalid: NOT_REGISTERED")
 
-    # bind HWID (최초 1회)
-    if lc.bound_hwid_hash is None:
-        lc.bound_hwid_hash = req.hwid_hash
-    elif lc.bound_hwid_hash != req.hwid_hash:
+    # 조건이 맞지 않으면 행이 그대로 반환됨 -> 반환된 상태로 실패 사유 판정
+    if row.is_revoked:
+        db.rollback()
+        raise HTTPException(status_code=403, detail=f"License revoked: {row.revoke_reason or 'REVOKED'}")
+    if row.redeemed_by_user_id != user.id:
+        db.rollback()
+        raise HTTPException(status_code=409, detail="License already redeemed by another account")
+    if row.bound_hwid_hash != req.hwid_hash:
         # HWID 변경 시 무효 처리(재인증 요구)
+        db.rollback()
         raise HTTPException(status_code=403, detail="HWID changed. Re-activation required.")
 
-    lc.redeemed_by_user_id = user.id
-    lc.redeemed_at = utcnow()
+    refresh_entitlement(db, user.id, p.id)
     db.commit()
-    db.refresh(lc)
 
-    return RedeemResponse(ok=True, product_code=p.code, expires_at=lc.expires_at, bound_hwid_hash=lc.bound_hwid_hash)
+    return RedeemResponse(ok=True, product_code=p.code, expires_at=row.expires_at, bound_hwid_hash=row.bound_hwid_hash)
 
-@router.post("/validate", response_model=LicenseValidateResponse)
-def validate(
-    req: LicenseValidateRequest,
-    user: models.User = Depends(get_current_user),
-    sess: models.Session = Depends(get_current_session),
+@router.post("/redeem", response_model=RedeemResponse)
+def redeem(
+    req: RedeemRequest,
+    response: Response,
+    user: UserInfo = Depends(get_current_user),
+    sess: SessionInfo = Depends(get_current_session),
     db: Session = Depends(get_db),
+    idempotency_key: str | None = Header(None, alias="Idempotency-Key"),
 ):
-    p = _get_product_or_404(db, req.product_code)
+    return run_idempotent("redeem", user.id, idempotency_key, req, response, lambda: _redeem(db, req, user, sess))
 
+@async_router.post("/redeem", response_model=RedeemResponse)
+async def redeem_async(
+    req: RedeemRequest,
+    response: Response,
+    user: UserInfo = Depends(get_current_user_async),
+    sess: SessionInfo = Depends(get_current_session_async),
+    db: AsyncSession = Depends(get_async_db),
+    idempotency_key: str | None = Header(None, alias="Idempotency-Key"),
+):
+    return await run_idempotent_async(
+        "redeem", user.id, idempotency_key, req, response, lambda: db.run_sync(_redeem, req, user, sess)
+    )
+
+def _judge(
+    p: ProductInfo, ent: models.Entitlement | models.LicenseCode | None, hwid_hash: str, sess: SessionInfo
+) -> LicenseValidateResponse:
     # Free 제품은 로그인만으로 valid
     if not p.is_paid:
         return LicenseValidateResponse(valid=True, product_code=p.code)
 
-    # Paid 제품: redeem된 라이선스가 있어야 함 (1개 이상)
-    lcs = (
-        db.query(models.LicenseCode)
-          .filter(models.LicenseCode.product_id == p.id, models.LicenseCode.redeemed_by_user_id == user.id)
-          .all()
-    )
-    if not lcs:
+    # Paid 제품: entitlement(redeem된 라이선스 중 가장 좋은 것)가 있어야 함
+    if ent is None:
         return LicenseValidateResponse(valid=False, product_code=p.code, reason="NO_LICENSE")
 
     # 세션 HWID와 요청 HWID 일치
-    if req.hwid_hash != sess.hwid_hash:
+    if hwid_hash != sess.hwid_hash:
         return LicenseValidateResponse(valid=False, product_code=p.code, reason="HWID_MISMATCH_SESSION")
 
-    # 어떤 라이선스든 유효하면 OK (가장 좋은 것 선택)
-    now = utcnow()
-    for lc in lcs:
-        if lc.is_revoked:
-            continue
-        if lc.bound_hwid_hash and lc.bound_hwid_hash != req.hwid_hash:
-            continue
-        if lc.expires_at and now > lc.expires_at:
-            continue
-        return LicenseValidateResponse(valid=True, product_code=p.code, expires_at=lc.expires_at)
+    if ent.is_revoked:
+        return LicenseValidateResponse(valid=False, product_code=p.code, reason="NO_VALID_LICENSE")
+    if ent.bound_hwid_hash and ent.bound_hwid_hash != hwid_hash:
+        return LicenseValidateResponse(valid=False, product_code=p.code, reason="NO_VALID_LICENSE")
+    if ent.expires_at and utcnow() > ent.expires_at:
+        return LicenseValidateResponse(valid=False, product_code=p.code, reason="NO_VALID_LICENSE")
+    return LicenseValidateResponse(valid=True, product_code=p.code, expires_at=ent.expires_at)
+
+def _with_lease(res: LicenseValidateResponse, user: UserInfo, hwid_hash: str) -> LicenseValidateResponse:
+    # valid 판정에만 오프라인 lease 첨부 (서명 키가 없으면 그대로)
+    if res.valid:
+        res.lease = issue_lease(user.id, user.email, res.product_code, hwid_hash, res.expires_at)
+    return res
+
+def _validate(db: Session, req: LicenseValidateRequest, user: UserInfo, sess: SessionInfo) -> LicenseValidateResponse:
+    p = _get_product_or_404(req.product_code)
+    # entitlement 는 PK 1회 조회 (다른 HWID 에 bind 된 행이면 이 HWID 용 라이선스를 다시 조회)
+    ent = db.get(models.Entitlement, (user.id, p.id)) if p.is_paid else None
+    if bound_elsewhere(ent, req.hwid_hash):
+        ent = licenses_for_hwid(db, user.id, [p.id], req.hwid_hash).get(p.id, ent)
+    return _with_lease(_judge(p, ent, req.hwid_hash, sess), user, req.hwid_hash)
 
-    return LicenseValidateResponse(valid=False, product_code=p.code, reason="NO_VALID_LICENSE")
+@router.post("/validate", response_model=LicenseValidateResponse)
+def validate(
+    req: LicenseValidateRequest,
+    user: UserInfo = Depends(get_current_user),
+    sess: SessionInfo = Depends(get_current_session),
+    db: Session = Depends(get_db),
+):
+    return _validate(db, req, user, sess)
+
+@async_router.post("/validate", response_model=LicenseValidateResponse)
+async def validate_async(
+    req: LicenseValidateRequest,
+    user: UserInfo = Depends(get_current_user_async),
+    sess: SessionInfo = Depends(get_current_session_async),
+    db: AsyncSession = Depends(get_async_db),
+):
+    return await db.run_sync(_validate, req, user, sess)
+
+def _validate_batch(
+    db: Session, req: LicenseValidateBatchRequest, user: UserInfo, sess: SessionInfo
+) -> LicenseValidateBatchResponse:
+    # 제품은 카탈로그(메모리)에서, entitlement 는 유료 제품 전체를 IN 조회 1회로 판정
+    products = {code: product_catalog.get(code) for code in req.product_codes}
+    paid_ids = {p.id for p in products.values() if p is not None and p.is_paid}
+    ents = {}
+    if paid_ids:
+        ents = {
+            e.product_id: e
+            for e in db.execute(
+                select(models.Entitlement).where(
+                    models.Entitlement.user_id == user.id, models.Entitlement.product_id.in_(paid_ids)
+                )
+            ).scalars()
+        }
+    elsewhere = [pid for pid, e in ents.items() if bound_elsewhere(e, req.hwid_hash)]
+    if elsewhere:
+        ents.update(licenses_for_hwid(db, user.id, elsewhere, req.hwid_hash))
+    results = []
+    for code in req.product_codes:
+        p = products[code]
+        if p is None:
+            # 알 수 없는 제품은 배치 전체를 실패시키지 않고 항목별로 표시
+            results.append(LicenseValidateResponse(valid=False, product_code=code, reason="UNKNOWN_PRODUCT"))
+            continue
+        results.append(_with_lease(_judge(p, ents.get(p.id), req.hwid_hash, sess), user, req.hwid_hash))
+    return LicenseValidateBatchResponse(results=results)
+
+@router.post("/validate-batch", response_model=LicenseValidateBatchResponse)
+def validate_batch(
+    req: LicenseValidateBatchRequest,
+    user: UserInfo = Depends(get_current_user),
+    sess: SessionInfo = Depends(get_current_session),
+    db: Session = Depends(get_db),
+):
+    return _validate_batch(db, req, user, sess)
+
+@async_router.post("/validate-batch", response_model=LicenseValidateBatchResponse)
+async def validate_batch_async(
+    req: LicenseValidateBatchRequest,
+    user: UserInfo = Depends(get_current_user_async),
+    sess: SessionInfo = Depends(get_current_session_async),
+    db: AsyncSession = Depends(get_async_db),
+):
+    return await db.run_sync(_validate_batch, req, user, sess)
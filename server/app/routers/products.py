@@ -1,15 +1,45 @@
 from __future__ import annotations
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from app.db.database import get_db
-from app.db import models
+from fastapi import APIRouter, Header, HTTPException, Response
+from typing import Optional
+from app.core.config import settings
+from app.core.product_catalog import product_catalog
 from app.core.schemas import ProductResponse
 
 router = APIRouter(prefix="/products", tags=["products"])
+async_router = APIRouter(prefix="/products", tags=["products"])
 
-@router.get("/{product_code}", response_model=ProductResponse)
-def get_product(product_code: str, db: Session = Depends(get_db)):
-    p = db.query(models.Product).filter(models.Product.code == product_code).first()
+def _etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    for tag in if_none_match.split(","):
+        tag = tag.strip()
+        if tag == "*" or tag.removeprefix("W/") == etag:
+            return True
+    return False
+
+def _get_product(product_code: str, response: Response, if_none_match: Optional[str]):
+    # DB 대신 인메모리 카탈로그에서 조회
+    p = product_catalog.get(product_code)
     if not p:
         raise HTTPException(status_code=404, detail="Product not found")
+    headers = {"ETag": p.etag, "Cache-Control": f"public, max-age={settings.PRODUCT_CACHE_MAX_AGE_SEC}"}
+    if _etag_matches(if_none_match, p.etag):
+        return Response(status_code=304, headers=headers)
+    response.headers.update(headers)
     return ProductResponse(code=p.code, name=p.name, is_paid=p.is_paid)
+
+@router.get("/{product_code}", response_model=ProductResponse)
+def get_product(
+    product_code: str,
+    response: Response,
+    if_none_match: Optional[str] = Header(default=None),
+):
+    return _get_product(product_code, response, if_none_match)
+
+@async_router.get("/{product_code}", response_model=ProductResponse)
+async def get_product_async(
+    product_code: str,
+    response: Response,
+    if_none_match: Optional[str] = Header(default=None),
+):
+    return _get_product(product_code, response, if_none_match)
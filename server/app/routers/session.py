@@ -1,18 +1,149 @@
 from __future__ import annotations
-from fastapi import APIRouter, Depends
+import asyncio
+import json
+from typing import AsyncIterator, Optional
+from fastapi import APIRouter, Depends, Header, HTTPException, Response
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+from fastapi.security import HTTPAuthorizationCredentials
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from app.db.database import get_db
-from app.db import models
-from app.core.deps import get_current_user, get_current_session
+from app.db.database import SessionLocal, get_db, get_async_db
+from app.core.deps import (
+    bearer, authenticate_session, get_current_user, get_current_session, get_current_user_async, get_current_session_async,
+    session_last_seen, session_status, _token_ref,
+)
+from app.core.session_cache import SessionInfo, UserInfo
+from app.core.session_token import TokenRef
+from app.core.config import settings
+from app.core.event_bus import Event, SESSION_REVOKED, LICENSE_REVOKED, backfill_events, event_bus
 
 router = APIRouter(prefix="/session", tags=["session"])
+async_router = APIRouter(prefix="/session", tags=["session"])
 
-@router.get("/me")
-def me(user: models.User = Depends(get_current_user), sess: models.Session = Depends(get_current_session)):
+def _me(user: UserInfo, sess: SessionInfo) -> dict:
     return {
         "email": user.email,
         "hwid_hash": sess.hwid_hash,
         "created_at": sess.created_at,
-        "last_seen_at": sess.last_seen_at,
+        "last_seen_at": session_last_seen(sess),
         "is_active": sess.is_active,
     }
+
+@router.get("/me")
+def me(user: UserInfo = Depends(get_current_user), sess: SessionInfo = Depends(get_current_session)):
+    return _me(user, sess)
+
+@async_router.get("/me")
+async def me_async(user: UserInfo = Depends(get_current_user_async), sess: SessionInfo = Depends(get_current_session_async)):
+    return _me(user, sess)
+
+# heartbeat: 세션 유지용 최소 요청 (204, body 없음)
+# - 캐시 hit 이면 DB 접근 없이 write-behind touch 만 기록
+# - 상태는 X-Session-Status 헤더로: active / expired / revoked (모르는 토큰은 401 + invalid)
+
+STATUS_HEADER = "X-Session-Status"
+
+def _invalid_session() -> HTTPException:
+    return HTTPException(status_code=401, detail="Invalid session", headers={STATUS_HEADER: "invalid"})
+
+def _heartbeat_response(status: str) -> Response:
+    # active / expired / revoked (invalid 은 호출 전에 401)
+    return Response(status_code=204, headers={STATUS_HEADER: status})
+
+def _token_ref_or_invalid(creds: Optional[HTTPAuthorizationCredentials]) -> TokenRef:
+    # 위조/손상 토큰도 DB 조회 없이 401 + invalid
+    try:
+        return _token_ref(creds)
+    except HTTPException:
+        if creds is None:
+            raise
+        raise _invalid_session() from None
+
+@router.post("/heartbeat", status_code=204, response_class=Response)
+def heartbeat(creds: HTTPAuthorizationCredentials = Depends(bearer), db: Session = Depends(get_db)):
+    status = session_status(db, _token_ref_or_invalid(creds))
+    if status == "invalid":
+        raise _invalid_session()
+    return _heartbeat_response(status)
+
+@async_router.post("/heartbeat", status_code=204, response_class=Response)
+async def heartbeat_async(creds: HTTPAuthorizationCredentials = Depends(bearer), db: AsyncSession = Depends(get_async_db)):
+    status = await db.run_sync(session_status, _token_ref_or_invalid(creds))
+    if status == "invalid":
+        raise _invalid_session()
+    return _heartbeat_response(status)
+
+# revoke 이벤트 스트림 (SSE)
+# - 이 세션의 session_revoked, 이 사용자의 license_revoked 만 전달. session_revoked 를 보낸 뒤 스트림 종료
+#   (스트림은 세션을 touch 하지 않으므로 TTL 만료는 reaper 가 기록하는 session_revoked(EXPIRED) 로 전달됨)
+# - 인증은 짧은 DB 세션으로 끝내고 닫음 (연결이 열려 있는 동안 DB 연결/스레드를 잡지 않음)
+# - Last-Event-ID: 구독을 먼저 등록한 뒤 DB 에서 그 이후 이벤트 + lookback 창 안의 늦게 commit 된 이벤트를 backfill,
+#   이후 큐의 이벤트는 backfill 한 id 로 중복 제거 (큐에는 늦게 commit 된 작은 id 도 올 수 있으므로 id 크기로 거르지 않음)
+# - 유휴 연결에는 EVENTS_KEEPALIVE_SEC 마다 주석 줄 (프록시 idle timeout 방지)
+
+def _authenticate(ref: TokenRef) -> SessionInfo:
+    with SessionLocal() as db:
+        return authenticate_session(db, ref)
+
+def _backfill(user_id: int, after_id: int) -> list[Event]:
+    with SessionLocal() as db:
+        return backfill_events(db, user_id, after_id, settings.EVENTS_LOOKBACK_SEC)
+
+def _is_for(ev: Event, sess: SessionInfo) -> bool:
+    if ev.kind == SESSION_REVOKED:
+        return ev.session_id == sess.id
+    return ev.kind == LICENSE_REVOKED
+
+def _sse(ev: Event) -> str:
+    return f"id: {ev.id}\nevent: {ev.kind}\ndata: {json.dumps(ev.data, separators=(',', ':'))}\n\n"
+
+def _parse_event_id(v: Optional[str]) -> Optional[int]:
+    return int(v) if v and v.isdigit() else None
+
+async def _event_stream(sess: SessionInfo, last_id: Optional[int]) -> AsyncIterator[str]:
+    sub = event_bus.subscribe(sess.user_id)
+    try:
+        yield "retry: 5000\n\n"
+        backfilled: set[int] = set()
+        if last_id is not None:
+            for ev in await run_in_threadpool(_backfill, sess.user_id, last_id):
+                backfilled.add(ev.id)
+                if _is_for(ev, sess):
+                    yield _sse(ev)
+                    if ev.kind == SESSION_REVOKED:
+                        return
+        while True:
+            try:
+                ev = await asyncio.wait_for(sub.queue.get(), timeout=settings.EVENTS_KEEPALIVE_SEC)
+            except asyncio.TimeoutError:
+                if sub.overflowed:
+                    return
+                yield ": keepalive\n\n"
+                continue
+            if ev.id in backfilled:
+                continue
+            if _is_for(ev, sess):
+                yield _sse(ev)
+                if ev.kind == SESSION_REVOKED:
+                    return
+            if sub.overflowed and sub.queue.empty():
+                return
+    finally:
+        event_bus.unsubscribe(sub)
+
+async def events(
+    creds: HTTPAuthorizationCredentials = Depends(bearer),
+    last_event_id: Optional[str] = Header(default=None),
+):
+    # 위조 토큰은 스레드풀/DB 에 가기 전에 거절
+    sess = await run_in_threadpool(_authenticate, _token_ref(creds))
+    return StreamingResponse(
+        _event_stream(sess, _parse_event_id(last_event_id)),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+# 두 라우터 모두 같은 async 핸들러 (DB 접근은 스레드풀의 짧은 동기 세션)
+router.get("/events")(events)
+async_router.get("/events")(events)
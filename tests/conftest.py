@@ -0,0 +1,50 @@
+from __future__ import annotations
+import importlib
+import sys
+from pathlib import Path
+
+import pytest
+
+# 서버 코드(server/app)와 클라이언트(client/)를 그대로 import. 설정(LIC_*)은 모듈 import 시점에 읽히므로
+# 테스트마다 환경변수를 정한 뒤 app 패키지를 새로 import 한다 (임시 SQLite 파일 사용).
+SERVER_DIR = Path(__file__).resolve().parent.parent / "server"
+CLIENT_DIR = SERVER_DIR.parent / "client"
+sys.path.insert(0, str(SERVER_DIR))
+sys.path.insert(0, str(CLIENT_DIR))
+
+# 테스트용 기본 설정: 빠른 bcrypt (보안 하한도 낮춤), 백그라운드 reaper 끔
+BASE_SETTINGS = {
+    "SERVER_SECRET": "test-secret",
+    "PASSWORD_BCRYPT_ROUNDS": "4",
+    "PASSWORD_BCRYPT_MIN_ROUNDS": "4",
+    "SESSION_REAPER_INTERVAL_SEC": "0",
+}
+
+def _purge_app() -> None:
+    for name in [n for n in sys.modules if n == "app" or n.startswith("app.")]:
+        del sys.modules[name]
+
+@pytest.fixture
+def load_app(tmp_path, monkeypatch):
+    """load_app(**settings) -> 새로 import 한 app.main 모듈."""
+    monkeypatch.chdir(tmp_path)  # .env 를 읽지 않도록
+
+    def load(**settings):
+        env = {"SERVER_DB_URL": f"sqlite:///{tmp_path / 'test.db'}", **BASE_SETTINGS, **settings}
+        for k, v in env.items():
+            monkeypatch.setenv(f"LIC_{k}", str(v))
+        _purge_app()
+        return importlib.import_module("app.main")
+
+    yield load
+    _purge_app()
+
+def hwid(n: int) -> str:
+    return f"{n:064x}"
+
+def register_and_login(client, email: str, hw: str, password: str = "password123") -> dict:
+    """Authorization 헤더."""
+    client.post("/auth/register", json={"email": email, "password": password})
+    r = client.post("/auth/login", json={"email": email, "password": password, "hwid_hash": hw})
+    assert r.status_code == 200, r.text
+    return {"Authorization": f"Bearer {r.json()['access_token']}"}
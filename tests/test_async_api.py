@@ -0,0 +1,135 @@
+from __future__ import annotations
+import asyncio
+
+import httpx
+import pytest
+
+from conftest import hwid
+
+# client/async_api.py 의 AsyncLicensingApi 를 httpx.ASGITransport 로 서버 앱에 직접 연결해 확인
+
+PASSWORD = "password123"
+
+class SlowTransport(httpx.AsyncBaseTransport):
+    """요청마다 delay 초 기다린 뒤 inner 로 전달 (느린 서버 흉내)."""
+
+    def __init__(self, inner: httpx.AsyncBaseTransport, delay: float):
+        self.inner = inner
+        self.delay = delay
+        self.started = 0
+        self.finished = 0
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        self.started += 1
+        await asyncio.sleep(self.delay)
+        r = await self.inner.handle_async_request(request)
+        self.finished += 1
+        return r
+
+@pytest.fixture
+def server(load_app):
+    return load_app().app
+
+def _api(transport: httpx.AsyncBaseTransport, **kw):
+    from async_api import AsyncLicensingApi
+    return AsyncLicensingApi("http://test", transport=transport, backoff_base=0, **kw)
+
+async def _login(api, email: str, hw: str) -> str:
+    await api.register(email, PASSWORD)
+    return (await api.login(email, PASSWORD, hw))["access_token"]
+
+def test_register_login_redeem_validate(server):
+    from app.core.license_codec import encode_license_v2
+
+    async def run():
+        hw = hwid(1)
+        async with _api(httpx.ASGITransport(app=server)) as api:
+            token = await _login(api, "flow@example.com", hw)
+            assert (await api.validate_license(token, "demo_paid", hw))["reason"] == "NO_LICENSE"
+            await api.redeem_license(token, "demo_paid", encode_license_v2(2), hw)
+            assert (await api.validate_license(token, "demo_paid", hw))["valid"] is True
+            batch = await api.validate_licenses(token, ["demo_paid", "demo_free"], hw)
+            assert batch["demo_paid"]["valid"] and batch["demo_free"]["valid"]
+            await api.logout(token)
+            assert api.retries == 0
+
+    asyncio.run(run())
+
+def test_errors_raise_api_error(server):
+    from api import ApiError
+
+    async def run():
+        async with _api(httpx.ASGITransport(app=server)) as api:
+            token = await _login(api, "err@example.com", hwid(1))
+            with pytest.raises(ApiError, match="register failed: 409"):
+                await api.register("err@example.com", PASSWORD)
+            with pytest.raises(ApiError, match="login failed: 401"):
+                await api.login("err@example.com", "wrong-password", hwid(2))
+            with pytest.raises(ApiError, match="login failed: 403"):
+                await api.login("err@example.com", PASSWORD, hwid(2))
+            with pytest.raises(ApiError, match="validate failed: 404"):
+                await api.validate_license(token, "no_such_product", hwid(1))
+            with pytest.raises(ApiError, match="redeem failed: 400"):
+                await api.redeem_license(token, "demo_paid", "not-a-license", hwid(1))
+            await api.logout(token)
+            with pytest.raises(ApiError, match="validate failed: 401"):
+                await api.validate_license(token, "demo_paid", hwid(1))
+
+    asyncio.run(run())
+
+def test_retryable_status_is_retried_then_raised():
+    from api import ApiError
+
+    calls = 0
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        nonlocal calls
+        calls += 1
+        return httpx.Response(503)
+
+    async def run():
+        async with _api(httpx.MockTransport(handler), max_retries=2) as api:
+            with pytest.raises(ApiError, match="validate failed: 503"):
+                await api.validate_license("t", "demo_paid", hwid(1))
+            assert api.retries == 2
+            # 비멱등 요청(register)은 재시도하지 않음
+            with pytest.raises(ApiError, match="register failed: 503"):
+                await api.register("x@example.com", PASSWORD)
+
+    asyncio.run(run())
+    assert calls == 4
+
+def test_concurrent_validations(server):
+    from app.core.license_codec import encode_license_v2
+
+    async def run():
+        hw = hwid(1)
+        async with _api(httpx.ASGITransport(app=server), pool_size=4) as api:
+            token = await _login(api, "gather@example.com", hw)
+            await api.redeem_license(token, "demo_paid", encode_license_v2(2), hw)
+            results = await asyncio.gather(
+                *[api.validate_license(token, code, hw) for code in ["demo_paid", "demo_free"] * 25]
+            )
+            assert len(results) == 50
+            assert all(r["valid"] for r in results)
+
+    asyncio.run(run())
+
+def test_cancelled_by_timeout_is_not_retried(server):
+    async def run():
+        hw = hwid(1)
+        async with _api(httpx.ASGITransport(app=server)) as api:
+            token = await _login(api, "cancel@example.com", hw)
+
+        slow = SlowTransport(httpx.ASGITransport(app=server), delay=5.0)
+        async with _api(slow) as api:
+            for _ in range(3):
+                with pytest.raises(asyncio.TimeoutError):
+                    await asyncio.wait_for(api.validate_license(token, "demo_free", hw), timeout=0.05)
+            # 취소(CancelledError)는 재시도하지 않고 그대로 전파, 같은 클라이언트로 다음 요청 가능
+            assert api.retries == 0
+            assert (slow.started, slow.finished) == (3, 0)
+            slow.delay = 0
+            assert (await api.validate_license(token, "demo_free", hw))["valid"] is True
+
+    asyncio.run(run())
@@ -0,0 +1,149 @@
+from __future__ import annotations
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import select
+
+from conftest import hwid, register_and_login
+
+# 같은 흐름을 동기(LIC_DB_ASYNC=false) / async(true) 라우터 모두에서 확인
+
+@pytest.fixture(params=[False, True], ids=["sync", "async"])
+def app_mode(request, load_app):
+    db_async = request.param
+
+    def load(**settings):
+        return load_app(DB_ASYNC=str(db_async).lower(), **settings)
+
+    load.db_async = db_async
+    return load
+
+def _checked_out(db_async: bool) -> int:
+    # production 프로필: writer(pool_size=1) + reader 풀
+    from app.db import database
+    if db_async:
+        engines = [database.async_engine.sync_engine, database.async_read_engine.sync_engine]
+    else:
+        engines = [database.engine, database.read_engine]
+    return sum(e.pool.checkedout() for e in engines)
+
+def test_register_login_redeem_validate(app_mode):
+    main = app_mode()
+    from app.core.license_codec import encode_license_v2
+
+    hw = hwid(1)
+    with TestClient(main.app) as c:
+        h = register_and_login(c, "flow@example.com", hw)
+        assert c.post("/auth/register", json={"email": "flow@example.com", "password": "password123"}).status_code == 409
+        r = c.post("/license/redeem", headers=h,
+                   json={"product_code": "demo_paid", "license_code": encode_license_v2(2), "hwid_hash": hw})
+        assert r.status_code == 200, r.text
+        r = c.post("/license/validate", headers=h, json={"product_code": "demo_paid", "hwid_hash": hw})
+        assert r.json()["valid"] is True
+
+        # 활성 세션이 있으면 다른 로그인은 차단, 로그아웃 후에는 허용
+        r = c.post("/auth/login", json={"email": "flow@example.com", "password": "password123", "hwid_hash": hwid(2)})
+        assert r.status_code == 403
+        assert c.post("/auth/logout", headers=h).status_code == 200
+        register_and_login(c, "flow@example.com", hwid(2))
+
+def test_wrong_password(app_mode):
+    main = app_mode()
+    with TestClient(main.app) as c:
+        register_and_login(c, "wrong@example.com", hwid(1))
+        r = c.post("/auth/login", json={"email": "wrong@example.com", "password": "nope-nope", "hwid_hash": hwid(2)})
+        assert r.status_code == 401
+        r = c.post("/auth/login", json={"email": "missing@example.com", "password": "nope-nope", "hwid_hash": hwid(2)})
+        assert r.status_code == 401
+
+def test_password_hash_runs_without_db_connection(app_mode, monkeypatch):
+    # 해시를 기다리는 동안 요청이 DB 커넥션을 잡고 있지 않아야 함
+    main = app_mode(SQLITE_PROFILE="production")
+    from app.core import security
+    from app.routers import auth
+
+    seen: list[int] = []
+    if app_mode.db_async:
+        async def spy(*args):
+            seen.append(_checked_out(True))
+            return await security.verify_and_update_password_async(*args)
+
+        async def spy_hash(p):
+            seen.append(_checked_out(True))
+            return await security.hash_password_async(p)
+        monkeypatch.setattr(auth, "verify_and_update_password_async", spy)
+        monkeypatch.setattr(auth, "hash_password_async", spy_hash)
+    else:
+        def spy(*args):
+            seen.append(_checked_out(False))
+            return security.verify_and_update_password(*args)
+
+        def spy_hash(p):
+            seen.append(_checked_out(False))
+            return security.hash_password(p)
+        monkeypatch.setattr(auth, "verify_and_update_password", spy)
+        monkeypatch.setattr(auth, "hash_password", spy_hash)
+
+    with TestClient(main.app) as c:
+        register_and_login(c, "pool@example.com", hwid(1))
+    assert seen == [0, 0]
+
+def test_login_rehash(app_mode):
+    main = app_mode(PASSWORD_BCRYPT_ROUNDS=4)
+    with TestClient(main.app) as c:
+        c.post("/auth/logout", headers=register_and_login(c, "rehash@example.com", hwid(1)))
+
+    main = app_mode(PASSWORD_BCRYPT_ROUNDS=5)
+    with TestClient(main.app) as c:
+        register_and_login(c, "rehash@example.com", hwid(1))
+    from app.db.database import SessionLocal
+    from app.db import models
+    with SessionLocal() as db:
+        stored = db.execute(select(models.User.password_hash).where(models.User.email == "rehash@example.com")).scalar_one()
+    assert stored.startswith("$2b$05$")
+
+def test_heartbeat_statuses(app_mode):
+    main = app_mode()
+    from app.core.session_token import issue_session_token
+
+    def beat(headers):
+        r = c.post("/session/heartbeat", headers=headers)
+        return r.status_code, r.headers.get("X-Session-Status")
+
+    with TestClient(main.app) as c:
+        h = register_and_login(c, "beat@example.com", hwid(1))
+        assert beat(h) == (204, "active")
+        assert beat({"Authorization": "Bearer forged.token"}) == (401, "invalid")
+        # 형식/tag 는 맞지만 DB 에 없는 세션
+        assert beat({"Authorization": f"Bearer {issue_session_token(999)}"}) == (401, "invalid")
+        assert beat({}) == (401, None)
+        c.post("/auth/logout", headers=h)
+        assert beat(h) == (204, "revoked")
+
+def test_register_race_returns_409(app_mode, monkeypatch):
+    # 이메일 확인 후 해시를 기다리는 동안 같은 email 로 다른 가입이 먼저 commit 된 경우
+    main = app_mode()
+    from app.core import security
+    from app.db.database import SessionLocal
+    from app.db import models
+    from app.routers import auth
+
+    def other_signup():
+        with SessionLocal() as db:
+            db.add(models.User(email="race@example.com", password_hash="x"))
+            db.commit()
+
+    if app_mode.db_async:
+        async def racing_hash(p):
+            other_signup()
+            return await security.hash_password_async(p)
+        monkeypatch.setattr(auth, "hash_password_async", racing_hash)
+    else:
+        def racing_hash(p):
+            other_signup()
+            return security.hash_password(p)
+        monkeypatch.setattr(auth, "hash_password", racing_hash)
+
+    with TestClient(main.app) as c:
+        r = c.post("/auth/register", json={"email": "race@example.com", "password": "password123"})
+    assert r.status_code == 409, r.text
@@ -0,0 +1,54 @@
+from __future__ import annotations
+from datetime import datetime, timezone
+
+from fastapi.testclient import TestClient
+
+from conftest import hwid, register_and_login
+
+def _redeem(client, headers, code: str, hw: str):
+    return client.post("/license/redeem", headers=headers,
+                       json={"product_code": "demo_paid", "license_code": code, "hwid_hash": hw})
+
+def _validate(client, headers, hw: str) -> dict:
+    r = client.post("/license/validate", headers=headers, json={"product_code": "demo_paid", "hwid_hash": hw})
+    assert r.status_code == 200, r.text
+    return r.json()
+
+def test_validate_uses_license_bound_to_requesting_hwid(load_app):
+    # 만료 없는 코드(HWID A)가 entitlement 의 "가장 좋은" 행이어도 HWID B 의 2030년 코드로 valid 여야 함
+    main = load_app()
+    from app.core.license_codec import encode_license_v2
+
+    a, b = hwid(1), hwid(2)
+    exp_2030 = int(datetime(2030, 1, 1, tzinfo=timezone.utc).timestamp())
+    with TestClient(main.app) as c:
+        h = register_and_login(c, "multi@example.com", a)
+        assert _redeem(c, h, encode_license_v2(2), a).status_code == 200
+        assert _validate(c, h, a)["valid"] is True
+        c.post("/auth/logout", headers=h)
+
+        h = register_and_login(c, "multi@example.com", b)
+        r = _redeem(c, h, encode_license_v2(2, exp_2030), b)
+        assert r.status_code == 200, r.text
+        res = _validate(c, h, b)
+        assert res["valid"] is True, res
+        assert res["expires_at"].startswith("2030-01-01")
+
+        batch = c.post("/license/validate-batch", headers=h,
+                       json={"product_codes": ["demo_paid"], "hwid_hash": b}).json()
+        assert batch["results"][0]["valid"] is True
+
+def test_validate_rejects_hwid_without_usable_license(load_app):
+    main = load_app()
+    from app.core.license_codec import encode_license_v2
+
+    a, b = hwid(1), hwid(2)
+    with TestClient(main.app) as c:
+        h = register_and_login(c, "single@example.com", a)
+        assert _redeem(c, h, encode_license_v2(2), a).status_code == 200
+        c.post("/auth/logout", headers=h)
+
+        h = register_and_login(c, "single@example.com", b)
+        assert _validate(c, h, b) == {
+            "valid": False, "product_code": "demo_paid", "reason": "NO_VALID_LICENSE", "expires_at": None, "lease": None,
+        }
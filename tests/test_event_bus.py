@@ -0,0 +1,126 @@
+from __future__ import annotations
+import asyncio
+import json
+import threading
+import time
+from datetime import timedelta
+
+from fastapi.testclient import TestClient
+from sqlalchemy import insert, select
+
+from conftest import hwid, register_and_login
+
+# 늦게 commit 된(cursor 보다 작은 id) 이벤트도 전달되는지: id 를 직접 지정해 commit 순서를 뒤집어 흉내
+
+def _add_event(event_id: int, user_id: int, kind: str = "license_revoked", session_id=None, age_sec: float = 0):
+    from app.db.database import SessionLocal
+    from app.db import models
+    from app.core.security import utcnow
+    with SessionLocal() as db:
+        db.execute(insert(models.SessionEvent.__table__).values(
+            id=event_id, user_id=user_id, session_id=session_id, kind=kind,
+            data=json.dumps({"product_code": "demo_paid", "reason": "test"}),
+            created_at=utcnow() - timedelta(seconds=age_sec),
+        ))
+        db.commit()
+
+def _drain(sub) -> list[int]:
+    ids = []
+    while not sub.queue.empty():
+        ids.append(sub.queue.get_nowait().id)
+    return ids
+
+def test_poll_delivers_late_committed_lower_ids_once(load_app):
+    load_app(EVENTS_POLL_INTERVAL_SEC=0, EVENTS_LOOKBACK_SEC=30)
+    from app.core.event_bus import event_bus
+
+    async def run():
+        sub = event_bus.subscribe(7)
+        _add_event(10, 7)
+        _add_event(20, 7)
+        await event_bus.poll_once()
+        assert _drain(sub) == [10, 20]
+
+        _add_event(15, 7)                 # cursor(20) 를 지난 뒤 commit
+        _add_event(12, 7, age_sec=3600)   # lookback 창 밖 -> 폴링으로는 찾지 않음
+        await event_bus.poll_once()
+        assert _drain(sub) == [15]
+
+        _add_event(21, 7)
+        await event_bus.poll_once()
+        await event_bus.poll_once()
+        assert _drain(sub) == [21]        # 이미 전달한 id 는 다시 보내지 않음
+        assert event_bus.stats()["late"] == 1
+
+    asyncio.run(run())
+
+def test_start_does_not_replay_existing_events(load_app):
+    load_app(EVENTS_POLL_INTERVAL_SEC=3600, EVENTS_LOOKBACK_SEC=30)
+    from app.core.event_bus import event_bus
+
+    async def run():
+        _add_event(5, 7)
+        await event_bus.start()
+        try:
+            sub = event_bus.subscribe(7)
+            _add_event(6, 7)
+            await event_bus.poll_once()
+            assert _drain(sub) == [6]
+        finally:
+            await event_bus.stop()
+
+    asyncio.run(run())
+
+def test_last_event_id_resume_includes_late_committed_events(load_app):
+    main = load_app(EVENTS_POLL_INTERVAL_SEC=0, EVENTS_LOOKBACK_SEC=30)
+    with TestClient(main.app) as c:
+        h = register_and_login(c, "sse@example.com", hwid(1))
+        from app.db.database import SessionLocal
+        from app.db import models
+        with SessionLocal() as db:
+            user_id, session_id = db.execute(select(models.Session.user_id, models.Session.id)).one()
+
+        _add_event(10, user_id)
+        _add_event(20, user_id)
+        _add_event(30, user_id, kind="session_revoked", session_id=session_id)
+        _add_event(15, user_id)           # 클라이언트가 20 까지 받은 뒤 commit
+
+        # backfill 안에서 session_revoked 를 보내고 스트림이 끝남
+        with c.stream("GET", "/session/events", headers={**h, "Last-Event-ID": "20"}) as r:
+            body = "".join(r.iter_text())
+    ids = [int(line[4:]) for line in body.splitlines() if line.startswith("id: ")]
+    assert 15 in ids and ids[-1] == 30
+    assert 20 not in ids
+
+def test_reaper_expiry_ends_open_stream(load_app):
+    # 유휴 SSE 연결도 reaper 의 만료를 session_revoked(EXPIRED) 로 받고 종료
+    main = load_app(EVENTS_POLL_INTERVAL_SEC=0.05)
+    from sqlalchemy import update
+    from app.db.database import SessionLocal
+    from app.db import models
+    from app.core.security import utcnow
+    from app.core.session_reaper import expire_stale_sessions
+
+    ended = threading.Event()
+
+    def expire_later():
+        time.sleep(0.5)
+        with SessionLocal() as db:
+            db.execute(update(models.Session).values(last_seen_at=utcnow() - timedelta(days=1)))
+            db.commit()
+            expire_stale_sessions(db)
+            if not ended.wait(10):
+                # 회귀 시 스트림이 끝나지 않으므로 다른 사유로 끊어 테스트가 멈추지 않게 함
+                user_id, session_id = db.execute(select(models.Session.user_id, models.Session.id)).one()
+                _add_event(1000, user_id, kind="session_revoked", session_id=session_id)
+
+    with TestClient(main.app) as c:
+        h = register_and_login(c, "idle@example.com", hwid(1))
+        t = threading.Thread(target=expire_later)
+        t.start()
+        with c.stream("GET", "/session/events", headers=h) as r:
+            body = "".join(r.iter_text())
+        ended.set()
+        t.join()
+    assert "event: session_revoked" in body
+    assert 'data: {"reason":"EXPIRED"}' in body
@@ -0,0 +1,58 @@
+from __future__ import annotations
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+from conftest import SERVER_DIR
+
+SCRIPT = SERVER_DIR.parent / "admin_tools" / "generate_license.py"
+
+def _run(*args: str, secret: str = "gen-secret") -> subprocess.CompletedProcess:
+    return subprocess.run(
+        [sys.executable, str(SCRIPT), "--secret", secret, "--workers", "1", *args],
+        capture_output=True, text=True,
+    )
+
+def _interrupted(tmp_path: Path) -> Path:
+    # 3 chunk 중 1개만 끝난 상태로 되돌림 (중단 흉내)
+    out = tmp_path / "codes.txt"
+    r = _run("--format", "lic2", "--product-id", "2", "--count", "30", "--chunk-size", "10", "--out", str(out))
+    assert r.returncode == 0, r.stderr
+    ckpt_path = Path(str(out) + ".ckpt")
+    ckpt = json.loads(ckpt_path.read_text())
+    lines = out.read_bytes().splitlines(keepends=True)
+    ckpt.update(chunks_done=1, out_bytes=sum(len(x) for x in lines[:10]))
+    ckpt_path.write_text(json.dumps(ckpt))
+    return out
+
+def test_resume_continues_with_same_secret(tmp_path):
+    out = _interrupted(tmp_path)
+    first = out.read_text().splitlines()[:10]
+    r = _run("--out", str(out), "--resume")
+    assert r.returncode == 0, r.stderr
+    codes = out.read_text().splitlines()
+    assert len(codes) == 30 and len(set(codes)) == 30
+    assert codes[:10] == first
+
+def test_resume_refuses_other_secret(tmp_path):
+    out = _interrupted(tmp_path)
+    before = out.read_bytes()
+    r = _run("--out", str(out), "--resume", secret="other-secret")
+    assert r.returncode != 0
+    assert "secret" in r.stderr
+    assert out.read_bytes() == before
+
+def test_resume_refuses_conflicting_spec(tmp_path):
+    out = _interrupted(tmp_path)
+    r = _run("--out", str(out), "--resume", "--product-id", "3")
+    assert r.returncode != 0 and "--product-id=3" in r.stderr
+    r = _run("--out", str(out), "--resume", "--days", "30")
+    assert r.returncode != 0 and "--days" in r.stderr
+    # checkpoint 와 같은 값은 다시 지정해도 됨
+    r = _run("--out", str(out), "--resume", "--product-id", "2", "--count", "30")
+    assert r.returncode == 0, r.stderr
+
+def test_checkpoint_does_not_store_secret(tmp_path):
+    out = _interrupted(tmp_path)
+    assert "gen-secret" not in Path(str(out) + ".ckpt").read_text()
@@ -0,0 +1,72 @@
+from __future__ import annotations
+import secrets
+import sqlite3
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import func, select
+
+from conftest import hwid
+
+# 동시 _admit_session 호출이 계정별 활성 세션 한도를 넘지 않는지 (SQLite 파일, 스레드마다 별도 세션/커넥션)
+
+ATTEMPTS = 200
+THREADS = 16
+
+@pytest.mark.parametrize("profile", ["default", "production"])
+@pytest.mark.parametrize("max_sessions", [1, 3])
+def test_concurrent_admission_never_exceeds_limit(load_app, max_sessions, profile):
+    # production: busy_timeout PRAGMA + 단일 writer 풀 / default: sqlite3 기본 timeout(5초)
+    load_app(MAX_CONCURRENT_SESSIONS_PER_USER=max_sessions, SQLITE_PROFILE=profile)
+    from app.db.database import SessionLocal
+    from app.db import models
+    from app.routers.auth import _admit_session, _count_active_sessions
+
+    with SessionLocal() as db:
+        u = models.User(email="admit@example.com", password_hash="x")
+        db.add(u)
+        db.commit()
+        user_id = u.id
+
+    start = threading.Barrier(THREADS)
+    observed: list[int] = []
+
+    def attempt(i: int) -> bool:
+        if i < THREADS:
+            start.wait()
+        with SessionLocal() as db:
+            sid = _admit_session(db, user_id, secrets.token_hex(32), hwid(i))
+            db.commit()
+            observed.append(_count_active_sessions(db, user_id))
+        return sid is not None
+
+    with ThreadPoolExecutor(max_workers=THREADS) as ex:
+        admitted = sum(ex.map(attempt, range(ATTEMPTS)))
+
+    with SessionLocal() as db:
+        active = db.execute(
+            select(func.count()).select_from(models.Session).where(models.Session.user_id == user_id)
+        ).scalar_one()
+    assert admitted == max_sessions
+    assert active == max_sessions
+    assert max(observed) <= max_sessions
+
+def test_locked_database_returns_503(load_app, tmp_path):
+    # 다른 연결이 쓰기 lock 을 잡고 있으면 busy_timeout 뒤 503 + Retry-After (500 이 아님)
+    main = load_app(SQLITE_PROFILE="production", SQLITE_BUSY_TIMEOUT_MS=100, SQLITE_BUSY_RETRY_AFTER_SEC=2)
+    with TestClient(main.app) as c:
+        c.post("/auth/register", json={"email": "locked@example.com", "password": "password123"})
+        lock = sqlite3.connect(tmp_path / "test.db", isolation_level=None)
+        lock.execute("BEGIN IMMEDIATE")
+        try:
+            r = c.post("/auth/login", json={"email": "locked@example.com", "password": "password123", "hwid_hash": hwid(1)})
+        finally:
+            lock.execute("ROLLBACK")
+            lock.close()
+        assert r.status_code == 503, r.text
+        assert r.headers["Retry-After"] == "2"
+        # lock 이 풀리면 정상 로그인
+        r = c.post("/auth/login", json={"email": "locked@example.com", "password": "password123", "hwid_hash": hwid(1)})
+        assert r.status_code == 200, r.text
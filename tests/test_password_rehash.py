@@ -0,0 +1,54 @@
+from __future__ import annotations
+
+from fastapi.testclient import TestClient
+from sqlalchemy import select
+
+from conftest import hwid
+
+EMAIL = "rehash@example.com"
+PASSWORD = "password123"
+
+def _stored_hash() -> str:
+    from app.db.database import SessionLocal
+    from app.db import models
+    with SessionLocal() as db:
+        return db.execute(select(models.User.password_hash).where(models.User.email == EMAIL)).scalar_one()
+
+def _register(load_app, rounds: int) -> str:
+    main = load_app(PASSWORD_BCRYPT_ROUNDS=rounds)
+    with TestClient(main.app) as c:
+        assert c.post("/auth/register", json={"email": EMAIL, "password": PASSWORD}).status_code == 201
+    return _stored_hash()
+
+def _login(load_app, rounds: int, **settings) -> str:
+    main = load_app(PASSWORD_BCRYPT_ROUNDS=rounds, **settings)
+    with TestClient(main.app) as c:
+        r = c.post("/auth/login", json={"email": EMAIL, "password": PASSWORD, "hwid_hash": hwid(1)})
+        assert r.status_code == 200, r.text
+    return _stored_hash()
+
+def test_login_rehashes_to_stronger_cost(load_app):
+    assert _register(load_app, 4).startswith("$2b$04$")
+    assert _login(load_app, 5).startswith("$2b$05$")
+
+def test_login_never_rehashes_to_weaker_cost(load_app):
+    old = _register(load_app, 5)
+    assert _login(load_app, 4) == old
+
+def test_downgrade_only_with_explicit_flag(load_app):
+    _register(load_app, 5)
+    assert _login(load_app, 4, PASSWORD_HASH_ALLOW_DOWNGRADE="true").startswith("$2b$04$")
+
+def test_configured_cost_below_floor_is_raised(load_app):
+    main = load_app(PASSWORD_BCRYPT_ROUNDS=4, PASSWORD_BCRYPT_MIN_ROUNDS=5)
+    from app.core import security
+    assert security.BCRYPT_ROUNDS == 5
+    with TestClient(main.app) as c:
+        assert c.post("/auth/register", json={"email": EMAIL, "password": PASSWORD}).status_code == 201
+    assert _stored_hash().startswith("$2b$05$")
+
+def test_default_floor():
+    from app.core.config import Settings
+    s = Settings(_env_file=None)
+    assert s.PASSWORD_BCRYPT_MIN_ROUNDS >= 10
+    assert s.PASSWORD_ARGON2_MIN_MEMORY_COST_KIB >= 19 * 1024
@@ -0,0 +1,41 @@
+from __future__ import annotations
+import subprocess
+import sys
+
+from fastapi.testclient import TestClient
+from sqlalchemy import select
+
+from conftest import SERVER_DIR, hwid, register_and_login
+
+SCRIPT = SERVER_DIR.parent / "admin_tools" / "revoke.py"
+
+def test_revoke_accepts_unnormalized_code(load_app, tmp_path):
+    main = load_app()
+    from app.core.license_codec import encode_license_v2
+    from app.db.database import SessionLocal
+    from app.db import models
+
+    hw = hwid(1)
+    code = encode_license_v2(2)
+    with TestClient(main.app) as c:
+        h = register_and_login(c, "revoke@example.com", hw)
+        assert c.post("/license/redeem", headers=h,
+                      json={"product_code": "demo_paid", "license_code": code, "hwid_hash": hw}).status_code == 200
+        assert c.post("/license/validate", headers=h, json={"product_code": "demo_paid", "hwid_hash": hw}).json()["valid"]
+
+        # 관리자가 소문자/구분자 없이 입력해도 저장된 정규형 코드를 찾음
+        typed = code.replace("-", "").lower()
+        r = subprocess.run(
+            [sys.executable, str(SCRIPT), "--db-url", f"sqlite:///{tmp_path / 'test.db'}", "license", typed],
+            capture_output=True, text=True,
+        )
+        assert r.returncode == 0, r.stderr
+
+        v = c.post("/license/validate", headers=h, json={"product_code": "demo_paid", "hwid_hash": hw}).json()
+        assert v["valid"] is False
+
+    with SessionLocal() as db:
+        ent = db.execute(select(models.Entitlement)).scalar_one()
+        kinds = db.execute(select(models.SessionEvent.kind)).scalars().all()
+    assert ent.is_revoked is True
+    assert "license_revoked" in kinds
@@ -0,0 +1,88 @@
+from __future__ import annotations
+import json
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from sqlalchemy import func, insert, select
+
+from conftest import hwid
+
+def _seed(n: int):
+    from app.db.database import SessionLocal
+    from app.db import models
+    from app.core.security import utcnow
+
+    old = utcnow() - timedelta(days=365)
+    with SessionLocal() as db:
+        u = models.User(email="reaper@example.com", password_hash="x")
+        db.add(u)
+        db.flush()
+        db.execute(insert(models.Session.__table__), [
+            {"user_id": u.id, "token_hash": f"{i:064x}", "hwid_hash": hwid(1), "created_at": old,
+             "last_seen_at": old, "is_active": False, "revoked_at": old, "revoke_reason": "LOGOUT"}
+            for i in range(n)
+        ])
+        db.commit()
+
+def _counts() -> tuple[int, int]:
+    from app.db.database import SessionLocal
+    from app.db import models
+    with SessionLocal() as db:
+        return (
+            db.execute(select(func.count()).select_from(models.Session)).scalar_one(),
+            db.execute(select(func.count()).select_from(models.SessionArchive)).scalar_one(),
+        )
+
+def _archive() -> int:
+    from app.db.database import SessionLocal
+    from app.core.session_reaper import archive_old_sessions
+    with SessionLocal() as db:
+        return archive_old_sessions(db, mode="archive")
+
+def test_concurrent_archive_moves_each_session_once(load_app):
+    load_app(SESSION_REAPER_BATCH_SIZE=50, SQLITE_BUSY_TIMEOUT_MS=30000)
+    _seed(1000)
+    with ThreadPoolExecutor(max_workers=4) as ex:
+        moved = list(ex.map(lambda _: _archive(), range(4)))
+    assert sum(moved) == 1000
+    assert _counts() == (0, 1000)
+
+def test_archive_skips_ids_already_archived(load_app):
+    load_app()
+    _seed(10)
+    from app.db.database import SessionLocal
+    from app.db import models
+    with SessionLocal() as db:
+        first = db.execute(select(models.Session.__table__).limit(1)).mappings().one()
+        db.execute(insert(models.SessionArchive.__table__).values(**first, archived_at=first["revoked_at"]))
+        db.commit()
+    assert _archive() == 10
+    assert _counts() == (0, 10)
+
+def test_expire_records_event_and_invalidates_cache(load_app):
+    from fastapi.testclient import TestClient
+    from sqlalchemy import update
+    from conftest import register_and_login
+
+    main = load_app()
+    from app.db.database import SessionLocal
+    from app.db import models
+    from app.core.security import utcnow
+    from app.core.session_cache import session_cache
+    from app.core.session_reaper import expire_stale_sessions
+
+    with TestClient(main.app) as c:
+        h = register_and_login(c, "expire@example.com", hwid(1))
+        assert c.get("/session/me", headers=h).status_code == 200
+        assert len(session_cache._entries) == 1
+
+        old = utcnow() - timedelta(days=1)
+        with SessionLocal() as db:
+            db.execute(update(models.Session).values(last_seen_at=old))
+            db.commit()
+            assert expire_stale_sessions(db) == 1
+            assert expire_stale_sessions(db) == 0
+            ev = db.execute(select(models.SessionEvent)).scalar_one()
+        assert (ev.kind, json.loads(ev.data)) == ("session_revoked", {"reason": "EXPIRED"})
+        assert len(session_cache._entries) == 0
+        assert c.get("/session/me", headers=h).status_code == 401